@@ -0,0 +1,185 @@
+"""
+Headless voice assistant API: POST /assist runs ASR -> agent graph -> TTS
+outside Streamlit, so the pipeline can be scaled out, load-tested and used
+by other clients.
+
+One compiled graph, LLM client, ASR model and TTS provider are shared by
+all requests (app/resources.py, warmed up at startup). Requests run on a
+bounded thread pool with a bounded wait queue; when both are full the API
+answers 429 immediately instead of queueing without limit. Configure via:
+- ASSIST_WORKERS: concurrent pipeline runs (default: 4)
+- ASSIST_QUEUE: requests allowed to wait for a worker (default: 16)
+- ASSIST_TIMEOUT_S: per-request deadline, queueing included (default: 30)
+
+WebSocket /voice streams a full-duplex voice session (app/voice.py).
+
+Run:
+    uvicorn app.api:app --port 8100
+"""
+import os
+import re
+import time
+import base64
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI, HTTPException, Request, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+from app.resources import Resources
+from app.voice import VoiceSession
+from graph.tracing import span
+from graph.metrics import REGISTRY, Counter, Gauge, Histogram
+
+load_dotenv()
+
+WORKERS = int(os.getenv("ASSIST_WORKERS", "4"))
+QUEUE = int(os.getenv("ASSIST_QUEUE", "16"))
+TIMEOUT_S = float(os.getenv("ASSIST_TIMEOUT_S", "30"))
+
+resources = Resources()
+pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="assist")
+# Admission: a slot is held from acceptance until the pipeline run ends
+slots = threading.BoundedSemaphore(WORKERS + QUEUE)
+
+REQUESTS = Counter("assist_requests_total", "Assist requests by outcome", ["status"])
+REQUEST_SECONDS = Histogram("assist_request_duration_seconds", "Assist request time, queueing included")
+QUEUE_SECONDS = Histogram("assist_queue_wait_seconds", "Time accepted requests waited for a worker")
+ADMITTED = Gauge("assist_admitted_requests", "Requests holding a slot (running or queued)")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    resources.start_warmup()
+    yield
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Voice Assistant API", lifespan=lifespan)
+
+
+class AssistRequest(BaseModel):
+    text: str | None = None
+    audio_b64: str | None = None  # WAV bytes (or raw PCM16 with sample_rate)
+    sample_rate: int | None = None
+    speak: bool = True  # include TTS audio in the response
+    format: str | None = None  # TTS_FORMAT override: wav | mp3 | opus
+
+
+def run_pipeline(req: AssistRequest, audio: bytes | None, queued_at: float):
+    """ASR (if audio) -> graph -> TTS (if speak); runs on a pool thread."""
+    QUEUE_SECONDS.observe(time.perf_counter() - queued_at)
+    timings = {}
+    with span("assist", input="voice" if audio else "text"):
+        transcript = req.text
+        if audio:
+            from tts_asr.asr_whisper import transcribe
+            start = time.perf_counter()
+            transcript = transcribe(audio, os.getenv("ASR_MODEL", "small"), req.sample_rate)
+            timings["asr"] = round((time.perf_counter() - start) * 1000, 1)
+        if not (transcript or "").strip():
+            return {"transcript": transcript, "answer": None, "error": "no speech recognized"}
+
+        start = time.perf_counter()
+        final = resources.graph().invoke({
+            "audio_path": None, "transcript": transcript, "intent": None, "plan": None,
+            "evidence": None, "answer": None, "citations": None, "safety_flags": None,
+            "tts_path": None, "log": [],
+        })
+        timings["graph"] = round((time.perf_counter() - start) * 1000, 1)
+
+        result = {
+            "transcript": transcript,
+            "answer": final.get("answer"),
+            "citations": final.get("citations") or [],
+            "products": ((final.get("evidence") or {}).get("rag") or [])[:5],
+            "safety_flags": final.get("safety_flags") or [],
+        }
+        if req.speak and result["answer"]:
+            from tts_asr.tts_client import synthesize, output_format
+            start = time.perf_counter()
+            fmt = output_format(req.format)
+            speech = re.sub(r"\(Sources?:.*?\)", "", result["answer"]).strip()
+            result["audio_b64"] = base64.b64encode(synthesize(speech, fmt)).decode()
+            result["audio_format"] = fmt
+            timings["tts"] = round((time.perf_counter() - start) * 1000, 1)
+        result["timings_ms"] = timings
+        return result
+
+
+async def read_request(request: Request):
+    """JSON AssistRequest, or a raw audio body (Content-Type audio/*) with ?speak=&format=."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("audio/") or content_type == "application/octet-stream":
+        params = request.query_params
+        req = AssistRequest(speak=params.get("speak", "true").lower() in ("1", "true", "yes"),
+                            format=params.get("format"),
+                            sample_rate=int(params["sample_rate"]) if "sample_rate" in params else None)
+        return req, await request.body()
+    req = AssistRequest.model_validate(await request.json())
+    return req, base64.b64decode(req.audio_b64) if req.audio_b64 else None
+
+
+@app.post("/assist")
+async def assist(request: Request):
+    try:
+        req, audio = await read_request(request)
+    except ValueError as e:  # bad JSON, failed validation, bad base64
+        raise HTTPException(422, str(e))
+    if not audio and not (req.text or "").strip():
+        raise HTTPException(422, "Send text, audio_b64 or an audio/* body")
+
+    if not slots.acquire(blocking=False):
+        REQUESTS.labels("rejected").inc()
+        return JSONResponse({"error": "busy, retry later"}, status_code=429, headers={"Retry-After": "1"})
+    ADMITTED.inc()
+    start = time.perf_counter()
+    future = pool.submit(run_pipeline, req, audio, start)
+
+    def release(_):
+        # A timed-out run keeps its worker until it finishes, so it keeps its slot too
+        ADMITTED.dec()
+        slots.release()
+    future.add_done_callback(release)
+
+    status = "error"
+    try:
+        result = await asyncio.wait_for(asyncio.wrap_future(future), TIMEOUT_S)
+        status = "ok"
+        return result
+    except asyncio.TimeoutError:
+        future.cancel()  # drops it if it is still queued
+        status = "timeout"
+        return JSONResponse({"error": f"timed out after {TIMEOUT_S:g}s"}, status_code=504)
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - start)
+        REQUESTS.labels(status).inc()
+
+
+@app.websocket("/voice")
+async def voice(ws: WebSocket, sample_rate: int = 16000, format: str | None = None):
+    """Streaming mic PCM in; partial transcripts, answer sentences and TTS chunks out (app/voice.py)."""
+    await ws.accept()
+    await VoiceSession(ws, resources.graph(streaming=True), sample_rate, format).run()
+
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    """503 until the graph, models and clients have warmed up."""
+    summary = resources.summary()
+    return JSONResponse(summary, status_code=200 if summary["done"] else 503)
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text format: assist outcomes/latency/queueing plus graph span timings."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,123 @@
+"""
+Session media store - keeps reply audio and large evidence payloads on
+disk so Streamlit session state only holds small handles.
+
+Files live under MEDIA_STORE_DIR with a SQLite index (size, owner session,
+last access). Least-recently-used entries are evicted when a session or the
+whole store goes over its cap. Configure via:
+- MEDIA_STORE_DIR: storage directory (default: ./data/media)
+- MEDIA_SESSION_MAX_MB: per-session cap (default: 50)
+- MEDIA_GLOBAL_MAX_MB: cap across all sessions and processes (default: 500)
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+
+
+class MediaStore:
+    """Disk-backed blob store with per-session and global LRU size caps."""
+
+    def __init__(self, root=None, session_max_bytes=None, global_max_bytes=None):
+        self.root = root or os.getenv("MEDIA_STORE_DIR", "./data/media")
+        self.session_max = session_max_bytes or int(float(os.getenv("MEDIA_SESSION_MAX_MB", "50")) * 2**20)
+        self.global_max = global_max_bytes or int(float(os.getenv("MEDIA_GLOBAL_MAX_MB", "500")) * 2**20)
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False,
+                                   isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS blobs (
+            handle TEXT PRIMARY KEY, session TEXT, kind TEXT, path TEXT,
+            size INTEGER, last_access REAL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS blobs_lru ON blobs(session, last_access)")
+
+    def put_bytes(self, session, data, kind="audio", suffix=".wav"):
+        """Store bytes for a session; returns a handle."""
+        handle = uuid.uuid4().hex
+        path = os.path.join(self.root, session, handle + suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        with self._lock:
+            self._db.execute("INSERT INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                             (handle, session, kind, path, len(data), time.time()))
+            self._evict(session)
+        return handle
+
+    def put_json(self, session, obj, kind="payload"):
+        return self.put_bytes(session, json.dumps(obj, default=str).encode(), kind=kind, suffix=".json")
+
+    def path(self, handle):
+        """File path for a handle (marks it recently used), or None if evicted."""
+        with self._lock:
+            row = self._db.execute("SELECT path FROM blobs WHERE handle = ?", (handle,)).fetchone()
+            if row:
+                self._db.execute("UPDATE blobs SET last_access = ? WHERE handle = ?", (time.time(), handle))
+        return row[0] if row and os.path.exists(row[0]) else None
+
+    def open(self, handle):
+        """Binary file object for streaming a blob to a player, or None."""
+        path = self.path(handle)
+        return open(path, "rb") if path else None
+
+    def get_bytes(self, handle):
+        f = self.open(handle)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def get_json(self, handle, default=None):
+        data = self.get_bytes(handle) if handle else None
+        return json.loads(data) if data else default
+
+    def delete_session(self, session):
+        with self._lock:
+            rows = self._db.execute("SELECT handle, path FROM blobs WHERE session = ?", (session,)).fetchall()
+            self._remove(rows)
+
+    def usage(self, session=None):
+        """Bytes stored for a session (or in total)."""
+        where, args = ("WHERE session = ?", (session,)) if session else ("", ())
+        with self._lock:
+            return self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM blobs {where}", args).fetchone()[0]
+
+    def _evict(self, session):
+        """Drop least-recently-used blobs until both caps hold (caller holds the lock)."""
+        for where, args, cap in (("WHERE session = ?", (session,), self.session_max), ("", (), self.global_max)):
+            total = self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM blobs {where}", args).fetchone()[0]
+            if total <= cap:
+                continue
+            victims = []
+            for handle, path, size in self._db.execute(
+                f"SELECT handle, path, size FROM blobs {where} ORDER BY last_access", args
+            ).fetchall():
+                if total <= cap:
+                    break
+                victims.append((handle, path))
+                total -= size
+            self._remove(victims)
+
+    def _remove(self, rows):
+        for handle, path in rows:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._db.executemany("DELETE FROM blobs WHERE handle = ?", [(h,) for h, _ in rows])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_media_store() -> MediaStore:
+    """Get or create the process-wide media store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MediaStore()
+    return _store
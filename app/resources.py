@@ -0,0 +1,114 @@
+"""
+Process-wide resources for the Streamlit apps: compiled graphs, the LLM
+client, the Whisper model and the pooled HTTP clients.
+
+Streamlit reruns the script for every interaction and keeps a separate
+session_state per browser tab, so anything built there is rebuilt per
+session. The UIs instead get one Resources object per process through
+st.cache_resource; it warms everything up on a background thread as soon
+as the app starts and reports readiness for the sidebar.
+"""
+import os
+import time
+import threading
+
+COMPONENTS = ("graph", "llm", "tools", "tts", "asr")
+
+
+class Resources:
+    """Lazily built shared resources plus a background warmup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graphs = {}
+        self.status = {name: "pending" for name in COMPONENTS}
+        self.timings_ms = {}
+        self.started = None
+        self.thread = None
+
+    def graph(self, streaming=False):
+        """Compiled graph (stateless between invocations, so sessions share it)."""
+        from graph.langgraph_pipeline import build_graph
+        with self._lock:
+            if streaming not in self._graphs:
+                self._graphs[streaming] = build_graph(streaming=streaming)
+            return self._graphs[streaming]
+
+    def asr_model(self):
+        from tts_asr.asr_whisper import get_model
+        return get_model(os.getenv("ASR_MODEL", "small"))
+
+    def start_warmup(self, streaming=False):
+        """Build and load everything on a daemon thread; returns immediately."""
+        if self.thread is None:
+            self.started = time.perf_counter()
+            self.thread = threading.Thread(target=self._warmup, args=(streaming,), daemon=True,
+                                           name="resource-warmup")
+            self.thread.start()
+        return self
+
+    def _warmup(self, streaming):
+        from graph.llm_client import get_llm_client
+        from graph.nodes.retriever import get_http_client as tool_client
+        from tts_asr.tts_client import get_http_client as tts_client, get_provider as tts_provider
+
+        steps = {
+            "graph": lambda: self.graph(streaming),
+            "llm": get_llm_client,
+            # Opens pooled connections and fails fast if the tool server is down
+            "tools": lambda: tool_client().get(f"{os.getenv('MCP_BASE', 'http://127.0.0.1:8000')}/healthz").raise_for_status(),
+            # Local providers load their voice here; OpenAI only needs a warm connection
+            "tts": lambda: tts_client().head("https://api.openai.com/v1")
+                   if tts_provider().name == "openai" else None,
+            "asr": self.asr_model,
+        }
+        for name, step in steps.items():
+            start = time.perf_counter()
+            self.status[name] = "loading"
+            try:
+                step()
+                self.status[name] = "ready"
+            except Exception as e:
+                self.status[name] = f"error: {e}"
+                print(f"[resources] Warmup of {name} failed: {e}")
+            self.timings_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    @property
+    def ready(self):
+        return all(s == "ready" for s in self.status.values())
+
+    @property
+    def done(self):
+        """Warmup finished (some components may have failed)."""
+        return all(s == "ready" or s.startswith("error") for s in self.status.values())
+
+    def wait(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return self.ready
+
+    def summary(self):
+        """{"ready", "done", "elapsed_s", "components": {name: {"status", "ms"}}} for the readiness indicator."""
+        elapsed = round(time.perf_counter() - self.started, 1) if self.started else None
+        return {
+            "ready": self.ready,
+            "done": self.done,
+            "elapsed_s": elapsed,
+            "components": {n: {"status": self.status[n], "ms": self.timings_ms.get(n)} for n in COMPONENTS},
+        }
+
+
+def render_readiness(st, resources):
+    """Sidebar readiness indicator (st is the streamlit module)."""
+    summary = resources.summary()
+    icons = {"ready": "✅", "loading": "⏳", "pending": "⏳"}
+    if summary["ready"]:
+        st.success("System ready")
+    elif summary["done"]:
+        st.warning("Ready, some components failed to warm up")
+    else:
+        st.info(f"Warming up… ({summary['elapsed_s']}s)")
+    for name, c in summary["components"].items():
+        icon = icons.get(c["status"], "⚠️")
+        ms = f" · {c['ms']:.0f} ms" if c["ms"] is not None else ""
+        st.caption(f"{icon} {name}{ms}" + ("" if icon != "⚠️" else f" — {c['status'][:80]}"))
@@ -1,8 +1,9 @@
-import os, io, tempfile, pandas as pd, streamlit as st
+import os, pandas as pd, streamlit as st
 from dotenv import load_dotenv
-from graph.langgraph_pipeline import build_graph
+from app.resources import Resources, render_readiness
+from graph.tracing import span
 from tts_asr.asr_whisper import transcribe
-from tts_asr.tts_client import synthesize
+from tts_asr.tts_client import synthesize, output_format, mime_type
 
 load_dotenv()
 st.set_page_config(page_title="🎙️ Agentic Voice Product Finder", layout="centered")
@@ -16,8 +17,15 @@ with st.expander("ℹ️ System Info"):
     st.write("**Voice Input**: Requires microphone permissions")
     st.caption("💡 For first-time use, start with typed queries to test the system")
 
-if "graph" not in st.session_state:
-    st.session_state.graph = build_graph()
+# Process-wide resources (graph, LLM/ASR models, HTTP pools), warmed up once at app start
+@st.cache_resource(show_spinner=False)
+def shared_resources():
+    return Resources().start_warmup()
+
+
+resources = shared_resources()
+with st.sidebar:
+    st.fragment(run_every=None if resources.done else 1)(lambda: render_readiness(st, resources))()
 
 st.markdown("### 💬 Choose Your Input Method")
 
@@ -44,60 +52,43 @@ if st.button("Transcribe & Search"):
     if use_manual and not manual.strip():
         st.error("Please type a query or switch to voice input."); st.stop()
 
-    transcript = manual
-    if not use_manual:
-        audio_path = None
-        try:
-            # Check if audio_bytes has data
-            audio_data = audio_bytes.getvalue()
-            if not audio_data or len(audio_data) < 100:  # Too small to be valid audio
-                st.error("Audio recording is too short or empty. Please try recording again."); st.stop()
-            
-            # Create temp file with proper Windows path handling
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False, mode='wb') as tmp:
-                tmp.write(audio_data)
-                audio_path = tmp.name
-            
-            st.info(f"📝 Transcribing audio (this may take 10-30 seconds for first run)...")
-            st.caption(f"Temp file: {audio_path}")
+    # One trace per turn: ASR (asr.transcribe) and the graph run are its children
+    with span("turn", input="text" if use_manual else "voice") as turn:
+        transcript = manual
+        if not use_manual:
+            try:
+                # Check if audio_bytes has data
+                audio_data = audio_bytes.getvalue()
+                if not audio_data or len(audio_data) < 100:  # Too small to be valid audio
+                    st.error("Audio recording is too short or empty. Please try recording again."); st.stop()
             
-            # Verify file exists before transcription
-            if not os.path.exists(audio_path):
-                st.error(f"Temp audio file not found: {audio_path}"); st.stop()
+                st.info(f"📝 Transcribing audio (this may take 10-30 seconds for first run)...")
             
-            # Transcribe
-            transcript = transcribe(audio_path, os.getenv("ASR_MODEL","small"))
+                # Transcribe the recorded WAV bytes in memory (no temp file)
+                transcript = transcribe(audio_data, os.getenv("ASR_MODEL","small"))
             
-            if not transcript or not transcript.strip():
-                st.error("Could not transcribe audio. Please speak clearly and try again."); st.stop()
+                if not transcript or not transcript.strip():
+                    st.error("Could not transcribe audio. Please speak clearly and try again."); st.stop()
                 
-            st.success("✅ ASR complete!")
-            st.write("**Transcript:**", transcript)
+                st.success("✅ ASR complete!")
+                st.write("**Transcript:**", transcript)
             
-        except Exception as e:
-            st.error(f"Error during transcription: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
-            st.stop()
-        finally:
-            # Always clean up temp file (but don't fail if it's already gone)
-            if audio_path:
-                try:
-                    if os.path.exists(audio_path):
-                        os.unlink(audio_path)
-                except Exception as cleanup_error:
-                    # Silently ignore cleanup errors - file might already be deleted
-                    pass
-    elif transcript:
-        st.write("**Transcript:**", transcript)
-
-    state = {
-        "audio_path": None, "transcript": transcript,
-        "intent": None, "plan": None, "evidence": None,
-        "answer": None, "citations": None, "safety_flags": None,
-        "tts_path": None, "log": []
-    }
-    final = st.session_state.graph.invoke(state)
+            except Exception as e:
+                st.error(f"Error during transcription: {str(e)}")
+                import traceback
+                st.code(traceback.format_exc())
+                st.stop()
+        elif transcript:
+            st.write("**Transcript:**", transcript)
+
+        state = {
+            "audio_path": None, "transcript": transcript,
+            "intent": None, "plan": None, "evidence": None,
+            "answer": None, "citations": None, "safety_flags": None,
+            "tts_path": None, "log": []
+        }
+        final = resources.graph().invoke(state)
+        st.session_state.turn_trace_id = turn.trace_id
 
     # Store ALL results in session state so they persist across reruns
     st.session_state.final_results = final
@@ -140,14 +131,15 @@ if "final_results" in st.session_state:
 if "tts_answer" in st.session_state and st.button("🔊 Play TTS"):
     try:
         with st.spinner("Generating audio..."):
-            out_path = synthesize(st.session_state.tts_answer)
-            if out_path and os.path.exists(out_path):
-                with open(out_path, "rb") as f:
-                    audio = f.read()
-                st.audio(io.BytesIO(audio), format="audio/wav")
+            # Runs on a later rerun, so it gets its own trace linked to the turn
+            with span("tts_playback", origin_trace_id=st.session_state.get("turn_trace_id", "")):
+                fmt = output_format()
+                audio = synthesize(st.session_state.tts_answer, fmt)
+            if audio:
+                st.audio(audio, format=mime_type(fmt))
                 st.success("✅ Audio ready!")
             else:
-                st.error("Could not generate audio file")
+                st.error("Could not generate audio")
     except Exception as e:
         st.error(f"TTS Error: {str(e)}")
         import traceback
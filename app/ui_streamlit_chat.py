@@ -1,9 +1,13 @@
-import os, io, tempfile, pandas as pd, streamlit as st
+import os, io, pandas as pd, streamlit as st
 import time
+import uuid
 from dotenv import load_dotenv
-from graph.langgraph_pipeline import build_graph
+from graph.streaming import streaming_enabled, stream_turn, SentenceSpeaker
+from graph.tracing import span
+from app.media_store import get_media_store
+from app.resources import Resources, render_readiness
 from tts_asr.asr_whisper import transcribe
-from tts_asr.tts_client import synthesize
+from tts_asr.tts_client import synthesize, output_format, mime_type, file_suffix, join_audio
 
 load_dotenv()
 
@@ -90,13 +94,21 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Process-wide resources (graph, LLM/ASR models, HTTP pools), warmed up once at app start
+@st.cache_resource(show_spinner=False)
+def shared_resources():
+    return Resources().start_warmup(streaming=streaming_enabled())
+
+
+resources = shared_resources()
+
 # Initialize session state
-if "graph" not in st.session_state:
-    st.session_state.graph = build_graph()
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "audio_files" not in st.session_state:
-    st.session_state.audio_files = {}
+if "session_id" not in st.session_state:
+    # Audio and evidence payloads live in the media store; messages keep handles
+    st.session_state.session_id = uuid.uuid4().hex
+media = get_media_store()
 
 # Header
 st.caption("ADSP 32028 IP01 Applied Generative AI: Agents and Multimodal Intelligence")
@@ -109,6 +121,9 @@ with st.sidebar:
     st.write(f"**Model**: {os.getenv('LLM_MODEL', 'gpt-4o-mini')}")
     st.write(f"**Products Indexed**: 10 items")
     st.write(f"**Voice**: {os.getenv('TTS_VOICE', 'alloy')}")
+
+    # Refreshes itself while the warmup is still running
+    st.fragment(run_every=None if resources.done else 1)(lambda: render_readiness(st, resources))()
     
     st.divider()
     
@@ -128,7 +143,7 @@ with st.sidebar:
     
     if st.button("🗑️ Clear Chat", use_container_width=True):
         st.session_state.messages = []
-        st.session_state.audio_files = {}
+        media.delete_session(st.session_state.session_id)
         st.rerun()
 
 # Chat display area
@@ -170,10 +185,18 @@ with chat_container:
             </div>
             """, unsafe_allow_html=True)
             
-            # Audio playback
-            if message.get("audio_key") and message["audio_key"] in st.session_state.audio_files:
-                audio_data = st.session_state.audio_files[message["audio_key"]]
-                st.audio(audio_data, format="audio/wav")
+            # Audio playback: the latest reply loads its player, older ones on demand
+            if message.get("audio_handle"):
+                is_latest = idx == len(st.session_state.messages) - 1
+                if is_latest or st.button("🔊 Play", key=f"play_{idx}"):
+                    audio_path = media.path(message["audio_handle"])
+                    if audio_path:
+                        st.audio(audio_path, format=mime_type(message.get("audio_format", "wav")))
+                    else:
+                        st.caption("🔇 Audio expired")
+            
+            # Products, web results and logs are loaded from disk per render
+            payload = media.get_json(message.get("payload_handle"), default={})
             
             # Citations
             if message.get("citations"):
@@ -188,9 +211,9 @@ with chat_container:
                 st.markdown(citations_html, unsafe_allow_html=True)
             
             # Product results (expandable)
-            if message.get("products"):
-                with st.expander(f"📦 View {len(message['products'])} Product(s)", expanded=False):
-                    df = pd.DataFrame(message["products"])
+            if payload.get("products"):
+                with st.expander(f"📦 View {len(payload['products'])} Product(s)", expanded=False):
+                    df = pd.DataFrame(payload["products"])
                     # Select available columns
                     display_cols = []
                     for col in ["title", "brand", "price", "rating"]:
@@ -200,15 +223,15 @@ with chat_container:
                         st.dataframe(df[display_cols], use_container_width=True)
             
             # Web results (expandable)
-            if message.get("web_results"):
-                with st.expander(f"🌐 View {len(message['web_results'])} Web Result(s)", expanded=False):
-                    for item in message["web_results"]:
+            if payload.get("web_results"):
+                with st.expander(f"🌐 View {len(payload['web_results'])} Web Result(s)", expanded=False):
+                    for item in payload["web_results"]:
                         st.markdown(f"• [{item.get('title', 'Link')}]({item.get('url', '#')})")
             
             # Agent logs (expandable, for debugging)
-            if message.get("agent_logs"):
+            if payload.get("agent_logs"):
                 with st.expander("🔍 View Agent Decision Log", expanded=False):
-                    for log in message["agent_logs"]:
+                    for log in payload["agent_logs"]:
                         st.json(log, expanded=False)
 
 # Helper functions (must be defined BEFORE use)
@@ -223,8 +246,8 @@ def process_query(query_text, is_voice=False):
         "timestamp": time.time()
     })
     
-    # Show processing message
-    with st.spinner("🤔 Thinking..."):
+    # Show processing message (one trace span per turn: graph nodes + TTS)
+    with st.spinner("🤔 Thinking..."), span("turn", input="voice" if is_voice else "text"):
         # Run agent pipeline
         state = {
             "audio_path": None,
@@ -240,7 +263,13 @@ def process_query(query_text, is_voice=False):
         }
         
         try:
-            final = st.session_state.graph.invoke(state)
+            # Streaming graph: approved sentences are voiced while the answer is generated
+            fmt = output_format()
+            speaker = SentenceSpeaker(lambda text: synthesize(text, fmt)) if streaming_enabled() else None
+            if speaker:
+                final = stream_turn(resources.graph(streaming=True), state, speaker)
+            else:
+                final = resources.graph().invoke(state)
             
             # Extract results
             answer_text = final.get("answer", "I couldn't process that request.")
@@ -252,27 +281,31 @@ def process_query(query_text, is_voice=False):
             # Generate TTS audio
             import re
             tts_text = re.sub(r'\(Sources?:.*?\)', '', answer_text).strip()
-            audio_key = f"audio_{len(st.session_state.messages)}"
+            session_id = st.session_state.session_id
+            audio_handle = None
             
             try:
                 with st.spinner("🔊 Generating audio..."):
-                    audio_path = synthesize(tts_text)
-                    with open(audio_path, "rb") as f:
-                        audio_data = f.read()
-                    st.session_state.audio_files[audio_key] = audio_data
+                    if speaker:
+                        audio_data = join_audio(speaker.chunks(), fmt)
+                    else:
+                        audio_data = synthesize(tts_text, fmt)
+                    audio_handle = media.put_bytes(session_id, audio_data, kind="audio", suffix=file_suffix(fmt))
             except Exception as e:
                 st.warning(f"Could not generate audio: {str(e)}")
-                audio_key = None
             
             # Add assistant response to chat
             st.session_state.messages.append({
                 "role": "assistant",
                 "content": answer_text,
-                "audio_key": audio_key,
+                "audio_handle": audio_handle,
+                "audio_format": fmt,
                 "citations": citations,
-                "products": rag_results[:5] if rag_results else None,
-                "web_results": web_results[:3] if web_results else None,
-                "agent_logs": agent_logs,
+                "payload_handle": media.put_json(session_id, {
+                    "products": rag_results[:5] if rag_results else None,
+                    "web_results": web_results[:3] if web_results else None,
+                    "agent_logs": agent_logs,
+                }),
                 "timestamp": time.time()
             })
             
@@ -286,39 +319,27 @@ def process_query(query_text, is_voice=False):
 def process_voice_query(audio_bytes):
     """Process voice input: transcribe then query."""
     
-    audio_path = None
     try:
-        # Save audio to temp file
         audio_data = audio_bytes.getvalue()
         if not audio_data or len(audio_data) < 100:
             st.error("Audio recording is too short. Please try again.")
             return
         
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False, mode='wb') as tmp:
-            tmp.write(audio_data)
-            audio_path = tmp.name
-        
-        # Transcribe
-        with st.spinner("🎤 Transcribing..."):
-            transcript = transcribe(audio_path, os.getenv("ASR_MODEL", "small"))
-        
-        if not transcript or not transcript.strip():
-            st.error("Could not transcribe audio. Please speak clearly and try again.")
-            return
-        
-        # Process the transcribed query
-        process_query(transcript, is_voice=True)
+        # Transcribe and answer under one trace (ASR span + turn span)
+        with span("voice_turn"):
+            with st.spinner("🎤 Transcribing..."):
+                # WAV bytes are decoded in memory (no temp file)
+                transcript = transcribe(audio_data, os.getenv("ASR_MODEL", "small"))
+            
+            if not transcript or not transcript.strip():
+                st.error("Could not transcribe audio. Please speak clearly and try again.")
+                return
+            
+            # Process the transcribed query
+            process_query(transcript, is_voice=True)
         
     except Exception as e:
         st.error(f"Voice processing error: {str(e)}")
-    
-    finally:
-        # Cleanup temp file
-        if audio_path and os.path.exists(audio_path):
-            try:
-                os.unlink(audio_path)
-            except:
-                pass
 
 # Input area (flows after messages)
 st.markdown("<br>", unsafe_allow_html=True)
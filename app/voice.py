@@ -0,0 +1,274 @@
+"""
+Full-duplex voice sessions over a WebSocket (served at /voice by app/api.py).
+
+The client streams microphone audio; the server answers with events while
+the turn is still running, so the user hears the first sentence as soon as
+it is synthesized instead of after the whole reply.
+
+Client -> server
+- binary frames: PCM16 little-endian mono at ?sample_rate= (default 16000)
+- {"type": "end"}: end of utterance now (otherwise detected after
+  VOICE_ENDPOINT_MS of silence)
+- {"type": "text", "text": ...}: a typed turn
+- {"type": "cancel"}: stop the current turn
+
+Server -> client (JSON text frames, audio as the binary frame right after
+its "audio" event)
+- partial {text}        while the user speaks, every VOICE_PARTIAL_MS
+- transcript {text}     final transcript of the utterance
+- answer {text, seq}    each approved sentence, as soon as the critic passes it
+- audio {seq, format}   + binary frame: TTS audio for sentence `seq`
+- done {answer, citations, timings_ms}
+- cancelled {reason}    barge-in or cancel; nothing else follows for that turn
+- error {message}
+
+Barge-in: speech while a turn is running (VAD_MIN_SPEECH_MS of frames
+above the session noise floor) cancels it. The graph stops at its next node,
+LLM token or sentence (graph.streaming.TurnCancelled), and no further TTS is
+started or sent. Clients should enable echo cancellation on the microphone
+so the assistant's own voice doesn't count as speech.
+
+Configure via:
+- VOICE_ENDPOINT_MS: silence that ends an utterance (default: 800)
+- VOICE_PARTIAL_MS: new audio between partial transcripts, 0 = off (default: 1000)
+"""
+import os
+import json
+import time
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+import numpy as np
+
+from graph.streaming import stream_turn, TurnCancelled
+from graph.tracing import span
+from tts_asr.asr_whisper import transcribe
+from tts_asr.audio_io import resample
+from tts_asr.tts_client import synthesize, output_format
+from tts_asr.vad import SAMPLE_RATE, FRAME_MS, MIN_DB, frame_levels_db, vad_settings
+
+ENDPOINT_MS = float(os.getenv("VOICE_ENDPOINT_MS", "800"))
+PARTIAL_MS = float(os.getenv("VOICE_PARTIAL_MS", "1000"))
+
+
+class VoiceSession:
+    """One WebSocket connection: utterance buffering, turns, barge-in and the outgoing stream."""
+
+    def __init__(self, ws, graph, sample_rate=SAMPLE_RATE, fmt=None):
+        self.ws = ws
+        self.graph = graph
+        self.sample_rate = sample_rate
+        self.fmt = output_format(fmt)
+        self.model = os.getenv("ASR_MODEL", "small")
+        self.vad = vad_settings()
+
+        self.utterance = []  # float32 chunks at 16 kHz
+        self.levels = []  # frame levels (dBFS) of the utterance
+        self.pending = np.zeros(0, dtype=np.float32)  # samples short of a full frame
+        self.history = deque(maxlen=int(15000 / FRAME_MS))  # recent frame levels for the noise floor
+        self.partial_at = 0  # utterance samples covered by the last partial
+        self.partial_task = None
+
+        self.turn = None  # asyncio.Task of the running turn
+        self.cancel = None  # threading.Event checked by the graph
+        self.turn_id = 0
+        self.outbox = asyncio.Queue()
+
+    # -- outgoing ---------------------------------------------------------
+
+    def send(self, event, audio=None, turn=None):
+        """Queue an event (and its audio frame); dropped if its turn was cancelled."""
+        self.outbox.put_nowait((turn, event, audio))
+
+    async def sender(self):
+        """Single writer, so an "audio" event is always followed by its own frame."""
+        while True:
+            turn, event, audio = await self.outbox.get()
+            if turn is not None and turn != self.turn_id:
+                continue  # stale turn (barge-in)
+            await self.ws.send_json(event)
+            if audio is not None:
+                await self.ws.send_bytes(audio)
+
+    # -- incoming ---------------------------------------------------------
+
+    async def run(self):
+        sender = asyncio.create_task(self.sender())
+        try:
+            while True:
+                msg = await self.ws.receive()
+                if msg["type"] == "websocket.disconnect":
+                    break
+                if msg.get("bytes") is not None:
+                    await self.on_audio(msg["bytes"])
+                elif msg.get("text") is not None:
+                    await self.on_message(msg["text"])
+        finally:
+            self.cancel_turn("disconnect", notify=False)
+            sender.cancel()
+
+    async def on_message(self, text):
+        msg = json.loads(text)
+        kind = msg.get("type")
+        if kind == "end":
+            self.end_utterance()
+        elif kind == "text" and (msg.get("text") or "").strip():
+            self.start_turn(text=msg["text"])
+        elif kind == "cancel":
+            self.cancel_turn("cancel")
+        else:
+            self.send({"type": "error", "message": f"unknown message type {kind!r}"})
+
+    async def on_audio(self, data):
+        pcm = np.frombuffer(data[:len(data) // 2 * 2], dtype="<i2").astype(np.float32) / 32768
+        chunk = resample(pcm, self.sample_rate, SAMPLE_RATE)
+        self.utterance.append(chunk)
+        voiced = self.track_levels(chunk)
+
+        if voiced.any() and self.turn is not None and not self.turn.done() and self.speech_started():
+            self.cancel_turn("barge_in")
+        if not self.speech_started():
+            self.drop_leading_silence()
+        elif self.trailing_silence_ms() >= ENDPOINT_MS:
+            self.end_utterance()
+        elif PARTIAL_MS:
+            self.maybe_partial()
+
+    # -- endpointing (incremental version of tts_asr.vad) ------------------
+
+    def track_levels(self, chunk):
+        """Levels of the new complete frames; returns their voiced mask."""
+        frame = int(SAMPLE_RATE * FRAME_MS / 1000)
+        audio = np.concatenate([self.pending, chunk])
+        usable = len(audio) // frame * frame
+        self.pending = audio[usable:]
+        levels = frame_levels_db(audio[:usable])
+        self.levels.extend(levels.tolist())
+        self.history.extend(levels.tolist())
+        return levels > self.threshold_db()
+
+    def threshold_db(self):
+        floor = np.percentile(self.history, 10) if self.history else MIN_DB
+        return max(floor + self.vad["margin_db"], MIN_DB)
+
+    def speech_started(self):
+        levels = np.asarray(self.levels)
+        return (levels > self.threshold_db()).sum() * FRAME_MS >= self.vad["min_speech_ms"]
+
+    def trailing_silence_ms(self):
+        voiced = np.flatnonzero(np.asarray(self.levels) > self.threshold_db())
+        last = voiced[-1] + 1 if len(voiced) else 0
+        return (len(self.levels) - last) * FRAME_MS
+
+    def drop_leading_silence(self, keep_ms=1000):
+        """Between utterances only the last keep_ms are kept (VAD padding for the next one)."""
+        keep = int(keep_ms / FRAME_MS)
+        if len(self.levels) <= 2 * keep:
+            return
+        frame = int(SAMPLE_RATE * FRAME_MS / 1000)
+        audio = np.concatenate(self.utterance)
+        self.utterance = [audio[-(keep * frame + len(self.pending)):]]
+        self.levels = self.levels[-keep:]
+
+    def reset_utterance(self):
+        audio = np.concatenate(self.utterance) if self.utterance else np.zeros(0, dtype=np.float32)
+        self.utterance, self.levels, self.pending, self.partial_at = [], [], np.zeros(0, dtype=np.float32), 0
+        return audio
+
+    def maybe_partial(self):
+        samples = sum(len(c) for c in self.utterance)
+        if samples - self.partial_at < SAMPLE_RATE * PARTIAL_MS / 1000:
+            return
+        if self.partial_task is not None and not self.partial_task.done():
+            return  # ASR is slower than real time here; skip rather than queue
+        self.partial_at = samples
+        audio = np.concatenate(self.utterance)
+
+        async def partial():
+            text = await asyncio.to_thread(transcribe, audio, self.model)
+            if text and self.utterance:  # utterance still open
+                self.send({"type": "partial", "text": text})
+        self.partial_task = asyncio.create_task(partial())
+
+    def end_utterance(self):
+        audio = self.reset_utterance()
+        if len(audio):
+            self.start_turn(audio=audio)
+
+    # -- turns ------------------------------------------------------------
+
+    def cancel_turn(self, reason, notify=True):
+        if self.turn is None or self.turn.done():
+            return
+        self.cancel.set()
+        self.turn.cancel()
+        self.turn_id += 1  # queued events of the old turn are dropped
+        if notify:
+            self.send({"type": "cancelled", "reason": reason})
+
+    def start_turn(self, audio=None, text=None):
+        self.cancel_turn("new_turn")
+        self.turn_id += 1
+        self.cancel = threading.Event()
+        self.turn = asyncio.create_task(self.run_turn(self.turn_id, self.cancel, audio, text))
+
+    async def run_turn(self, turn, cancel, audio, text):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        timings = {}
+        speak_queue = asyncio.Queue()
+
+        def elapsed():
+            return round((time.perf_counter() - start) * 1000, 1)
+
+        counter = itertools.count()
+
+        def on_sentence(verdict):  # graph worker thread
+            item = (next(counter), verdict["speech"])
+            timings.setdefault("first_sentence", elapsed())
+            loop.call_soon_threadsafe(self.send, {"type": "answer", "text": item[1], "seq": item[0]}, None, turn)
+            loop.call_soon_threadsafe(speak_queue.put_nowait, item)
+
+        async def speaker():
+            """TTS per sentence in order; text keeps flowing if TTS fails."""
+            while (item := await speak_queue.get()) is not None:
+                seq, sentence = item
+                try:
+                    audio_bytes = await asyncio.to_thread(synthesize, sentence, self.fmt)
+                except Exception as e:
+                    self.send({"type": "error", "message": f"tts: {e}"}, turn=turn)
+                    return
+                if cancel.is_set():
+                    return
+                timings.setdefault("first_audio", elapsed())
+                self.send({"type": "audio", "seq": seq, "format": self.fmt}, audio_bytes, turn=turn)
+
+        speaking = asyncio.create_task(speaker())
+        try:
+            with span("voice_turn", input="voice" if audio is not None else "text"):
+                if audio is not None:
+                    text = await asyncio.to_thread(transcribe, audio, self.model)
+                    timings["asr"] = elapsed()
+                    if not (text or "").strip():
+                        speaking.cancel()
+                        self.send({"type": "transcript", "text": ""}, turn=turn)
+                        return
+                self.send({"type": "transcript", "text": text}, turn=turn)
+
+                state = {"audio_path": None, "transcript": text, "intent": None, "plan": None,
+                         "evidence": None, "answer": None, "citations": None, "safety_flags": None,
+                         "tts_path": None, "log": []}
+                final = await asyncio.to_thread(stream_turn, self.graph, state, on_sentence, cancel)
+                timings["graph"] = elapsed()
+                speak_queue.put_nowait(None)
+                await speaking
+                timings["total"] = elapsed()
+                self.send({"type": "done", "answer": final.get("answer"), "citations": final.get("citations") or [],
+                           "timings_ms": timings}, turn=turn)
+        except (asyncio.CancelledError, TurnCancelled):
+            speaking.cancel()  # barge-in / cancel; the session already told the client
+        except Exception as e:
+            speaking.cancel()
+            self.send({"type": "error", "message": str(e)}, turn=turn)
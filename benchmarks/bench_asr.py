@@ -0,0 +1,108 @@
+"""
+Benchmark: ASR backends (tts_asr/asr_backends.py) on CPU - real-time
+factor, latency and word error rate.
+
+Samples come from a JSONL manifest of {"audio": path, "text": reference}.
+--make-samples builds one from the benchmark query corpus: each query is
+spoken with tts_asr.tts_client.synthesize (TTS_PROVIDER) into
+data/asr_samples/, and the query text is the reference.
+
+WER is reported against the references and, for every backend after the
+first, against the first backend's output ("vs_first": how far the new
+backend drifts from the current one).
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_asr.py --make-samples
+    PYTHONPATH="$PWD" python benchmarks/bench_asr.py --backends whisper faster-whisper --model small
+"""
+import os
+import re
+import json
+import time
+import argparse
+import statistics
+
+from rapidfuzz.distance import Levenshtein
+
+from tts_asr.asr_backends import SAMPLE_RATE, BACKENDS, get_backend
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+SAMPLES_DIR = os.path.join(ROOT, "data", "asr_samples")
+
+
+def words(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def wer(refs, hyps):
+    """Corpus WER: word-level edit distance over reference word count."""
+    edits = sum(Levenshtein.distance(words(r), words(h)) for r, h in zip(refs, hyps))
+    return edits / max(1, sum(len(words(r)) for r in refs))
+
+
+def make_samples(out_dir):
+    from benchmarks.bench_pipeline import load_corpus
+    from tts_asr.tts_client import synthesize
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = os.path.join(out_dir, "manifest.jsonl")
+    with open(manifest, "w") as f:
+        for i, text in enumerate(load_corpus([os.path.join(HERE, "data", "queries.jsonl")])):
+            path = os.path.join(out_dir, f"q{i:03d}.wav")
+            with open(path, "wb") as wav:
+                wav.write(synthesize(text, "wav"))
+            f.write(json.dumps({"audio": os.path.abspath(path), "text": text}) + "\n")
+    print(f"Wrote {i + 1} samples to {manifest}")
+    return manifest
+
+
+def run_backend(name, model, samples):
+    start = time.perf_counter()
+    backend = get_backend(name, model)
+    load_s = time.perf_counter() - start
+    audio = [backend.load_audio(s["audio"]) for s in samples]
+    backend.transcribe(audio[0])  # warm-up
+
+    hyps, latencies = [], []
+    for clip in audio:
+        start = time.perf_counter()
+        hyps.append(backend.transcribe(clip))
+        latencies.append(time.perf_counter() - start)
+    audio_s = sum(len(a) for a in audio) / SAMPLE_RATE
+    return {
+        "backend": name,
+        "load_s": round(load_s, 1),
+        "rtf": sum(latencies) / audio_s,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "wer": wer([s["text"] for s in samples], hyps),
+        "hyps": hyps,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--backends", nargs="+", default=["whisper", "faster-whisper"], choices=list(BACKENDS))
+    ap.add_argument("--model", default=os.getenv("ASR_MODEL", "small"))
+    ap.add_argument("--manifest", default=os.path.join(SAMPLES_DIR, "manifest.jsonl"))
+    ap.add_argument("--make-samples", action="store_true", help="synthesize the sample set first")
+    args = ap.parse_args()
+
+    if args.make_samples:
+        args.manifest = make_samples(os.path.dirname(args.manifest))
+    with open(args.manifest) as f:
+        samples = [json.loads(line) for line in f if line.strip()]
+
+    results = [run_backend(name, args.model, samples) for name in args.backends]
+    print(f"model={args.model} samples={len(samples)} beam={os.getenv('ASR_BEAM_SIZE', '1')} "
+          f"compute={os.getenv('ASR_COMPUTE_TYPE', 'int8')} (faster-whisper)")
+    print(f"{'backend':<16}{'load_s':>7}{'rtf':>7}{'p50_ms':>8}{'max_ms':>8}{'wer':>7}{'vs_first':>9}")
+    for r in results:
+        drift = f"{wer(results[0]['hyps'], r['hyps']):.1%}" if r is not results[0] else "-"
+        print(f"{r['backend']:<16}{r['load_s']:>7}{r['rtf']:>7.3f}{r['p50_ms']:>8.0f}{r['max_ms']:>8.0f}"
+              f"{r['wer']:>7.1%}{drift:>9}")
+
+
+if __name__ == "__main__":
+    main()
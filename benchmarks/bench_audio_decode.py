@@ -0,0 +1,92 @@
+"""
+Benchmark: per-utterance audio loading for ASR - the old path (write the
+recording to a temp file, decode it with an ffmpeg subprocess via
+whisper.load_audio) vs in-process WAV decode + resample to 16 kHz
+(tts_asr/audio_io.py).
+
+Clips are synthetic 16-bit WAV recordings at browser (48 kHz) and ASR
+(16 kHz) sample rates. The ffmpeg column needs ffmpeg on PATH (and
+openai-whisper); without them only the temp-file round trip is timed for
+the old path.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_audio_decode.py
+    PYTHONPATH="$PWD" python benchmarks/bench_audio_decode.py --seconds 2 5 15 --repeats 50
+"""
+import io
+import os
+import time
+import wave
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+from tts_asr.audio_io import to_asr_audio, ffmpeg_decode
+
+
+def make_wav(seconds, sr, rng):
+    audio = 0.3 * np.sin(2 * np.pi * 220 * np.arange(int(seconds * sr)) / sr) + rng.normal(0, 0.01, int(seconds * sr))
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes((audio * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def old_path(data, decode):
+    """What the UIs did: temp file, decode by path, unlink."""
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+        tmp.write(data)
+        path = tmp.name
+    try:
+        return decode(path) if decode else None
+    finally:
+        os.unlink(path)
+
+
+def median_ms(fn, repeats):
+    fn()  # warm-up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seconds", nargs="+", type=float, default=[2, 5, 15])
+    ap.add_argument("--rates", nargs="+", type=int, default=[48000, 16000])
+    ap.add_argument("--repeats", type=int, default=20)
+    args = ap.parse_args()
+
+    decode = None
+    if shutil.which("ffmpeg"):
+        try:
+            import whisper
+            decode = whisper.load_audio
+        except ImportError:
+            decode = lambda path: ffmpeg_decode(open(path, "rb").read())  # noqa: E731
+    rng = np.random.default_rng(0)
+
+    print(f"ffmpeg: {'yes' if decode else 'not found (ffmpeg column skipped)'}, repeats={args.repeats}")
+    print(f"{'clip':<12}{'bytes':>10}{'tempfile_ms':>12}{'ffmpeg_ms':>11}{'in_mem_ms':>11}{'saved_ms':>10}")
+    for sr in args.rates:
+        for seconds in args.seconds:
+            data = make_wav(seconds, sr, rng)
+            tmp_ms = median_ms(lambda: old_path(data, None), args.repeats)
+            old_ms = median_ms(lambda: old_path(data, decode), args.repeats) if decode else None
+            new_ms = median_ms(lambda: to_asr_audio(data), args.repeats)
+            saved = f"{old_ms - new_ms:.1f}" if old_ms is not None else "-"
+            print(f"{f'{seconds:g}s@{sr // 1000}k':<12}{len(data):>10}{tmp_ms:>12.2f}"
+                  f"{(f'{old_ms:.1f}' if old_ms is not None else '-'):>11}{new_ms:>11.2f}{saved:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: parallel retrieval fan-out vs. the linear graph.
+
+LLM and MCP tool calls are replaced by sleeps with configurable latencies,
+so the numbers only reflect graph orchestration.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_fanout.py --runs 20 --rag-ms 300 --web-ms 900
+"""
+import argparse
+import statistics
+import time
+
+import graph.llm_client as llm_client
+import graph.nodes.retriever as retriever
+from graph.langgraph_pipeline import build_graph
+
+
+class SleepyLLM:
+    """Stand-in for LLMClient that sleeps and returns a fixed plan/intent."""
+
+    provider = "bench"
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+
+    def chat(self, messages, **kwargs):
+        time.sleep(self.latency)
+        return "Here are two options that fit your request. (Sources: doc #A001)"
+
+    def chat_json(self, messages, **kwargs):
+        time.sleep(self.latency)
+        return {
+            "task": "product_recommendation",
+            "constraints": {},
+            "needs_live": True,
+            "safety_flags": [],
+            "sources": ["rag.search", "web.search"],
+            "query_text": messages[-1]["content"],
+            "top_k": 5,
+        }
+
+
+def fake_tool(rag_ms, web_ms):
+    def call_tool(path, payload):
+        if path.endswith("/rag.search"):
+            time.sleep(rag_ms / 1000)
+            return [{"doc_id": f"A{i:03d}", "title": f"Cleaner {i}", "price": 9.99} for i in range(payload["top_k"])]
+        time.sleep(web_ms / 1000)
+        return [{"title": f"Web cleaner {i}", "url": f"https://shop.example/{i}", "price": None} for i in range(payload["top_k"])]
+    return call_tool
+
+
+def run(graph, runs):
+    timings = []
+    for i in range(runs):
+        state = {"transcript": f"current price of stainless cleaner #{i}", "log": []}
+        start = time.perf_counter()
+        graph.invoke(state)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 1),
+        "p50_ms": round(timings[len(timings) // 2], 1),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--llm-ms", type=float, default=200)
+    ap.add_argument("--rag-ms", type=float, default=300)
+    ap.add_argument("--web-ms", type=float, default=900)
+    args = ap.parse_args()
+
+    llm_client._llm_client = SleepyLLM(args.llm_ms)
+    retriever.call_tool = fake_tool(args.rag_ms, args.web_ms)
+
+    linear = run(build_graph(parallel=False), args.runs)
+    parallel = run(build_graph(parallel=True), args.runs)
+
+    print(f"simulated latencies: llm={args.llm_ms}ms rag={args.rag_ms}ms web={args.web_ms}ms, runs={args.runs}")
+    print(f"{'graph':<10}{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}")
+    for name, res in (("linear", linear), ("parallel", parallel)):
+        print(f"{name:<10}{res['mean_ms']:>10}{res['p50_ms']:>10}{res['p95_ms']:>10}")
+    print(f"saved per query (mean): {linear['mean_ms'] - parallel['mean_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
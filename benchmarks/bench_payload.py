@@ -0,0 +1,71 @@
+"""
+Benchmark: rag.search response size and serialization time, before
+(all seven fields, FastAPI's jsonable_encoder + json.dumps) vs. after
+(field projection, empty values omitted, orjson / msgpack, gzip on the wire).
+
+Results are built from the synthetic catalog through rag_tool.format_results,
+so they carry the same empty brand / ingredients strings as the real index.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_payload.py --top-k 5 50 200 1000 --fields sku title price
+"""
+import gzip
+import time
+import argparse
+import statistics
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.catalog import synthetic_catalog
+from indexing.build_index import build_docs
+from mcp_server.tools.rag_tool import format_results
+from mcp_server.responses import project, encode_json, msgpack
+
+
+def make_results(n, seed):
+    ids, texts, metas = zip(*build_docs(synthetic_catalog(n, seed)))
+    return format_results({"ids": [list(ids)], "documents": [list(texts)], "metadatas": [list(metas)]})
+
+
+def time_us(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings), out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--top-k", type=int, nargs="+", default=[5, 50, 200, 1000])
+    ap.add_argument("--fields", nargs="*", default=["sku", "title", "price"], help="projection (planner fields)")
+    ap.add_argument("--runs", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"fields={args.fields} (+doc_id), runs={args.runs}, msgpack={'yes' if msgpack else 'not installed'}")
+    print(f"{'top_k':>6}{'before_B':>10}{'before_us':>11}{'after_B':>9}{'after_us':>10}"
+          f"{'gzip_before_B':>15}{'gzip_after_B':>14}{'msgpack_B':>11}")
+    for k in args.top_k:
+        results = make_results(k, args.seed)
+        body = {"tool": "rag.search", "timestamp": time.time(), "results": results}
+
+        before_us, before = time_us(lambda: JSONResponse(jsonable_encoder(body)).body, args.runs)
+
+        def after_fn():
+            return encode_json({"tool": "rag.search", "timestamp": body["timestamp"],
+                                "results": project(results, args.fields, ["doc_id"])})
+        after_us, after = time_us(after_fn, args.runs)
+
+        packed = ""
+        if msgpack is not None:
+            packed = len(msgpack.packb({"tool": "rag.search", "timestamp": body["timestamp"],
+                                        "results": project(results, args.fields, ["doc_id"])}))
+        print(f"{k:>6}{len(before):>10}{before_us:>11.0f}{len(after):>9}{after_us:>10.0f}"
+              f"{len(gzip.compress(before)):>15}{len(gzip.compress(after)):>14}{packed:>11}")
+
+
+if __name__ == "__main__":
+    main()
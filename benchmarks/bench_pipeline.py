@@ -0,0 +1,179 @@
+"""
+End-to-end latency benchmark: replay a query corpus through build_graph().
+
+Everything external is replaced by a local stand-in: a fake OpenAI-compatible
+LLM and a fake Brave endpoint (benchmarks/fakes.py, with configurable latency
+distributions) plus an in-process MCP server over a synthetic Chroma fixture
+index. Reports per-stage (tracing spans) and end-to-end percentiles plus
+throughput. Exits 1 when a metric regresses past the stored baseline (or no
+baseline exists) and 2 when the baseline was recorded with other settings.
+
+Record benchmarks/baselines/pipeline.json with the default arguments on the
+machine that enforces it:
+    PYTHONPATH="$PWD" python benchmarks/bench_pipeline.py --update-baseline
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_pipeline.py
+    PYTHONPATH="$PWD" python benchmarks/bench_pipeline.py --llm-latency lognormal:300,0.4 --concurrency 4
+    PYTHONPATH="$PWD" python benchmarks/bench_pipeline.py --update-baseline
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def load_corpus(paths):
+    queries = []
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    queries.append(row.get("query") or row.get("input"))
+    return [q for q in queries if q]
+
+
+def compare(results, baseline, tolerance, slack_ms):
+    """Return a list of regressions: metrics slower than baseline * (1 + tolerance) + slack."""
+    regressions = []
+    for stage, metrics in baseline.get("stages", {}).items():
+        current = results["stages"].get(stage)
+        if not current:
+            continue
+        for key in ("p50", "p95"):
+            limit = metrics[key] * (1 + tolerance) + slack_ms
+            if current[key] is not None and current[key] > limit:
+                regressions.append(f"{stage} {key}: {current[key]}ms > {limit:.1f}ms (baseline {metrics[key]}ms)")
+    if "throughput_qps" in baseline:
+        floor = baseline["throughput_qps"] * (1 - tolerance)
+        if results["throughput_qps"] < floor:
+            regressions.append(f"throughput: {results['throughput_qps']} qps < {floor:.2f} qps")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--corpus", nargs="+", default=[os.path.join(HERE, "data", "queries.jsonl"),
+                                                   os.path.join(ROOT, "prompts", "few_shots.jsonl")])
+    ap.add_argument("--repeat", type=int, default=3, help="passes over the corpus")
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--llm-latency", default="lognormal:250,0.3")
+    ap.add_argument("--web-latency", default="lognormal:400,0.3")
+    ap.add_argument("--catalog-size", type=int, default=2000)
+    ap.add_argument("--index-path", default=os.path.join(ROOT, "data", "bench_index"))
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--baseline", default=os.path.join(HERE, "baselines", "pipeline.json"))
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    ap.add_argument("--slack-ms", type=float, default=5.0, help="absolute slack for tiny stages")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--allow-missing-baseline", action="store_true",
+                    help="report only (exit 0) when no baseline file exists")
+    ap.add_argument("--json-out", help="write the full report here")
+    args = ap.parse_args()
+
+    from benchmarks.catalog import build_fixture_index
+    from benchmarks.fakes import make_app, BackgroundServer
+
+    build_fixture_index(args.index_path, args.catalog_size, args.seed)
+    fakes = make_app(args.llm_latency, args.web_latency, args.seed)
+
+    with BackgroundServer(fakes) as fake_srv:
+        # Configure stand-ins before the tool server / LLM client read their env
+        os.environ.update({
+            "INDEX_PATH": args.index_path,
+            "LLM_PROVIDER": "local",
+            "LLM_BASE_URL": f"{fake_srv.url}/v1",
+            "SEARCH_API_KEY": "bench",
+            "SEARCH_PROVIDER": "brave",
+            "BRAVE_URL": f"{fake_srv.url}/res/v1/web/search",
+            "TRACE_EXPORT": "off",
+        })
+        from mcp_server.server import app as mcp_app
+        with BackgroundServer(mcp_app) as mcp_srv:
+            os.environ["MCP_BASE"] = mcp_srv.url
+            from graph.langgraph_pipeline import build_graph
+            from graph import tracing
+
+            graph = build_graph()
+            queries = load_corpus(args.corpus)
+
+            def run_one(q):
+                # The e2e span wraps the graph.invoke root and is reported with the stages
+                with tracing.span("e2e"):
+                    graph.invoke({"transcript": q, "log": []})
+
+            run_one(queries[0])  # warm-up: model load, connections
+            tracing.reset_stats()
+            fakes.state.calls.clear()
+
+            workload = queries * args.repeat
+            wall_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(run_one, workload))
+            wall = time.perf_counter() - wall_start
+
+    stages = tracing.stage_percentiles()
+    results = {
+        "config": {k: v for k, v in vars(args).items()
+                   if k not in ("update_baseline", "allow_missing_baseline", "json_out", "baseline",
+                                 "index_path", "corpus")},
+        "queries": len(workload),
+        "wall_s": round(wall, 2),
+        "throughput_qps": round(len(workload) / wall, 2),
+        "stages": stages,
+        "stand_in_calls": dict(fakes.state.calls),
+    }
+
+    print(f"{len(workload)} queries, concurrency={args.concurrency}, "
+          f"llm={args.llm_latency}, web={args.web_latency}, catalog={args.catalog_size}")
+    print(f"{'stage':<28}{'count':>8}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}")
+    for stage, s in stages.items():
+        print(f"{stage:<28}{s['count']:>8}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}")
+    e2e = stages.get("e2e", {})
+    print(f"end-to-end: p50={e2e.get('p50')}ms p95={e2e.get('p95')}ms p99={e2e.get('p99')}ms")
+    print(f"throughput: {results['throughput_qps']} qps ({results['wall_s']}s wall)")
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"config": results["config"], "throughput_qps": results["throughput_qps"],
+                       "stages": {k: {"p50": v["p50"], "p95": v["p95"]} for k, v in stages.items()}},
+                      f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return 0 if args.allow_missing_baseline else 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatched = sorted(k for k in set(baseline.get("config", {})) | set(results["config"])
+                        if baseline.get("config", {}).get(k) != results["config"].get(k))
+    if mismatched:
+        # Numbers from a different workload are not comparable
+        for k in mismatched:
+            print(f"CONFIG MISMATCH {k}: baseline={baseline.get('config', {}).get(k)!r} "
+                  f"current={results['config'].get(k)!r}")
+        print(f"Refusing to compare; rerun with the baseline's settings or pass "
+              f"--baseline <file> --update-baseline to record one for this configuration.")
+        return 2
+    regressions = compare(results, baseline, args.tolerance, args.slack_ms)
+    for r in regressions:
+        print(f"REGRESSION {r}")
+    print("FAIL" if regressions else "OK: no regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
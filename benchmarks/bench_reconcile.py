@@ -0,0 +1,79 @@
+"""
+Benchmark: evidence reconciliation (graph.nodes.answerer.reconcile) vs. the
+previous per-pair token_set_ratio loop, at growing candidate counts.
+
+Titles come from the synthetic catalog; web titles are noisy copies of a
+share of the RAG titles with drifted prices, so matches and conflicts exist.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_reconcile.py --sizes 10 50 200 500
+"""
+import time
+import random
+import argparse
+import statistics
+
+from rapidfuzz import fuzz
+
+from benchmarks.catalog import synthetic_catalog
+from graph.nodes.answerer import reconcile
+
+
+def reference_reconcile(rag_items, web_items):
+    """The original O(R x W) Python loop: best web title per RAG item."""
+    out = []
+    for r in rag_items:
+        match, score_best = None, 0
+        for w in web_items:
+            s = fuzz.token_set_ratio(r.get("title", ""), w.get("title", ""))
+            if s > score_best:
+                score_best, match = s, w
+        out.append((r, match if score_best > 80 else None))
+    return out
+
+
+def make_evidence(n, seed):
+    rng = random.Random(seed)
+    df = synthetic_catalog(2 * n, seed)
+    rag = [{"doc_id": row["Uniq Id"], "title": row["Product Name"], "price": float(row["Selling Price"][1:])}
+           for _, row in df.head(n).iterrows()]
+    web = []
+    for i, row in enumerate(df.tail(n).itertuples()):
+        if rng.random() < 0.3:  # the same product listed elsewhere
+            src = rng.choice(rag)
+            title, price = f"{src['title']} - Free Shipping", src["price"] * rng.uniform(0.8, 1.3)
+        else:
+            title, price = f"{row[2]} | Shop", None
+        web.append({"title": title, "url": f"https://shop.example/{i}", "price": price})
+    return rag, web
+
+
+def time_ms(fn, *args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[5, 15, 50, 200, 500], help="candidates per side")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"{'per_side':>9}{'loop_ms':>10}{'cdist_ms':>10}{'speedup':>9}{'matches':>9}{'conflicts':>11}")
+    for n in args.sizes:
+        rag, web = make_evidence(n, args.seed)
+        loop_ms = time_ms(reference_reconcile, rag, web, runs=args.runs)
+        new_ms = time_ms(reconcile, rag, web, runs=args.runs)
+        out = reconcile(rag, web)
+        matches = sum(1 for e in out if e["web_match"])
+        conflicts = sum(1 for e in out if e["conflict"])
+        print(f"{n:>9}{loop_ms:>10.2f}{new_ms:>10.2f}{loop_ms / new_ms:>8.1f}x{matches:>9}{conflicts:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: category-sharded collections (indexing/build_index.py with
+INDEX_SHARDING=category, queried through mcp_server/tools/shards.py) vs.
+the single amazon2020 collection - query latency and recall@k against an
+exact scan, as the catalog grows.
+
+Embeddings are synthetic (no model needed): each top-level category is a
+direction in embedding space with subcategory clusters around it. Queries
+are perturbed catalog items, so most neighbours share the item's
+category but some spill over into others - which is what costs recall
+when too few shards are probed. Both indexes are Chroma HNSW with the
+default settings, built with the repo's own builder functions in a
+temporary directory. Query embedding time is excluded (same for both).
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_shards.py --sizes 20000 100000 --probe 1 2 3
+"""
+import time
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+from indexing.build_index import add_batched, build_sharded_index
+from mcp_server.tools.shards import ShardedIndex
+
+
+def synthetic_embeddings(n, categories, dim, rng, subclusters=8, spread=0.9, noise=0.6):
+    """(docs, unit vectors): n products in `categories` top-level categories."""
+    tops = rng.normal(size=(categories, dim))
+    subs = tops[:, None, :] + spread * rng.normal(size=(categories, subclusters, dim))
+    cat = rng.integers(0, categories, n)
+    sub = rng.integers(0, subclusters, n)
+    vectors = subs[cat, sub] + noise * rng.normal(size=(n, dim))
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    docs = [(f"p{i:07d}", f"product {i}", {"category": f"Category {c} | Sub {s}", "price": 1.0})
+            for i, (c, s) in enumerate(zip(cat, sub))]
+    return docs, vectors
+
+
+def exact_top_k(vectors, queries, k):
+    sims = queries @ vectors.T
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return [set(f"p{i:07d}" for i in row) for row in top]
+
+
+def measure(search, queries, truth, k):
+    """p50/p95 latency (ms) and mean recall@k of search(vector) -> ids."""
+    times, recalls = [], []
+    for q, expected in zip(queries, truth):
+        start = time.perf_counter()
+        ids = search(q)
+        times.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(set(ids) & expected) / k)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)], statistics.mean(recalls)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", nargs="+", type=int, default=[20000, 100000])
+    ap.add_argument("--categories", type=int, default=20)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--top-k", type=int, default=10)
+    ap.add_argument("--probe", nargs="+", type=int, default=[1, 2, 3])
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    import chromadb
+
+    print(f"categories={args.categories} dim={args.dim} queries={args.queries} top_k={args.top_k}")
+    print(f"{'products':>9}  {'index':<16}{'build_s':>8}{'p50_ms':>8}{'p95_ms':>8}{'recall':>8}")
+    for n in args.sizes:
+        rng = np.random.default_rng(args.seed)
+        docs, vectors = synthetic_embeddings(n, args.categories, args.dim, rng)
+        picks = rng.choice(n, args.queries, replace=False)
+        queries = vectors[picks] + 0.5 * rng.normal(size=(args.queries, args.dim)) / np.sqrt(args.dim)
+        queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+        truth = exact_top_k(vectors, queries, args.top_k)
+
+        with tempfile.TemporaryDirectory() as path:
+            client = chromadb.PersistentClient(path=path)
+            start = time.perf_counter()
+            single = client.create_collection("amazon2020", embedding_function=None)
+            add_batched(single, docs, vectors)
+            single_build = time.perf_counter() - start
+            start = time.perf_counter()
+            build_sharded_index(client, docs, vectors, min_size=0)
+            shard_build = time.perf_counter() - start
+
+            def search_single(q):
+                return single.query(query_embeddings=[q.tolist()], n_results=args.top_k)["ids"][0]
+
+            rows = [("single", single_build, search_single)]
+            sharded = ShardedIndex(client)
+            for probe in args.probe:
+                rows.append((f"sharded probe={probe}", shard_build,
+                             lambda q, probe=probe: sharded.query(q, args.top_k, probe=probe)["ids"][0]))
+            for name, build_s, search in rows:
+                search(queries[0])  # warm-up: load the HNSW segment
+                p50, p95, recall = measure(search, queries, truth, args.top_k)
+                print(f"{n:>9}  {name:<16}{build_s:>8.1f}{p50:>8.2f}{p95:>8.2f}{recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
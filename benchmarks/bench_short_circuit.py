@@ -0,0 +1,94 @@
+"""
+Benchmark: short-circuit routing (SHORT_CIRCUIT_ROUTING) on a mixed query
+set - product queries plus safety-flagged and out-of-scope ones
+(benchmarks/data/queries_offtopic.jsonl).
+
+- full: every turn runs router -> planner -> retrieval -> answerer ->
+  critic, and the critic replaces safety answers with the refusal
+- short-circuit: flagged / out-of-scope turns go from the router to the
+  templated responder
+
+The LLM and MCP tools are the local stand-ins from benchmarks/fakes.py
+(the fake router flags "mix bleach", "weather", "joke", ...), so latency
+is LLM/tool waiting plus orchestration. Reports LLM and tool calls per
+mode and per-turn latency for the off-topic and product subsets.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_short_circuit.py --llm-latency lognormal:250,0.3 --tool-latency fixed:80
+"""
+import os
+import time
+import argparse
+import statistics
+from collections import Counter
+
+from benchmarks.fakes import make_app, BackgroundServer
+from benchmarks.bench_pipeline import load_corpus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+LLM_ROLES = ("router", "planner", "answerer")
+TOOLS = ("rag.search", "web.search")
+
+
+def run(graph, queries, calls):
+    """Per-query (latency_s, short-circuit reason or None, answer) and the stand-in calls made."""
+    before = Counter(calls)
+    rows = []
+    for q in queries:
+        start = time.perf_counter()
+        final = graph.invoke({"transcript": q, "log": []})
+        reason = next((e["reason"] for e in final.get("log") or [] if e.get("node") == "responder"), None)
+        rows.append((time.perf_counter() - start, reason, final.get("answer") or ""))
+    return rows, Counter(calls) - before
+
+
+def p50_ms(values):
+    return f"{statistics.median(values) * 1000:.0f}" if values else "-"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--corpus", nargs="+", default=[os.path.join(HERE, "data", "queries.jsonl"),
+                                                   os.path.join(ROOT, "prompts", "few_shots.jsonl"),
+                                                   os.path.join(HERE, "data", "queries_offtopic.jsonl")])
+    ap.add_argument("--llm-latency", default="lognormal:250,0.3")
+    ap.add_argument("--web-latency", default="lognormal:400,0.3")
+    ap.add_argument("--tool-latency", default="fixed:80")
+    args = ap.parse_args()
+
+    fakes = make_app(args.llm_latency, args.web_latency, seed=7, tool_latency=args.tool_latency)
+    with BackgroundServer(fakes) as srv:
+        os.environ.update({"LLM_PROVIDER": "local", "LLM_BASE_URL": f"{srv.url}/v1", "MCP_BASE": srv.url,
+                           "TRACE_EXPORT": "off", "SPECULATIVE_RETRIEVAL": "false"})
+        from graph.langgraph_pipeline import build_graph
+
+        queries = load_corpus(args.corpus)
+        graphs = {"full": build_graph(short_circuit=False), "short-circuit": build_graph(short_circuit=True)}
+        graphs["full"].invoke({"transcript": queries[0], "log": []})  # warm-up: connections
+        results = {mode: run(graph, queries, fakes.state.calls) for mode, graph in graphs.items()}
+
+    reasons = [reason for _, reason, _ in results["short-circuit"][0]]
+    offtopic = [reason is not None for reason in reasons]
+    print(f"{len(queries)} queries ({sum(offtopic)} safety/out-of-scope), llm={args.llm_latency} "
+          f"tools={args.tool_latency} web={args.web_latency}")
+    print(f"{'mode':<15}{'llm_calls':>10}{'tool_calls':>11}{'total_s':>9}{'offtopic_p50_ms':>17}{'product_p50_ms':>16}")
+    for mode, (rows, calls) in results.items():
+        off = [t for (t, _, _), o in zip(rows, offtopic) if o]
+        on = [t for (t, _, _), o in zip(rows, offtopic) if not o]
+        print(f"{mode:<15}{sum(calls[r] for r in LLM_ROLES):>10}{sum(calls[t] for t in TOOLS):>11}"
+              f"{sum(t for t, _, _ in rows):>9.2f}{p50_ms(off):>17}{p50_ms(on):>16}")
+
+    full, short = (results[m][1] for m in ("full", "short-circuit"))
+    saved_llm = sum(full[r] - short[r] for r in LLM_ROLES)
+    saved_s = sum(t for t, _, _ in results["full"][0]) - sum(t for t, _, _ in results["short-circuit"][0])
+    print(f"saved: {saved_llm} LLM calls ({', '.join(f'{r} {full[r] - short[r]}' for r in LLM_ROLES)}), "
+          f"{sum(full[t] - short[t] for t in TOOLS)} tool calls, {saved_s:.2f}s of turn latency")
+    pairs = [(a, b) for (_, _, a), (_, _, b), r in zip(results["full"][0], results["short-circuit"][0], reasons)
+             if r == "safety"]
+    print(f"safety refusals identical to the full graph's: {sum(a == b for a, b in pairs)}/{len(pairs)}; "
+          f"out-of-scope replies ({reasons.count('out_of_scope')}) are templated instead of generated")
+
+
+if __name__ == "__main__":
+    main()
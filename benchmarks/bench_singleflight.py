@@ -0,0 +1,69 @@
+"""
+Benchmark: single-flight coalescing of identical in-flight /web.search calls.
+
+Bursts of --concurrency clients send the same query (with case/whitespace
+variations) to an in-process mcp_server.server at the same moment; web.search
+goes to the fake Brave endpoint. Reports upstream Brave calls, coalesced
+requests and client latency with MCP_SINGLEFLIGHT on and off.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_singleflight.py --bursts 20 --concurrency 8 --web-latency fixed:300
+"""
+import os
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks.fakes import make_app, BackgroundServer
+
+VARIANTS = ["{q}", "{Q}", "  {q} ", "{q}  "]
+
+
+def run(url, bursts, concurrency, distinct):
+    latencies = []
+
+    def call(i, burst):
+        q = f"stainless steel cleaner {burst % distinct}"
+        payload = {"query": VARIANTS[i % len(VARIANTS)].format(q=q, Q=q.title()), "top_k": 5}
+        start = time.perf_counter()
+        httpx.post(f"{url}/web.search", json=payload, timeout=30).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for burst in range(bursts):
+            list(pool.map(call, range(concurrency), [burst] * concurrency))
+    return latencies
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--bursts", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=8, help="identical requests per burst")
+    ap.add_argument("--distinct", type=int, default=5, help="distinct queries cycled across bursts")
+    ap.add_argument("--web-latency", default="fixed:300", help="fake Brave latency spec")
+    args = ap.parse_args()
+
+    fakes = make_app(web_latency=args.web_latency, seed=7)
+    with BackgroundServer(fakes) as brave:
+        # web_tool reads BRAVE_URL at import
+        os.environ.update({"SEARCH_API_KEY": "bench", "SEARCH_PROVIDER": "brave",
+                           "BRAVE_URL": f"{brave.url}/res/v1/web/search", "MCP_WARMUP": "false"})
+        from mcp_server.server import app, flights
+        with BackgroundServer(app) as mcp:
+            print(f"bursts={args.bursts} x {args.concurrency} identical, brave={args.web_latency}")
+            print(f"{'singleflight':<14}{'requests':>9}{'brave_calls':>13}{'coalesced':>11}{'p50_ms':>9}{'max_ms':>9}")
+            for enabled in ("false", "true"):
+                os.environ["MCP_SINGLEFLIGHT"] = enabled
+                fakes.state.calls.clear()
+                before = flights["web.search"].coalesced
+                latencies = run(mcp.url, args.bursts, args.concurrency, args.distinct)
+                coalesced = flights["web.search"].coalesced - before
+                print(f"{enabled:<14}{len(latencies):>9}{fakes.state.calls['web']:>13}{coalesced:>11}"
+                      f"{statistics.median(latencies):>9.1f}{max(latencies):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: MCP tool server start-up, lazy (current) vs. eager loading.
+
+Each run starts a fresh `uvicorn mcp_server.server:app` subprocess (like a
+deploy or a worker restart) over the synthetic fixture index and records:
+- listen_ms:    spawn -> first 200 from /healthz (server accepts connections)
+- ready_ms:     spawn -> first 200 from /readyz (embedding model + index warm)
+- first_rag_ms: latency of the first /rag.search after ready
+
+The eager mode loads the model and index before uvicorn binds its socket,
+which is what importing rag_tool used to do.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_startup.py --runs 3
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+import httpx
+
+from benchmarks.loadtest_mcp import ROOT, free_port
+
+EAGER = ("from mcp_server.tools import rag_tool; rag_tool.warmup(); import uvicorn; "
+         "uvicorn.run('mcp_server.server:app', host='127.0.0.1', port={port}, log_level='warning')")
+
+
+def wait_for(url, start, deadline, proc):
+    """ms from start until url returns 200, or None if warmup failed, the process died or timed out."""
+    while time.perf_counter() < deadline and proc.poll() is None:
+        try:
+            r = httpx.get(url, timeout=1)
+            if r.status_code == 200:
+                return round((time.perf_counter() - start) * 1000, 1)
+            if r.json().get("status") == "error":
+                return None
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def start_once(mode, env, timeout):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    if mode == "eager":
+        cmd = [sys.executable, "-c", EAGER.format(port=port)]
+        env = dict(env, MCP_WARMUP="false")
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "mcp_server.server:app", "--host", "127.0.0.1",
+               "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        deadline = start + timeout
+        listen = wait_for(f"{url}/healthz", start, deadline, proc)
+        ready = wait_for(f"{url}/readyz", start, deadline, proc) if listen is not None else None
+        first_rag = None
+        if ready is not None:
+            t = time.perf_counter()
+            r = httpx.post(f"{url}/rag.search", json={"query": "stainless steel cleaner", "top_k": 5}, timeout=60)
+            if r.status_code == 200:
+                first_rag = round((time.perf_counter() - t) * 1000, 1)
+        return listen, ready, first_rag
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def median(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values):.1f}" if values else "-"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--modes", nargs="+", default=["lazy", "eager"], choices=["lazy", "eager"])
+    ap.add_argument("--catalog-size", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--index-path", default="data/bench_index")
+    ap.add_argument("--timeout", type=float, default=600, help="seconds per start before giving up")
+    args = ap.parse_args()
+
+    from benchmarks.catalog import build_fixture_index
+    try:
+        build_fixture_index(args.index_path, args.catalog_size, args.seed)
+    except Exception as e:
+        print(f"[bench_startup] Fixture index unavailable ({e}); ready/first_rag will be '-'")
+
+    env = dict(os.environ, INDEX_PATH=os.path.abspath(args.index_path), PYTHONPATH=ROOT)
+    print(f"catalog={args.catalog_size} runs={args.runs} (medians, ms; '-' = never ready)")
+    print(f"{'mode':<8}{'listen_ms':>11}{'ready_ms':>10}{'first_rag_ms':>14}")
+    for mode in args.modes:
+        results = [start_once(mode, env, args.timeout) for _ in range(args.runs)]
+        listen, ready, first_rag = zip(*results)
+        print(f"{mode:<8}{median(listen):>11}{median(ready):>10}{median(first_rag):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: time to first audio with the streaming answerer + sentence critic
+vs. the batch answerer -> critic -> TTS path.
+
+The LLM streams a canned answer word by word, tools and TTS sleep, so the
+numbers only reflect orchestration. The canned answer contains one
+ungrounded price and one unknown citation for the critic to repair.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_streaming.py --runs 10 --token-ms 30 --tts-ms-per-char 4
+"""
+import time
+import argparse
+import statistics
+
+import graph.llm_client as llm_client
+import graph.nodes.retriever as retriever
+from graph.langgraph_pipeline import build_graph
+from graph.nodes.critic import speech_text
+from graph.streaming import stream_turn, SentenceSpeaker
+from benchmarks.bench_fanout import SleepyLLM, fake_tool
+
+ANSWER = ("My top pick is Cleaner 0 at $9.99, a plant-based spray that leaves no streaks. "
+          "Cleaner 1 is a good backup if you need a bigger bottle at $12.50. "
+          "Both are rated well by buyers who clean stainless appliances every week. "
+          "See details on your screen. (Sources: doc #A000, doc #A999)")
+
+
+class StreamingSleepyLLM(SleepyLLM):
+    """SleepyLLM whose answer also streams word by word."""
+
+    def __init__(self, latency_ms, token_ms):
+        super().__init__(latency_ms)
+        self.token = token_ms / 1000
+
+    def chat(self, messages, **kwargs):
+        time.sleep(self.latency + self.token * len(ANSWER.split()))
+        return ANSWER
+
+    def chat_stream(self, messages, **kwargs):
+        time.sleep(self.latency)
+        for word in ANSWER.split(" "):
+            time.sleep(self.token)
+            yield word + " "
+
+
+def fake_tts(ms_per_char):
+    def synthesize(text):
+        time.sleep(len(text) * ms_per_char / 1000)
+        return b"\0" * len(text)
+    return synthesize
+
+
+def p50(values):
+    return round(statistics.median(values), 1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=10)
+    ap.add_argument("--llm-ms", type=float, default=200, help="time to first token / JSON response")
+    ap.add_argument("--token-ms", type=float, default=30, help="per streamed word")
+    ap.add_argument("--tts-ms-per-char", type=float, default=4)
+    args = ap.parse_args()
+
+    llm_client._llm_client = StreamingSleepyLLM(args.llm_ms, args.token_ms)
+    retriever.call_tool = fake_tool(50, 100)
+    tts = fake_tts(args.tts_ms_per_char)
+
+    batch_graph, stream_graph = build_graph(), build_graph(streaming=True)
+    batch, stream, total_batch, total_stream = [], [], [], []
+    for i in range(args.runs):
+        state = {"transcript": f"stainless steel cleaner #{i}", "log": []}
+
+        start = time.perf_counter()
+        final = batch_graph.invoke(dict(state))
+        tts(speech_text(final["answer"]))
+        batch.append((time.perf_counter() - start) * 1000)
+        total_batch.append(batch[-1])
+
+        speaker = SentenceSpeaker(tts)  # first_audio_ms is measured from here
+        final = stream_turn(stream_graph, dict(state), speaker)
+        speaker.chunks()
+        stream.append(speaker.first_audio_ms)
+        total_stream.append((time.perf_counter() - speaker.start) * 1000)
+
+    critic_log = next(e for e in final["log"] if e.get("node") == "critic")
+    print(f"llm={args.llm_ms}ms + {args.token_ms}ms/word, tts={args.tts_ms_per_char}ms/char, runs={args.runs}")
+    print(f"{'path':<10}{'first_audio_ms':>16}{'all_audio_ms':>14}")
+    print(f"{'batch':<10}{p50(batch):>16}{p50(total_batch):>14}")
+    print(f"{'stream':<10}{p50(stream):>16}{p50(total_stream):>14}")
+    print(f"critic: {critic_log['sentences']} issues={critic_log['issues']}")
+    print(f"answer: {final['answer']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: TTS providers (tts_asr/tts_providers.py) - load time, latency
+per reply and real-time factor (synthesis time / audio duration, < 1 is
+faster than playback).
+
+Texts are spoken-style replies of different lengths, from a one-sentence
+acknowledgement to a full answer. Providers that can't load here (no API
+key, package or voice model) are listed with the reason.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_tts.py --providers openai piper espeak --repeats 3
+"""
+import time
+import argparse
+import statistics
+
+from tts_asr.tts_providers import PROVIDERS, get_provider, wav_duration_s
+
+TEXTS = [
+    "Sure, let me look that up.",
+    "My top pick is the plant-based stainless steel cleaner at nine ninety-nine.",
+    "My top pick is Cleaner Zero at nine ninety-nine, a plant-based spray that leaves no streaks. "
+    "Cleaner One is a good backup if you need a bigger bottle at twelve fifty. "
+    "Both are rated well by buyers who clean stainless appliances every week.",
+]
+
+
+def run_provider(name, repeats):
+    start = time.perf_counter()
+    provider = get_provider(name)
+    load_s = time.perf_counter() - start
+    provider.synthesize(TEXTS[0])  # warm-up (connection / first inference)
+
+    rows = []
+    for text in TEXTS:
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            audio = provider.synthesize(text)
+            latencies.append(time.perf_counter() - start)
+        latency = statistics.median(latencies)
+        rows.append({"chars": len(text), "p50_ms": latency * 1000, "audio_s": wav_duration_s(audio),
+                     "bytes": len(audio)})
+    return load_s, rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--providers", nargs="+", default=list(PROVIDERS), choices=list(PROVIDERS))
+    ap.add_argument("--repeats", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'provider':<10}{'load_s':>7}{'chars':>7}{'p50_ms':>8}{'audio_s':>8}{'rtf':>7}{'kB':>7}")
+    for name in args.providers:
+        try:
+            load_s, rows = run_provider(name, args.repeats)
+        except Exception as e:
+            print(f"{name:<10}unavailable: {type(e).__name__}: {str(e)[:80]}")
+            continue
+        for r in rows:
+            rtf = r["p50_ms"] / 1000 / r["audio_s"] if r["audio_s"] else float("nan")
+            print(f"{name:<10}{load_s:>7.1f}{r['chars']:>7}{r['p50_ms']:>8.0f}{r['audio_s']:>8.1f}{rtf:>7.2f}"
+                  f"{r['bytes'] / 1024:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: bytes per reply and time-to-playable for TTS output formats
+(tts_asr/tts_client.py).
+
+- old: provider WAV written to out.wav and read back for the player
+- wav / mp3 / opus: synthesize(text, fmt) bytes, in memory
+- stream: time to the first chunk with synthesize_stream() (providers
+  that stream, i.e. OpenAI mp3/opus)
+
+--provider synthetic replaces the TTS engine with a generated 24 kHz
+voice-like signal (about 14 characters per second, no synthesis cost), so
+the numbers isolate file handling and encoding. mp3/opus need ffmpeg on
+PATH; without it those rows are skipped.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_tts_formats.py --provider synthetic
+    PYTHONPATH="$PWD" TTS_BITRATE=32k python benchmarks/bench_tts_formats.py --provider openai --formats wav mp3 opus
+"""
+import io
+import os
+import time
+import wave
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+from tts_asr import tts_providers
+from tts_asr.tts_client import synthesize, synthesize_stream, output_format
+from benchmarks.bench_tts import TEXTS
+from benchmarks.bench_vad import synth_speech
+
+
+class SyntheticTTS:
+    """Voice-like tones at 24 kHz, duration proportional to the text."""
+
+    name = "synthetic"
+    formats = ("wav",)
+    sample_rate = 24000
+
+    def synthesize(self, text, fmt="wav"):
+        rng = np.random.default_rng(len(text))
+        audio = synth_speech(len(text) / 14, rng, self.sample_rate)
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes((np.clip(audio * 3, -1, 1) * 32767).astype("<i2").tobytes())
+        return buf.getvalue()
+
+
+OLD_PATH = os.path.join(tempfile.gettempdir(), "out.wav")
+
+
+def old_path(text):
+    """What synthesize() used to do: write the shared out.wav, the player then reads it."""
+    with open(OLD_PATH, "wb") as f:
+        f.write(tts_providers.get_provider().synthesize(text))
+    with open(OLD_PATH, "rb") as f:
+        return f.read()
+
+
+def first_chunk(text, fmt):
+    chunks = synthesize_stream(text, fmt)
+    chunk = next(chunks)
+    chunks.close()
+    return chunk
+
+
+def measure(fn, repeats):
+    times, out = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--provider", default=os.getenv("TTS_PROVIDER", "synthetic"),
+                    choices=["synthetic", *tts_providers.PROVIDERS])
+    ap.add_argument("--formats", nargs="+", default=["wav", "mp3", "opus"])
+    ap.add_argument("--repeats", type=int, default=5)
+    args = ap.parse_args()
+
+    tts_providers.PROVIDERS["synthetic"] = SyntheticTTS
+    os.environ["TTS_PROVIDER"] = args.provider
+    provider = tts_providers.get_provider()
+    provider.synthesize(TEXTS[0])  # load / warm up
+
+    rows = [("old", old_path)]
+    for fmt in args.formats:
+        if output_format(fmt) != fmt:
+            print(f"skipping {fmt}: needs ffmpeg (not found)")
+            continue
+        rows.append((fmt, lambda text, fmt=fmt: synthesize(text, fmt)))
+        if hasattr(provider, "stream") and fmt != "wav":
+            rows.append((f"{fmt}-stream", lambda text, fmt=fmt: first_chunk(text, fmt)))
+
+    print(f"provider={args.provider} bitrate={os.getenv('TTS_BITRATE', '48k')} ffmpeg={bool(shutil.which('ffmpeg'))}")
+    print(f"{'format':<13}{'chars':>6}{'playable_ms':>12}{'bytes':>9}{'vs_wav':>8}")
+    try:
+        for text in TEXTS:
+            wav_bytes = None
+            for name, fn in rows:
+                ms, audio = measure(lambda: fn(text), args.repeats)
+                wav_bytes = wav_bytes or len(audio)
+                size = "-" if name.endswith("-stream") else len(audio)
+                ratio = "-" if size == "-" else f"{size / wav_bytes:.0%}"
+                print(f"{name:<13}{len(text):>6}{ms:>12.1f}{size:>9}{ratio:>8}")
+    finally:
+        if os.path.exists(OLD_PATH):
+            os.remove(OLD_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: audio seconds and ASR latency with and without VAD silence
+trimming (tts_asr/vad.py).
+
+Samples are synthetic recordings (voiced syllable bursts over a noise floor,
+with leading/trailing silence and mid-utterance pauses), plus any --audio
+files (decoded with whisper.load_audio, needs ffmpeg). ASR latency columns
+need openai-whisper; without it only the audio reduction is reported.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_vad.py --model tiny
+    PYTHONPATH="$PWD" python benchmarks/bench_vad.py --audio recordings/*.wav --model small
+"""
+import time
+import argparse
+
+import numpy as np
+
+from tts_asr.vad import SAMPLE_RATE, trim_silence
+
+# (name, [(kind, seconds), ...])
+LAYOUTS = [
+    ("short_query", [("silence", 1.0), ("speech", 2.5), ("silence", 1.5)]),
+    ("mid_pause", [("silence", 0.8), ("speech", 2.0), ("silence", 2.0), ("speech", 1.5), ("silence", 1.2)]),
+    ("late_start", [("silence", 3.0), ("speech", 3.0), ("silence", 0.5)]),
+    ("continuous", [("silence", 0.2), ("speech", 6.0), ("silence", 0.2)]),
+]
+
+
+def synth_speech(seconds, rng, sr=SAMPLE_RATE):
+    """Voiced 'syllables': harmonic tones with a Hann envelope and short gaps."""
+    out = []
+    while sum(map(len, out)) < seconds * sr:
+        n = int(sr * rng.uniform(0.15, 0.25))
+        t = np.arange(n) / sr
+        f0 = rng.uniform(100, 220)
+        tone = sum(np.sin(2 * np.pi * f0 * h * t) / h for h in range(1, 6))
+        out.append(0.1 * tone * np.hanning(n))
+        out.append(np.zeros(int(sr * 0.05)))
+    return np.concatenate(out)[:int(seconds * sr)]
+
+
+def synth_sample(layout, rng, noise_db, sr=SAMPLE_RATE):
+    parts = [synth_speech(s, rng, sr) if kind == "speech" else np.zeros(int(s * sr)) for kind, s in layout]
+    audio = np.concatenate(parts)
+    audio += rng.normal(0, 10 ** (noise_db / 20), len(audio))
+    return audio.astype(np.float32)
+
+
+def load_samples(args):
+    rng = np.random.default_rng(args.seed)
+    samples = [(name, synth_sample(layout, rng, args.noise_db)) for name, layout in LAYOUTS]
+    if args.audio:
+        import whisper
+        samples += [(path, whisper.load_audio(path)) for path in args.audio]
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--audio", nargs="*", default=[], help="extra recordings")
+    ap.add_argument("--model", default="tiny", help="Whisper model for the latency columns")
+    ap.add_argument("--noise-db", type=float, default=-55, help="synthetic noise floor (dBFS)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    try:
+        from tts_asr.asr_whisper import get_model
+        model = get_model(args.model)
+    except ImportError:
+        model = None
+
+    def asr_ms(audio):
+        if model is None or not len(audio):
+            return None
+        start = time.perf_counter()
+        model.transcribe(audio)
+        return (time.perf_counter() - start) * 1000
+
+    def fmt(ms):
+        return f"{ms:.0f}" if ms is not None else "-"
+
+    print(f"noise={args.noise_db} dBFS, asr={'whisper ' + args.model if model else 'not installed'}")
+    print(f"{'sample':<16}{'input_s':>8}{'speech_s':>9}{'cut':>6}{'segs':>5}{'vad_ms':>8}{'asr_ms':>8}{'asr_vad_ms':>11}")
+    total_in = total_speech = 0
+    for name, audio in load_samples(args):
+        start = time.perf_counter()
+        speech, info = trim_silence(audio)
+        vad_ms = (time.perf_counter() - start) * 1000
+        total_in += info["input_s"]
+        total_speech += info["speech_s"]
+        cut = 1 - info["speech_s"] / info["input_s"]
+        print(f"{name[:15]:<16}{info['input_s']:>8}{info['speech_s']:>9}{cut:>6.0%}{info['segments']:>5}"
+              f"{vad_ms:>8.1f}{fmt(asr_ms(audio)):>8}{fmt(asr_ms(speech)):>11}")
+    print(f"total: {total_in:.1f}s -> {total_speech:.1f}s of audio ({1 - total_speech / total_in:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: perceived latency of the full-duplex /voice WebSocket
+(app/voice.py) vs. record -> upload -> wait -> play, plus barge-in.
+
+- upload: ASR of the whole recording, batch graph (answerer + critic), TTS
+  of the whole answer; the user hears audio when all of it is done
+- websocket: mic audio streamed in 20 ms frames in real time; measured
+  from the end of speech (endpointing silence included) to the first
+  audio chunk and to the last one
+- barge-in: the user talks over the first reply; time from the start of
+  that speech to the "cancelled" event, and LLM words generated afterwards
+
+ASR, LLM (streaming), tools and TTS are sleeps with configurable costs, so
+the numbers reflect orchestration.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_voice_ws.py --runs 5 --token-ms 30 --tts-ms-per-char 4
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+import numpy as np
+import websockets
+
+import graph.llm_client as llm_client
+import graph.nodes.retriever as retriever
+from graph.langgraph_pipeline import build_graph
+from graph.nodes.critic import speech_text
+from benchmarks.bench_fanout import fake_tool
+from benchmarks.bench_streaming import StreamingSleepyLLM, fake_tts
+from benchmarks.bench_vad import synth_speech
+from benchmarks.fakes import BackgroundServer
+
+SR = 16000
+FRAME_S = 0.02
+
+
+class CountingLLM(StreamingSleepyLLM):
+    """Counts streamed words, to see generation stop after a barge-in."""
+
+    words = 0
+
+    def chat_stream(self, messages, **kwargs):
+        for word in super().chat_stream(messages, **kwargs):
+            CountingLLM.words += 1
+            yield word
+
+
+def fake_asr(ms_per_audio_s):
+    def transcribe(audio, model_name="small", sample_rate=None):
+        time.sleep(len(audio) / SR * ms_per_audio_s / 1000)
+        return "stainless steel cleaner"
+    return transcribe
+
+
+def pcm_frames(seconds, rng, speech=True):
+    audio = synth_speech(seconds, rng) if speech else np.zeros(int(seconds * SR))
+    audio = audio + rng.normal(0, 10 ** (-55 / 20), len(audio))
+    pcm = (np.clip(audio * 3, -1, 1) * 32767).astype("<i2")
+    step = int(SR * FRAME_S)
+    return [pcm[i:i + step].tobytes() for i in range(0, len(pcm), step)]
+
+
+async def stream_audio(ws, frames):
+    """Send frames in real time (one every 20 ms)."""
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        await ws.send(frame)
+        await asyncio.sleep(max(0, start + (i + 1) * FRAME_S - time.perf_counter()))
+
+
+async def ws_turn(url, rng, speech_s, barge_in=False):
+    async with websockets.connect(f"{url.replace('http', 'ws')}/voice") as ws:
+        await stream_audio(ws, pcm_frames(0.5, rng, speech=False))  # noise floor
+        await stream_audio(ws, pcm_frames(speech_s, rng))
+        end_of_speech = time.perf_counter()
+        silence = asyncio.create_task(stream_audio(ws, pcm_frames(3.0, rng, speech=False)))
+        first = last = None
+        result = {}
+        while True:
+            msg = await asyncio.wait_for(ws.recv(), 30)
+            if isinstance(msg, bytes):
+                last = time.perf_counter()
+                if first is None:
+                    first = last
+                    if barge_in:
+                        silence.cancel()
+                        barge = time.perf_counter()
+                        talk = asyncio.create_task(stream_audio(ws, pcm_frames(1.0, rng)))
+                continue
+            event = json.loads(msg)
+            if event["type"] == "cancelled":
+                result["cancel_ms"] = (time.perf_counter() - barge) * 1000
+                words_at = CountingLLM.words
+                await asyncio.sleep(0.5)  # let a non-cancelled stream keep going, if it would
+                result["words_after"] = CountingLLM.words - words_at
+                talk.cancel()
+                break
+            if event["type"] == "done":
+                break
+            if event["type"] == "error":
+                raise RuntimeError(event["message"])
+        silence.cancel()
+        result["first_ms"] = (first - end_of_speech) * 1000
+        result["last_ms"] = (last - end_of_speech) * 1000
+        return result
+
+
+def upload_turn(graph, asr, tts, speech_s):
+    start = time.perf_counter()
+    text = asr(np.zeros(int((speech_s + 0.5) * SR)))
+    final = graph.invoke({"transcript": text, "log": []})
+    tts(speech_text(final["answer"]))
+    return (time.perf_counter() - start) * 1000
+
+
+def p50(values):
+    return round(statistics.median(values), 1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--speech-s", type=float, default=2.0)
+    ap.add_argument("--asr-ms-per-s", type=float, default=150, help="ASR cost per second of audio")
+    ap.add_argument("--llm-ms", type=float, default=200)
+    ap.add_argument("--token-ms", type=float, default=30)
+    ap.add_argument("--tts-ms-per-char", type=float, default=4)
+    args = ap.parse_args()
+
+    os.environ.update({"VOICE_PARTIAL_MS": "0", "TRACE_EXPORT": "off", "SPECULATIVE_RETRIEVAL": "false"})
+    llm_client._llm_client = CountingLLM(args.llm_ms, args.token_ms)
+    retriever.call_tool = fake_tool(50, 100)
+    asr, tts = fake_asr(args.asr_ms_per_s), fake_tts(args.tts_ms_per_char)
+
+    from app import api, voice
+    voice.transcribe, voice.synthesize = asr, lambda text, fmt=None: tts(text)
+
+    rng = np.random.default_rng(3)
+    upload, ws_first, ws_last, cancels = [], [], [], []
+    batch_graph = build_graph()
+    with BackgroundServer(api.app) as srv:
+        for _ in range(args.runs):
+            upload.append(upload_turn(batch_graph, asr, tts, args.speech_s))
+            r = asyncio.run(ws_turn(srv.url, rng, args.speech_s))
+            ws_first.append(r["first_ms"])
+            ws_last.append(r["last_ms"])
+            cancels.append(asyncio.run(ws_turn(srv.url, rng, args.speech_s, barge_in=True)))
+
+    print(f"speech={args.speech_s}s asr={args.asr_ms_per_s}ms/s llm={args.llm_ms}ms + {args.token_ms}ms/word "
+          f"tts={args.tts_ms_per_char}ms/char endpoint={voice.ENDPOINT_MS:g}ms runs={args.runs} (p50)")
+    print(f"{'path':<11}{'first_audio_ms':>16}{'all_audio_ms':>14}")
+    print(f"{'upload':<11}{p50(upload):>16}{p50(upload):>14}")
+    print(f"{'websocket':<11}{p50(ws_first):>16}{p50(ws_last):>14}")
+    print(f"barge-in: cancelled {p50([c['cancel_ms'] for c in cancels])} ms after speech started, "
+          f"LLM words generated afterwards: {max(c['words_after'] for c in cancels)}")
+
+
+if __name__ == "__main__":
+    main()
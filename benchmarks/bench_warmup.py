@@ -0,0 +1,79 @@
+"""
+Benchmark: first-query latency of a fresh app process, cold vs. after the
+background warmup of app/resources.py.
+
+Each mode runs in a new interpreter (nothing imported or connected yet),
+against the local stand-ins in benchmarks/fakes.py for the LLM and the MCP
+tools. "cold" sends the first query straight away; "warm" waits for
+Resources.start_warmup() first and reports how long that took.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_warmup.py --runs 3 --llm-latency fixed:200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def child(mode):
+    """Runs in the fresh interpreter: time the first (and a second) query."""
+    start = time.perf_counter()
+    from app.resources import Resources
+
+    resources = Resources()
+    warmup_ms = None
+    if mode == "warm":
+        resources.start_warmup().wait()
+        warmup_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    timings = []
+    for q in ("eco-friendly stainless steel cleaner under $15", "Lysol disinfectant spray"):
+        t = time.perf_counter()
+        resources.graph().invoke({"transcript": q, "log": []})
+        timings.append(round((time.perf_counter() - t) * 1000, 1))
+    print(json.dumps({"mode": mode, "warmup_ms": warmup_ms, "first_ms": timings[0], "second_ms": timings[1],
+                      "components_ms": resources.timings_ms}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--llm-latency", default="fixed:200")
+    ap.add_argument("--tool-latency", default="fixed:50")
+    ap.add_argument("--child", choices=["cold", "warm"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(args.child)
+
+    from benchmarks.fakes import make_app, BackgroundServer
+
+    results = {"cold": [], "warm": []}
+    with BackgroundServer(make_app(args.llm_latency, args.tool_latency, tool_latency=args.tool_latency)) as srv:
+        env = dict(os.environ, PYTHONPATH=ROOT, LLM_PROVIDER="local", LLM_BASE_URL=f"{srv.url}/v1",
+                   MCP_BASE=srv.url, TRACE_EXPORT="off", SPECULATIVE_RETRIEVAL="false")
+        for _ in range(args.runs):
+            for mode in results:
+                out = subprocess.run([sys.executable, __file__, "--child", mode], env=env, cwd=ROOT,
+                                     capture_output=True, text=True)
+                if out.returncode:
+                    raise RuntimeError(f"{mode} run failed:\n{out.stderr[-2000:]}")
+                out = out.stdout
+                results[mode].append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"llm={args.llm_latency} tools={args.tool_latency} runs={args.runs} (medians)")
+    print(f"{'mode':<6}{'warmup_ms':>11}{'first_ms':>10}{'second_ms':>11}")
+    for mode, rows in results.items():
+        med = lambda k: round(statistics.median(r[k] for r in rows), 1) if rows[0][k] is not None else "-"
+        print(f"{mode:<6}{med('warmup_ms'):>11}{med('first_ms'):>10}{med('second_ms'):>11}")
+    print(f"warmup components (ms): {results['warm'][-1]['components_ms']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Benchmark: confidence-gated web search (RAG_GATED_WEB) - web.search calls
+avoided, fallback calls added for products the catalog doesn't carry,
+and turn latency.
+
+1. Calibration: the best rag.search score for labeled queries
+   (benchmarks/data/catalog_relevance.jsonl, in / not in the synthetic
+   catalog); the threshold with the best balanced accuracy is used unless
+   --threshold is given. Put it in RAG_RELEVANCE_THRESHOLD.
+2. Replay: product queries + the labeled ones through build_graph(), with
+   gating off (web.search whenever the plan lists it) and on (parallel for
+   needs_live, otherwise only after a low-confidence rag.search), for
+   each planner policy (--planner-web): "live" adds web.search only for
+   needs_live, "always" to every plan.
+
+--index fixture searches a Chroma index of the synthetic catalog with the
+real EMBED_MODEL (weights or a warm Hugging Face cache needed); --index
+fakes uses the word-overlap scores of the benchmarks/fakes.py stand-in,
+which exercises the orchestration but says nothing about the embedding
+threshold. The LLM and Brave are always the stand-ins.
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/bench_web_gating.py
+    PYTHONPATH="$PWD" python benchmarks/bench_web_gating.py --index fakes --planner-web live always
+"""
+import os
+import json
+import time
+import argparse
+import statistics
+from contextlib import ExitStack
+
+from benchmarks.fakes import make_app, BackgroundServer
+from benchmarks.bench_pipeline import load_corpus
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def load_labels(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def calibrate(labels, best_score):
+    """Threshold (midpoint between adjacent scores) with the best balanced accuracy; returns (threshold, accuracy)."""
+    scored = [(best_score(row["query"]), row["in_catalog"]) for row in labels]
+    scores = sorted({s for s, _ in scored})
+    candidates = [(a + b) / 2 for a, b in zip(scores, scores[1:])] or scores
+    pos = sum(1 for _, label in scored if label)
+    neg = len(scored) - pos
+
+    def balanced_accuracy(threshold):
+        tp = sum(1 for s, label in scored if label and s >= threshold)
+        tn = sum(1 for s, label in scored if not label and s < threshold)
+        return (tp / max(pos, 1) + tn / max(neg, 1)) / 2
+
+    threshold = max(candidates, key=balanced_accuracy)
+    for label in (True, False):
+        values = sorted(s for s, lab in scored if lab == label)
+        print(f"  {'in catalog' if label else 'not in catalog':<15} best score min={values[0]:.3f} "
+              f"p50={statistics.median(values):.3f} max={values[-1]:.3f}")
+    return round(threshold, 3), balanced_accuracy(threshold)
+
+
+def replay(graph, queries):
+    """Per-query (latency_s, web.search calls, web results) from the retriever logs."""
+    rows = []
+    for q in queries:
+        start = time.perf_counter()
+        final = graph.invoke({"transcript": q, "log": []})
+        elapsed = time.perf_counter() - start
+        calls = sum(1 for entry in final.get("log") or [] if entry.get("node") == "retriever"
+                    for call in entry.get("tool_calls") or [] if call.get("tool") == "web.search")
+        rows.append((elapsed, calls, len((final.get("evidence") or {}).get("web") or [])))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--index", choices=["fixture", "fakes"], default="fixture")
+    ap.add_argument("--planner-web", nargs="+", choices=["live", "always"], default=["live", "always"])
+    ap.add_argument("--threshold", type=float, help="skip calibration and use this RAG_RELEVANCE_THRESHOLD")
+    ap.add_argument("--labels", default=os.path.join(HERE, "data", "catalog_relevance.jsonl"))
+    ap.add_argument("--corpus", nargs="+", default=[os.path.join(HERE, "data", "queries.jsonl")])
+    ap.add_argument("--catalog-size", type=int, default=2000)
+    ap.add_argument("--index-path", default=os.path.join(ROOT, "data", "bench_index"))
+    ap.add_argument("--llm-latency", default="lognormal:250,0.3")
+    ap.add_argument("--web-latency", default="lognormal:400,0.3")
+    ap.add_argument("--tool-latency", default="fixed:50")
+    args = ap.parse_args()
+
+    labels = load_labels(args.labels)
+    off_catalog = {row["query"] for row in labels if not row["in_catalog"]}
+    queries = load_corpus(args.corpus) + [row["query"] for row in labels]
+    fakes = make_app(args.llm_latency, args.web_latency, seed=7, tool_latency=args.tool_latency)
+
+    with ExitStack() as stack:
+        srv = stack.enter_context(BackgroundServer(fakes))
+        os.environ.update({"LLM_PROVIDER": "local", "LLM_BASE_URL": f"{srv.url}/v1", "MCP_BASE": srv.url,
+                           "TRACE_EXPORT": "off", "SPECULATIVE_RETRIEVAL": "false"})
+        if args.index == "fixture":
+            from benchmarks.catalog import build_fixture_index
+            build_fixture_index(args.index_path, args.catalog_size, seed=7)
+            os.environ.update({"INDEX_PATH": args.index_path, "SEARCH_API_KEY": "bench", "SEARCH_PROVIDER": "brave",
+                               "BRAVE_URL": f"{srv.url}/res/v1/web/search"})
+            from mcp_server.server import app as mcp_app
+            os.environ["MCP_BASE"] = stack.enter_context(BackgroundServer(mcp_app)).url
+
+        from graph.langgraph_pipeline import build_graph
+        from graph.nodes.retriever import call_tool, rag_confidence
+
+        def best_score(query):
+            return rag_confidence(call_tool(f"{os.environ['MCP_BASE']}/rag.search",
+                                            {"query": query, "top_k": 5, "filters": {}})) or 0.0
+
+        threshold = args.threshold
+        if threshold is None:
+            print(f"calibration ({args.index}, {len(labels)} labeled queries):")
+            threshold, accuracy = calibrate(labels, best_score)
+            print(f"  threshold={threshold} balanced accuracy={accuracy:.0%}")
+        os.environ["RAG_RELEVANCE_THRESHOLD"] = str(threshold)
+
+        graph = build_graph()
+        graph.invoke({"transcript": queries[0], "log": []})  # warm-up: connections
+        results = {}
+        for policy in args.planner_web:
+            fakes.state.planner_web = policy
+            for gated in ("false", "true"):
+                os.environ["RAG_GATED_WEB"] = gated
+                results[policy, gated] = replay(graph, queries)
+
+    off = [q in off_catalog for q in queries]
+    print(f"\n{len(queries)} queries ({sum(off)} for products not in the catalog), threshold={threshold}, "
+          f"index={args.index}, llm={args.llm_latency} web={args.web_latency}")
+    print(f"{'planner':<9}{'gated':<7}{'web_calls':>10}{'vs_ungated':>11}{'off_catalog_w/_web':>20}"
+          f"{'p50_ms':>8}{'p95_ms':>8}")
+    for (policy, gated), rows in results.items():
+        calls = sum(c for _, c, _ in rows)
+        base = sum(c for _, c, _ in results[policy, "false"])
+        change = f"{(calls - base) / base:+.0%}" if base else "-"  # negative = web calls avoided
+        covered = sum(1 for (_, _, web), o in zip(rows, off) if o and web)
+        times = sorted(t for t, _, _ in rows)
+        print(f"{policy:<9}{gated:<7}{calls:>10}{change:>11}{f'{covered}/{sum(off)}':>20}"
+              f"{statistics.median(times) * 1000:>8.0f}{times[int(len(times) * 0.95)] * 1000:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
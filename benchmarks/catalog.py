@@ -0,0 +1,75 @@
+"""
+Synthetic product catalog + Chroma fixture index for benchmarks.
+
+Rows use the same column names as the Kaggle/HF Amazon 2020 CSV, so the
+index is built with indexing/build_index.py's own build_docs().
+"""
+import os
+import random
+import hashlib
+import pandas as pd
+
+CATEGORIES = {
+    "Home & Kitchen": ["dish soap", "stainless steel cleaner", "sponge", "scrub pad", "trash bags", "rice cooker"],
+    "Health & Household": ["disinfectant spray", "laundry detergent", "glass cleaner", "bleach", "hand soap"],
+    "Toys & Games": ["puzzle", "building blocks", "board game", "plush toy"],
+    "Sports & Outdoors": ["water bottle", "yoga mat", "camping lantern", "resistance bands"],
+    "Office Products": ["stapler", "sticky notes", "gel pens", "desk organizer"],
+    "Pet Supplies": ["dog shampoo", "cat litter", "pet stain remover", "chew toy"],
+}
+BRANDS = ["Lysol", "Clorox", "Scotch-Brite", "Method", "Seventh Generation", "Mrs. Meyer's",
+          "EcoShine", "GreenClean", "Acme", "Generic"]
+ADJECTIVES = ["eco-friendly", "heavy duty", "plant-based", "unscented", "lavender", "travel size",
+              "family pack", "non-toxic", "streak-free", "biodegradable"]
+SIZES = [8, 12, 16, 19, 24, 32, 64]
+
+
+def synthetic_catalog(n: int, seed: int = 7) -> pd.DataFrame:
+    """Deterministic catalog of n products with HF-style columns."""
+    rng = random.Random(seed)
+    top_levels = list(CATEGORIES)
+    rows = []
+    for i in range(n):
+        top = top_levels[i % len(top_levels)]
+        kind = rng.choice(CATEGORIES[top])
+        brand = rng.choice(BRANDS)
+        adj = rng.sample(ADJECTIVES, 2)
+        size = rng.choice(SIZES)
+        rows.append({
+            "Uniq Id": f"syn{i:07d}",
+            "Product Name": f"{brand} {adj[0].title()} {kind.title()} {size} oz",
+            "Category": f"{top} | {kind.title()} | {brand}",
+            "Selling Price": f"${rng.uniform(2, 60):.2f}",
+            "About Product": f"{adj[0]} and {adj[1]} {kind} from {brand}. {size} oz.",
+        })
+    return pd.DataFrame(rows)
+
+
+def build_fixture_index(index_path: str, n: int, seed: int = 7, collection: str = "amazon2020"):
+    """Build a Chroma index of n synthetic products at index_path (reused if size, seed and contents match)."""
+    import chromadb
+    from chromadb.utils import embedding_functions
+    from indexing.build_index import build_docs, chunked
+
+    os.makedirs(index_path, exist_ok=True)
+    client = chromadb.PersistentClient(path=index_path)
+    emb = embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+    )
+    catalog = synthetic_catalog(n, seed)
+    # Fingerprint of the catalog contents: reuse the index only if it matches
+    digest = hashlib.sha1(catalog.to_csv(index=False).encode()).hexdigest()
+    fingerprint = {"bench_size": n, "bench_seed": seed, "bench_sha1": digest}
+    col = client.get_or_create_collection(collection, embedding_function=emb, metadata=fingerprint)
+    if all((col.metadata or {}).get(k) == v for k, v in fingerprint.items()) and col.count() == n:
+        return col
+
+    client.delete_collection(collection)
+    col = client.create_collection(collection, embedding_function=emb, metadata=fingerprint)
+    ids, texts, metas = zip(*build_docs(catalog))
+    for chunk_ids, chunk_texts, chunk_metas in zip(
+        chunked(list(ids), 5000), chunked(list(texts), 5000), chunked(list(metas), 5000)
+    ):
+        col.add(ids=list(chunk_ids), documents=list(chunk_texts), metadatas=list(chunk_metas))
+    print(f"[bench] Indexed {n} synthetic products into {index_path}")
+    return col
@@ -0,0 +1,217 @@
+"""
+Local stand-ins for the external services: an OpenAI-compatible chat
+endpoint, a Brave-compatible web search endpoint and MCP-style tool
+endpoints over a small synthetic catalog, all with configurable latency
+distributions.
+
+Latency specs: "fixed:200", "uniform:100,300", "normal:200,40",
+"lognormal:200,0.5" (median ms, sigma). All values are milliseconds.
+"""
+import re
+import json
+import time
+import random
+import asyncio
+import threading
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+class Latency:
+    """Sampler for a latency spec string."""
+
+    def __init__(self, spec: str = "fixed:0", seed: int | None = None):
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+        self.spec = spec
+        self.rng = random.Random(seed)
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample_ms(self) -> float:
+        a = self.args
+        if self.kind == "fixed":
+            return a[0] if a else 0.0
+        if self.kind == "uniform":
+            return self.rng.uniform(a[0], a[1])
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(a[0], a[1]))
+        import math
+        return a[0] * math.exp(self.rng.gauss(0, a[1]))
+
+    async def wait(self):
+        await asyncio.sleep(self.sample_ms() / 1000)
+
+
+SAFETY = {"mixing chemicals": ["mix bleach", "mix ammonia", "mixing bleach", "bleach and ammonia"],
+          "medical claims": ["cure", "treat my", "diagnose"]}
+OUT_OF_SCOPE = ["weather", "joke", "capital of", "who won", "stock market"]
+LIVE = ["now", "today", "in stock", "availability", "current price", "latest"]
+STOPWORDS = {"a", "an", "the", "and", "or", "for", "of", "to", "in", "on", "with", "under", "me", "my", "i",
+             "is", "are", "what", "what's", "s", "show", "find", "recommend", "best", "cheapest", "that",
+             "some", "need", "price", "current", "today", "now", "latest", "deals", "available", "stock"}
+
+
+def _field(text, label):
+    m = re.search(rf"{label}:\s*(.*)", text)
+    return m.group(1).strip() if m else ""
+
+
+def fake_router(text):
+    lower = text.lower()
+    m = re.search(r"under\s*\$?(\d+(\.\d{1,2})?)", text, re.I)
+    flags = [flag for flag, keys in SAFETY.items() if any(k in lower for k in keys)]
+    task = "out_of_scope" if any(k in lower for k in OUT_OF_SCOPE) else "product_recommendation"
+    return {
+        "task": task,
+        "constraints": {"budget": float(m.group(1)) if m else None, "material": None,
+                        "brand": None, "category": None},
+        "needs_live": any(k in lower for k in LIVE),
+        "safety_flags": flags,
+    }
+
+
+def fake_planner(context, web="live"):
+    """web="live": web.search only when the router set needs_live; "always": every plan."""
+    query = _field(context, "User query")
+    budget = _field(context, "- Budget")
+    live = _field(context, "- Needs live data") == "True"
+    filters = {}
+    if budget not in ("", "None"):
+        filters["price"] = {"$lte": float(budget)}
+    return {
+        "sources": ["rag.search"] + (["web.search"] if live or web == "always" else []),
+        "filters": filters,
+        "query_text": query,
+        "fields": ["sku", "title", "price", "rating", "brand"],
+        "ranking": "price_asc" if filters else "relevance",
+        "top_k": 5,
+        "comparison_strategy": "price_check" if live else "none",
+    }
+
+
+def fake_answer(context):
+    doc = re.search(r"Doc ID:\s*(\S+)", context)
+    price = re.search(r"Price:\s*\$(\d+(\.\d+)?)", context)
+    title = re.search(r"1\. \*\*(.+?)\*\*", context)
+    if not doc:
+        return "Here are a few options from the web that match. See details on your screen."
+    return (f"My top pick is {title.group(1)[:60] if title else 'this product'} at ${price.group(1) if price else 'N/A'}. "
+            f"See details on your screen. (Sources: doc #{doc.group(1)})")
+
+
+def make_app(llm_latency: str = "fixed:0", web_latency: str = "fixed:0", seed: int | None = None,
+             tool_latency: str = "fixed:0", planner_web: str = "live"):
+    """FastAPI app serving /v1/chat/completions, /res/v1/web/search and MCP-style /rag.search, /web.search."""
+    app = FastAPI(title="Benchmark stand-ins")
+    app.state.calls = Counter()
+    app.state.planner_web = planner_web
+    llm = Latency(llm_latency, seed)
+    web = Latency(web_latency, None if seed is None else seed + 1)
+    tools = Latency(tool_latency, None if seed is None else seed + 2)
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        user = body["messages"][-1]["content"]
+        if "Extract the intent" in user:
+            role, content = "router", json.dumps(fake_router(_field(user, "User query")))
+        elif "execution plan" in user:
+            role, content = "planner", json.dumps(fake_planner(user, app.state.planner_web))
+        else:
+            role, content = "answerer", fake_answer(user)
+        app.state.calls[role] += 1
+        await llm.wait()
+        return {
+            "id": f"chatcmpl-bench{sum(app.state.calls.values())}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(user) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(user) + len(content)) // 4},
+        }
+
+    @app.get("/res/v1/web/search")
+    async def brave(q: str, count: int = 5):
+        app.state.calls["web"] += 1
+        await web.wait()
+        slug = re.sub(r"[^a-z0-9]+", "-", q.lower()).strip("-")
+        return {"web": {"results": [
+            {"title": f"{q.title()} - Offer {i + 1}", "url": f"https://shop{i}.example.com/{slug}",
+             "description": f"Buy {q} online. Free shipping on orders over $25.",
+             "profile": {"name": f"shop{i}"}}
+            for i in range(count)
+        ]}}
+
+    # MCP tool stand-ins (same response shape as mcp_server.server), for
+    # benchmarks that should not need the Chroma index
+    catalog = []
+
+    @app.post("/rag.search")
+    async def rag_search(request: Request):
+        body = await request.json()
+        app.state.calls["rag.search"] += 1
+        await tools.wait()
+        if not catalog:
+            from benchmarks.catalog import synthetic_catalog
+            catalog.extend(synthetic_catalog(200, seed or 0).to_dict("records"))
+        words = set(re.findall(r"[a-z]+", body.get("query", "").lower())) - STOPWORDS
+
+        def score(row):
+            # Stand-in for the cosine score: share of the query's words found in the title
+            title = set(re.findall(r"[a-z]+", row["Product Name"].lower()))
+            return round(0.15 + 0.6 * len(words & title) / max(len(words), 1), 4)
+
+        ranked = sorted(catalog, key=lambda row: -score(row))
+        return {"tool": "rag.search", "timestamp": time.time(), "results": [
+            {"doc_id": row["Uniq Id"], "score": score(row), "sku": row["Uniq Id"], "title": row["Product Name"],
+             "price": float(row["Selling Price"][1:]), "rating": None,
+             "brand": row["Category"].rsplit(" | ", 1)[-1], "ingredients": None}
+            for row in ranked[:body.get("top_k", 5)]
+        ]}
+
+    @app.post("/web.search")
+    async def web_search(request: Request):
+        body = await request.json()
+        app.state.calls["web.search"] += 1
+        await web.wait()
+        q = body.get("query", "")
+        return {"tool": "web.search", "timestamp": time.time(), "results": [
+            {"title": f"{q.title()} - Offer {i + 1}", "url": f"https://shop{i}.example.com/item",
+             "snippet": f"Buy {q} online.", "profile": f"shop{i}", "price": None, "availability": None}
+            for i in range(min(body.get("top_k", 5), 5))
+        ]}
+
+    @app.get("/stats")
+    def stats():
+        return dict(app.state.calls)
+
+    return app
+
+
+class BackgroundServer:
+    """Run a FastAPI app with uvicorn on a daemon thread."""
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self.config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(self.config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    @property
+    def url(self):
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
@@ -0,0 +1,79 @@
+"""
+Load test for the /assist API (app/api.py): throughput, latency and
+admission outcomes (200 / 429 / 504) as concurrent clients grow past the
+worker pool and queue.
+
+The LLM and MCP tools are the local stand-ins from benchmarks/fakes.py, so
+the numbers reflect the pool, queueing and graph orchestration. Requests are
+text-only with speak=false (no ASR/TTS engine needed).
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/loadtest_assist.py --workers 4 --queue 8 --clients 2 8 16 32
+"""
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+from benchmarks.fakes import make_app, BackgroundServer
+
+
+async def burst(url, clients, requests_per_client):
+    """Closed loop: each client sends its next request when the previous one returns."""
+    samples = []
+
+    async def client(i, http):
+        for j in range(requests_per_client):
+            start = time.perf_counter()
+            r = await http.post(f"{url}/assist", json={"text": f"stainless steel cleaner under $20 #{i}.{j}",
+                                                       "speak": False})
+            samples.append((r.status_code, time.perf_counter() - start))
+            if r.status_code == 429:
+                await asyncio.sleep(float(r.headers.get("Retry-After", "1")) / 10)
+
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i, http) for i in range(clients)))
+        return samples, time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--queue", type=int, default=8)
+    ap.add_argument("--timeout-s", type=float, default=10)
+    ap.add_argument("--clients", nargs="+", type=int, default=[2, 8, 16, 32])
+    ap.add_argument("--requests", type=int, default=5, help="per client")
+    ap.add_argument("--llm-latency", default="lognormal:200,0.3")
+    ap.add_argument("--tool-latency", default="fixed:50")
+    args = ap.parse_args()
+
+    with BackgroundServer(make_app(args.llm_latency, args.tool_latency, seed=7, tool_latency=args.tool_latency)) as fakes:
+        os.environ.update({
+            "LLM_PROVIDER": "local", "LLM_BASE_URL": f"{fakes.url}/v1", "MCP_BASE": fakes.url,
+            "ASSIST_WORKERS": str(args.workers), "ASSIST_QUEUE": str(args.queue),
+            "ASSIST_TIMEOUT_S": str(args.timeout_s), "TRACE_EXPORT": "off", "SPECULATIVE_RETRIEVAL": "false",
+        })
+        from app import api  # reads ASSIST_* at import
+        with BackgroundServer(api.app) as srv:
+            api.resources.wait(60)
+            asyncio.run(burst(srv.url, 1, 2))  # warm-up
+
+            print(f"workers={args.workers} queue={args.queue} timeout={args.timeout_s:g}s llm={args.llm_latency}")
+            print(f"{'clients':>8}{'ok':>6}{'429':>6}{'504':>6}{'rps_ok':>8}{'p50_ms':>8}{'p95_ms':>8}")
+            for clients in args.clients:
+                samples, elapsed = asyncio.run(burst(srv.url, clients, args.requests))
+                ok = sorted(s for code, s in samples if code == 200)
+                count = lambda code: sum(1 for c, _ in samples if c == code)  # noqa: E731
+                p50 = statistics.median(ok) * 1000 if ok else float("nan")
+                p95 = ok[min(len(ok) - 1, int(len(ok) * 0.95))] * 1000 if ok else float("nan")
+                print(f"{clients:>8}{len(ok):>6}{count(429):>6}{count(504):>6}{len(ok) / elapsed:>8.1f}"
+                      f"{p50:>8.0f}{p95:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
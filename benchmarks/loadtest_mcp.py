@@ -0,0 +1,331 @@
+"""
+Load test for the MCP tool server: how many /rag.search and /web.search
+requests per second one mcp_server.server deployment sustains, and how that
+scales with the uvicorn worker count.
+
+For each --servers x --workers combination a tool server subprocess is
+started over a synthetic Chroma fixture index (benchmarks/catalog.py);
+web.search goes to the fake Brave endpoint in benchmarks/fakes.py.
+
+Servers:
+- uvicorn: `uvicorn mcp_server.server:app --workers W` (every worker loads
+  its own model and index)
+- prefork: `python -m mcp_server.serve --workers W` (loaded once, memory-
+  mapped flat index, workers share pages copy-on-write)
+
+Memory is the proportional set size (PSS) of the whole process tree after
+the run, so pages shared between workers are split instead of counted N times.
+
+Modes:
+- closed: --concurrency virtual users, each sends its next request as soon
+  as the previous one returns (measures max throughput at that concurrency).
+- open:   Poisson arrivals at --rate requests/s, independent of responses.
+  Latency is measured from the scheduled send time, so server queueing is
+  not hidden by the load generator slowing down (coordinated omission).
+
+Writes to --out-dir:
+- loadtest.json           full report (config, per-run percentiles, histograms)
+- qps_vs_workers.csv      one row per (server, workers, endpoint), with memory
+- latency_histogram.csv   bucket counts per (server, workers, endpoint)
+
+Usage:
+    PYTHONPATH="$PWD" python benchmarks/loadtest_mcp.py --workers 1 2 4 --mode closed --concurrency 16
+    PYTHONPATH="$PWD" python benchmarks/loadtest_mcp.py --workers 2 --mode open --rate 40 --web-ratio 0.3
+    PYTHONPATH="$PWD" python benchmarks/loadtest_mcp.py --servers uvicorn prefork --workers 1 2 4
+"""
+import os
+import sys
+import csv
+import json
+import math
+import time
+import random
+import socket
+import asyncio
+import argparse
+import subprocess
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Upper bucket edges (ms) for the latency histograms
+BUCKETS_MS = [5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def load_payloads(paths, top_k):
+    """rag.search / web.search payloads from the benchmark query corpus (budgets become price filters)."""
+    from benchmarks.bench_pipeline import load_corpus
+    from benchmarks.fakes import fake_router
+
+    payloads = []
+    for q in load_corpus(paths):
+        budget = fake_router(q)["constraints"]["budget"]
+        payloads.append({
+            "query": q,
+            "top_k": top_k,
+            "filters": {"price": {"$lte": budget}} if budget else {},
+        })
+    return payloads
+
+
+def tree_memory_mb(pid):
+    """Summed PSS and RSS (MB) of a process and all its descendants, from /proc."""
+    pids, totals = [pid], {"Pss": 0, "Rss": 0}
+    while pids:
+        p = pids.pop()
+        try:
+            with open(f"/proc/{p}/smaps_rollup") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in totals:
+                        totals[key] += int(rest.split()[0])
+            for task in os.listdir(f"/proc/{p}/task"):
+                with open(f"/proc/{p}/task/{task}/children") as f:
+                    pids += [int(c) for c in f.read().split()]
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return {"pss_mb": round(totals["Pss"] / 1024, 1), "rss_mb": round(totals["Rss"] / 1024, 1)}
+
+
+class ToolServer:
+    """Tool server subprocess (uvicorn or mcp_server.serve prefork) with W workers."""
+
+    def __init__(self, workers, env, server="uvicorn", startup_timeout=600):
+        self.workers = workers
+        self.server = server
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = env
+        self.startup_timeout = startup_timeout
+        self.proc = None
+
+    def __enter__(self):
+        if self.server == "prefork":
+            cmd = [sys.executable, "-m", "mcp_server.serve", "--port", str(self.port),
+                   "--workers", str(self.workers), "--flat-dir", os.path.join(self.env["INDEX_PATH"], "flat")]
+        else:
+            cmd = [sys.executable, "-m", "uvicorn", "mcp_server.server:app", "--host", "127.0.0.1",
+                   "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"]
+        self.proc = subprocess.Popen(cmd, cwd=ROOT, env=self.env)
+        # Workers accept right away and load the embedding model in the
+        # background; rag.search succeeds once one of them is warm, and the
+        # warm-up phase gives slower workers time to catch up.
+        deadline = time.time() + self.startup_timeout
+        while True:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"tool server exited with code {self.proc.returncode}")
+            if time.time() > deadline:
+                self.__exit__()
+                raise RuntimeError(f"tool server not ready after {self.startup_timeout}s")
+            try:
+                r = httpx.post(f"{self.url}/rag.search", json={"query": "warmup", "top_k": 1}, timeout=60)
+                if r.status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+
+    def __exit__(self, *exc):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+def pick_request(rng, payloads, web_ratio):
+    payload = rng.choice(payloads)
+    if rng.random() < web_ratio:
+        return "web.search", {"query": payload["query"], "top_k": min(payload["top_k"], 5)}
+    return "rag.search", payload
+
+
+async def send(client, url, endpoint, payload, scheduled, samples):
+    try:
+        r = await client.post(f"{url}/{endpoint}", json=payload)
+        ok = r.status_code == 200
+    except httpx.HTTPError:
+        ok = False
+    samples.append((endpoint, (time.perf_counter() - scheduled) * 1000, ok))
+
+
+async def closed_loop(url, payloads, args, rng, duration):
+    samples = []
+    stop_at = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        async def user():
+            while time.perf_counter() < stop_at:
+                endpoint, payload = pick_request(rng, payloads, args.web_ratio)
+                await send(client, url, endpoint, payload, time.perf_counter(), samples)
+                if args.think_ms:
+                    await asyncio.sleep(args.think_ms / 1000)
+
+        await asyncio.gather(*(user() for _ in range(args.concurrency)))
+    return samples, {"dropped": 0}
+
+
+async def open_loop(url, payloads, args, rng, duration):
+    samples = []
+    dropped = 0
+    inflight = set()
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        start = time.perf_counter()
+        next_at = start
+        while next_at < start + duration:
+            next_at += rng.expovariate(args.rate)
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(inflight) >= args.max_inflight:
+                # Generator-side cap: count instead of queueing without bound
+                dropped += 1
+                continue
+            endpoint, payload = pick_request(rng, payloads, args.web_ratio)
+            task = asyncio.create_task(send(client, url, endpoint, payload, next_at, samples))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        if inflight:
+            await asyncio.gather(*inflight)
+    return samples, {"dropped": dropped}
+
+
+def percentile(sorted_vals, q):
+    """Nearest-rank percentile, as in graph.tracing."""
+    if not sorted_vals:
+        return None
+    return round(sorted_vals[min(len(sorted_vals) - 1, max(0, math.ceil(q / 100 * len(sorted_vals)) - 1))], 2)
+
+
+def histogram(latencies):
+    counts = [0] * (len(BUCKETS_MS) + 1)
+    for ms in latencies:
+        i = next((i for i, edge in enumerate(BUCKETS_MS) if ms <= edge), len(BUCKETS_MS))
+        counts[i] += 1
+    return [{"le_ms": edge, "count": c} for edge, c in zip(BUCKETS_MS + ["+Inf"], counts)]
+
+
+def summarize_run(samples, elapsed):
+    out = {}
+    for endpoint in sorted({s[0] for s in samples}) + ["all"]:
+        rows = [s for s in samples if endpoint in ("all", s[0])]
+        ok = sorted(ms for _, ms, good in rows if good)
+        out[endpoint] = {
+            "requests": len(rows),
+            "errors": len(rows) - len(ok),
+            "qps": round(len(ok) / elapsed, 2),
+            "p50_ms": percentile(ok, 50),
+            "p95_ms": percentile(ok, 95),
+            "p99_ms": percentile(ok, 99),
+            "max_ms": round(ok[-1], 2) if ok else None,
+            "histogram": histogram(ok),
+        }
+    return out
+
+
+def write_outputs(report, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "loadtest.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    with open(os.path.join(out_dir, "qps_vs_workers.csv"), "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["server", "workers", "mode", "load", "endpoint", "requests", "errors", "dropped",
+                    "qps", "p50_ms", "p95_ms", "p99_ms", "pss_mb", "pss_mb_per_worker", "rss_mb"])
+        for run in report["runs"]:
+            mem = run["memory"]
+            for endpoint, s in run["endpoints"].items():
+                w.writerow([run["server"], run["workers"], report["config"]["mode"], run["load"], endpoint,
+                            s["requests"], s["errors"], run["dropped"], s["qps"], s["p50_ms"], s["p95_ms"],
+                            s["p99_ms"], mem["pss_mb"], mem["pss_mb_per_worker"], mem["rss_mb"]])
+
+    with open(os.path.join(out_dir, "latency_histogram.csv"), "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["server", "workers", "endpoint", "le_ms", "count"])
+        for run in report["runs"]:
+            for endpoint, s in run["endpoints"].items():
+                for bucket in s["histogram"]:
+                    w.writerow([run["server"], run["workers"], endpoint, bucket["le_ms"], bucket["count"]])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to test")
+    ap.add_argument("--servers", nargs="+", default=["uvicorn"], choices=["uvicorn", "prefork"])
+    ap.add_argument("--mode", choices=["closed", "open"], default="closed")
+    ap.add_argument("--concurrency", type=int, default=16, help="closed loop: virtual users")
+    ap.add_argument("--think-ms", type=float, default=0, help="closed loop: pause between a user's requests")
+    ap.add_argument("--rate", type=float, default=20, help="open loop: offered requests/s (Poisson)")
+    ap.add_argument("--max-inflight", type=int, default=256, help="open loop: outstanding request cap")
+    ap.add_argument("--duration", type=float, default=30, help="seconds of load per worker count")
+    ap.add_argument("--warmup", type=float, default=3, help="seconds of unrecorded load first")
+    ap.add_argument("--web-ratio", type=float, default=0.0, help="share of requests sent to /web.search")
+    ap.add_argument("--web-latency", default="lognormal:400,0.3", help="fake Brave latency spec")
+    ap.add_argument("--top-k", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=30)
+    ap.add_argument("--catalog-size", type=int, default=10000)
+    ap.add_argument("--index-path", default=os.path.join(ROOT, "data", "loadtest_index"))
+    ap.add_argument("--corpus", nargs="+", default=[os.path.join(HERE, "data", "queries.jsonl"),
+                                                   os.path.join(ROOT, "prompts", "few_shots.jsonl")])
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out-dir", default=os.path.join(ROOT, "data", "loadtest"))
+    args = ap.parse_args()
+
+    from benchmarks.catalog import build_fixture_index
+    from benchmarks.fakes import make_app, BackgroundServer
+
+    build_fixture_index(args.index_path, args.catalog_size, args.seed)
+    payloads = load_payloads(args.corpus, args.top_k)
+    load = args.concurrency if args.mode == "closed" else args.rate
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("corpus", "out_dir")}, "runs": []}
+
+    with BackgroundServer(make_app(web_latency=args.web_latency, seed=args.seed)) as brave:
+        env = dict(os.environ, INDEX_PATH=args.index_path, SEARCH_PROVIDER="brave", SEARCH_API_KEY="bench",
+                   BRAVE_URL=f"{brave.url}/res/v1/web/search", PYTHONPATH=ROOT)
+        for server in args.servers:
+            for workers in args.workers:
+                rng = random.Random(args.seed)
+                with ToolServer(workers, env, server) as srv:
+                    run = closed_loop if args.mode == "closed" else open_loop
+                    if args.warmup:
+                        asyncio.run(run(srv.url, payloads, args, rng, args.warmup))
+                    start = time.perf_counter()
+                    samples, extra = asyncio.run(run(srv.url, payloads, args, rng, args.duration))
+                    elapsed = time.perf_counter() - start
+                    memory = tree_memory_mb(srv.proc.pid)
+                memory["pss_mb_per_worker"] = round(memory["pss_mb"] / workers, 1)
+
+                endpoints = summarize_run(samples, elapsed)
+                report["runs"].append({"server": server, "workers": workers, "load": load,
+                                       "elapsed_s": round(elapsed, 2), "dropped": extra["dropped"],
+                                       "memory": memory, "endpoints": endpoints})
+                s = endpoints["all"]
+                print(f"{server} workers={workers} {args.mode} load={load}: {s['qps']} qps, p50={s['p50_ms']}ms "
+                      f"p95={s['p95_ms']}ms p99={s['p99_ms']}ms, errors={s['errors']}, dropped={extra['dropped']}, "
+                      f"pss={memory['pss_mb']}MB")
+
+    write_outputs(report, args.out_dir)
+    print(f"{'server':<9}{'workers':>8}{'qps':>10}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}"
+          f"{'pss_mb':>10}{'pss/worker':>12}")
+    for run in report["runs"]:
+        s, mem = run["endpoints"]["all"], run["memory"]
+        print(f"{run['server']:<9}{run['workers']:>8}{s['qps']:>10}{s['p50_ms']:>10}{s['p95_ms']:>10}"
+              f"{s['p99_ms']:>10}{mem['pss_mb']:>10}{mem['pss_mb_per_worker']:>12}")
+    print(f"Results written to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,22 +3,132 @@ from langgraph.graph import StateGraph, END
 from .schemas import GraphState
 from .nodes.router import route
 from .nodes.planner import plan
-from .nodes.retriever import retrieve
-from .nodes.answerer import answer
+from .nodes.retriever import (retrieve, retrieve_rag, retrieve_web, speculate, discard_speculation,
+                              web_mode, web_fallback_needed)
+from .nodes.answerer import answer, answer_stream
 from .nodes.critic import critique
+from .nodes.responder import respond, short_circuit_reason
+from .tracing import trace_node, span
+from .streaming import cancellable
+
+# Planner source -> retrieval node. Each source is an independent branch that
+# fans out from the planner and joins at the answerer; new lookup tools get
+# their own node here.
+SOURCE_NODES = {
+    "rag.search": "rag_retriever",
+    "web.search": "web_retriever",
+}
+
+
+def fan_out(state):
+    """Pick the retrieval branches to run in parallel for this plan."""
+    sources = (state.get("plan") or {}).get("sources", ["rag.search"])
+    branches = [SOURCE_NODES[s] for s in sources if s in SOURCE_NODES]
+    # gated web search waits for the RAG confidence (after_rag) unless it runs in parallel
+    branches = [b for b in branches if b != "web_retriever"]
+    if web_mode(state) == "parallel":
+        branches.append("web_retriever")
+    if "rag_retriever" not in branches:
+        # runs for every plan (web-only or no sources), unlike any one branch
+        discard_speculation()
+    return branches or ["answerer"]
+
+
+def after_rag(state):
+    """Web search as a fallback when the catalog's best match is not relevant enough."""
+    if web_mode(state) == "fallback" and web_fallback_needed(state, (state.get("evidence") or {}).get("rag")):
+        return "web_retriever"
+    return "answerer"
+
+
+def after_router(state):
+    """Safety-flagged and out-of-scope turns skip planning, retrieval and answering."""
+    return "responder" if short_circuit_reason(state) else "planner"
+
+
+class TracedGraph:
+    """
+    Compiled graph whose invoke() runs inside a graph.invoke span, so node,
+    LLM and tool spans share one trace even when the caller opened none.
+    Everything else is delegated to the compiled graph.
+    """
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+
+    def invoke(self, input, config=None, **kwargs):
+        with span("graph.invoke") as root:
+            try:
+                return self.compiled.invoke(input, config, **kwargs)
+            finally:
+                # a speculative rag.search nobody consumed (error, early exit)
+                discard_speculation(root.span_id)
+
+    def __getattr__(self, name):
+        return getattr(self.compiled, name)
+
+
+def parallel_enabled() -> bool:
+    return os.getenv("PARALLEL_RETRIEVAL", "true").lower() in ("1", "true", "yes")
+
+
+def short_circuit_enabled() -> bool:
+    return os.getenv("SHORT_CIRCUIT_ROUTING", "true").lower() in ("1", "true", "yes")
+
+
+def build_graph(parallel: bool | None = None, streaming: bool = False, short_circuit: bool | None = None):
+    """
+    streaming=True swaps the answerer + critic pair for answer_stream, which
+    critiques sentence by sentence and releases approved ones through
+    graph.streaming.stream_turn() while generation continues.
+
+    short_circuit=True (SHORT_CIRCUIT_ROUTING) sends safety-flagged and
+    out-of-scope turns from the router to a templated responder instead of
+    the planner, retrievers, answerer and critic.
+    """
+    if parallel is None:
+        parallel = parallel_enabled()
+    if short_circuit is None:
+        short_circuit = short_circuit_enabled()
 
-def build_graph():
     g = StateGraph(GraphState)
-    g.add_node("router", route)
-    g.add_node("planner", plan)
-    g.add_node("retriever", retrieve)
-    g.add_node("answerer", answer)
-    g.add_node("critic", critique)
-
-    g.set_entry_point("router")
-    g.add_edge("router","planner")
-    g.add_edge("planner","retriever")
-    g.add_edge("retriever","answerer")
-    g.add_edge("answerer","critic")
-    g.add_edge("critic", END)
-    return g.compile()
+    # every node runs inside a timed span (graph/tracing.py) and is skipped
+    # once the turn is cancelled (graph/streaming.py)
+    add_node = lambda name, fn: g.add_node(name, trace_node(name, cancellable(fn)))
+    add_node("speculator", speculate)
+    add_node("router", route)
+    add_node("planner", plan)
+    add_node("answerer", answer_stream if streaming else answer)
+    if not streaming:
+        add_node("critic", critique)
+
+    # speculator only submits a background rag.search (SPECULATIVE_RETRIEVAL)
+    # so retrieval overlaps the router/planner LLM calls
+    g.set_entry_point("speculator")
+    g.add_edge("speculator","router")
+    if short_circuit:
+        add_node("responder", respond)
+        g.add_conditional_edges("router", after_router, ["responder", "planner"])
+        g.add_edge("responder", END)
+    else:
+        g.add_edge("router","planner")
+
+    if parallel:
+        add_node("rag_retriever", retrieve_rag)
+        add_node("web_retriever", retrieve_web)
+        g.add_conditional_edges("planner", fan_out, list(SOURCE_NODES.values()) + ["answerer"])
+        # parallel branches finish in the same superstep, so the answerer runs
+        # once; a fallback web search runs after rag_retriever instead
+        g.add_conditional_edges("rag_retriever", after_rag, ["web_retriever", "answerer"])
+        g.add_edge("web_retriever", "answerer")
+    else:
+        add_node("retriever", retrieve)
+        g.add_edge("planner","retriever")
+        g.add_edge("retriever","answerer")
+
+    if streaming:
+        g.add_edge("answerer", END)
+    else:
+        g.add_edge("answerer","critic")
+        g.add_edge("critic", END)
+    return TracedGraph(g.compile())
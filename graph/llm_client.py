@@ -3,8 +3,9 @@ LLM Client - Model-agnostic interface for various providers
 """
 import os
 import json
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator
 from dotenv import load_dotenv
+from graph.tracing import span
 
 load_dotenv()
 
@@ -61,6 +62,10 @@ class LLMClient:
         Returns:
             str: Response content
         """
+        with span("llm.chat", provider=self.provider, model=self.model):
+            return self._chat(messages, temperature, max_tokens, response_format)
+
+    def _chat(self, messages, temperature, max_tokens, response_format) -> str:
         temp = temperature if temperature is not None else self.temperature
         tokens = max_tokens or 2000
         
@@ -78,30 +83,63 @@ class LLMClient:
             return response.choices[0].message.content
         
         elif self.provider == "anthropic":
-            # Anthropic has different message format
-            system_msg = None
-            user_messages = []
-            
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_msg = msg["content"]
-                else:
-                    user_messages.append(msg)
-            
-            kwargs = {
-                "model": self.model,
-                "messages": user_messages,
-                "temperature": temp,
-                "max_tokens": tokens
-            }
-            if system_msg:
-                kwargs["system"] = system_msg
-            
-            response = self.client.messages.create(**kwargs)
+            response = self.client.messages.create(**self._anthropic_kwargs(messages, temp, tokens))
             return response.content[0].text
         
         raise NotImplementedError(f"Chat not implemented for {self.provider}")
     
+    def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Stream a chat completion.
+        
+        Yields:
+            str: Text deltas as the provider produces them
+        """
+        temp = temperature if temperature is not None else self.temperature
+        tokens = max_tokens or 2000
+        
+        if self.provider == "openai" or self.provider == "local":
+            stream = self.client.chat.completions.create(
+                model=self.model, messages=messages, temperature=temp, max_tokens=tokens, stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+            return
+        
+        elif self.provider == "anthropic":
+            with self.client.messages.stream(**self._anthropic_kwargs(messages, temp, tokens)) as stream:
+                yield from stream.text_stream
+            return
+        
+        raise NotImplementedError(f"Streaming not implemented for {self.provider}")
+    
+    def _anthropic_kwargs(self, messages, temp, tokens) -> Dict[str, Any]:
+        # Anthropic has different message format
+        system_msg = None
+        user_messages = []
+        
+        for msg in messages:
+            if msg["role"] == "system":
+                system_msg = msg["content"]
+            else:
+                user_messages.append(msg)
+        
+        kwargs = {
+            "model": self.model,
+            "messages": user_messages,
+            "temperature": temp,
+            "max_tokens": tokens
+        }
+        if system_msg:
+            kwargs["system"] = system_msg
+        return kwargs
+    
     def chat_json(
         self,
         messages: List[Dict[str, str]],
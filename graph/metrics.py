@@ -0,0 +1,229 @@
+"""
+Metrics - Prometheus-style counters, gauges and histograms.
+
+One registry per process. The MCP server serves it at /metrics in the
+Prometheus text format; in the agent process graph.tracing feeds every
+finished span into it (duration histogram + error counter per span name),
+so node, LLM and tool-call latency can be read in-process with snapshot()
+or rendered the same way. Recording is a dict lookup plus a locked add.
+
+Worker processes (uvicorn --workers, mcp_server.serve) each keep their own
+registry; scrape every worker or aggregate in Prometheus. Configure via:
+- METRICS_ENABLED: record metrics (default: true)
+"""
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Seconds; covers in-memory index lookups up to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines += m.samples()
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """{name: {label_string: value}}; histograms as {"count", "sum", "buckets"}."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {m.name: m.snapshot() for m in metrics}
+
+
+REGISTRY = Registry()
+
+
+def _label_str(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value):
+    return repr(float(value)) if value not in (float("inf"), float("-inf")) else ("+Inf" if value > 0 else "-Inf")
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def labels(self, *values, **kwargs):
+        """Child for one label set (created once, then a dict lookup)."""
+        key = values or tuple(kwargs[n] for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabeled(self):
+        return self.labels()
+
+    def _items(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def snapshot(self):
+        return {_label_str(self.labelnames, k): c.snapshot() for k, c in self._items()}
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        if METRICS_ENABLED:
+            with self.lock:
+                self.value += amount
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    def set(self, value):
+        if METRICS_ENABLED:
+            self.value = float(value)
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def snapshot(self):
+        return self.value
+
+
+class Counter(_Metric):
+    kind = "counter"
+    _new_child = _Value
+
+    def inc(self, amount=1.0):
+        self._unlabeled().inc(amount)
+
+    def samples(self):
+        return [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(c.value)}" for k, c in self._items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        self._unlabeled().set(value)
+
+    def dec(self, amount=1.0):
+        self._unlabeled().dec(amount)
+
+    def track_inprogress(self):
+        return self._unlabeled().track_inprogress()
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        if METRICS_ENABLED:
+            i = bisect.bisect_left(self.bounds, value)
+            with self.lock:
+                self.counts[i] += 1
+                self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self):
+        with self.lock:
+            return {"count": sum(self.counts), "sum": self.sum, "buckets": list(self.counts)}
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._unlabeled().observe(value)
+
+    def time(self):
+        return self._unlabeled().time()
+
+    def samples(self):
+        out = []
+        for key, child in self._items():
+            snap = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), snap["buckets"]):
+                cumulative += count
+                labels = _label_str(self.labelnames, key, [("le", _fmt(bound))])
+                out.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_str(self.labelnames, key)
+            out.append(f"{self.name}_sum{labels} {_fmt(snap['sum'])}")
+            out.append(f"{self.name}_count{labels} {snap['count']}")
+        return out
+
+
+# Fed by graph.tracing for every finished span (nodes, LLM calls, tool calls, ASR/TTS)
+SPAN_SECONDS = Histogram("graph_span_duration_seconds", "Duration of traced pipeline spans", ["span"])
+SPAN_ERRORS = Counter("graph_span_errors_total", "Traced pipeline spans that raised", ["span"])
+
+
+def observe_span(name, duration_ms, error=False):
+    SPAN_SECONDS.labels(name).observe(duration_ms / 1000)
+    if error:
+        SPAN_ERRORS.labels(name).inc()
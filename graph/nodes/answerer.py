@@ -1,77 +1,82 @@
+import os
 import json
-from rapidfuzz import fuzz
+import time
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+from scipy.optimize import linear_sum_assignment
 from graph.llm_client import get_llm_client, load_prompt
+from graph.nodes.critic import StreamingCritic
+from graph.streaming import emit, check_cancelled
+from graph.nodes.retriever import rag_confidence, relevance_threshold
+from graph.tracing import span
 
 
-def reconcile(rag_items, web_items):
-    """Match RAG results with web results using fuzzy matching."""
-    out = []
-    matched_web_urls = set()
-    
-    # First pass: match RAG items with web items
-    for r in rag_items:
-        match = None
-        score_best = 0
-        for w in (web_items or []):
-            s = fuzz.token_set_ratio(r.get("title", ""), w.get("title", ""))
-            if s > score_best:
-                score_best, match = s, w
-        
-        # Check for price conflict
-        conflict = None
-        if match and r.get("price") and match.get("price"):
-            try:
-                rag_price = float(r["price"])
-                web_price = float(match["price"])
-                diff_pct = abs(rag_price - web_price) / rag_price * 100
-                if diff_pct > 10:
-                    conflict = f"price_diff_{diff_pct:.1f}%"
-            except (ValueError, TypeError):
-                pass
-        
-        if match and score_best > 80:
-            matched_web_urls.add(match.get("url"))
-        
-        out.append({
-            "primary": r,
-            "web_match": match if score_best > 80 else None,
-            "score": score_best,
-            "conflict": conflict,
-            "source_type": "rag"
-        })
-    
-    # Second pass: add unmatched web items as standalone entries
-    for w in (web_items or []):
-        if w.get("url") not in matched_web_urls:
-            out.append({
-                "primary": w,
-                "web_match": None,
-                "score": 0,
-                "conflict": None,
-                "source_type": "web_only"
-            })
-    
+RECONCILE_MIN_SCORE = float(os.getenv("RECONCILE_MIN_SCORE", "80"))
+PRICE_CONFLICT_PCT = float(os.getenv("PRICE_CONFLICT_PCT", "10"))
+
+
+def _prices(items):
+    """Item prices as a float array (NaN where missing or unparseable)."""
+    out = np.full(len(items), np.nan)
+    for i, item in enumerate(items):
+        try:
+            out[i] = float(str(item.get("price")).replace("$", "").replace(",", ""))
+        except (TypeError, ValueError):
+            pass
     return out
 
 
-def answer(state):
+def reconcile(rag_items, web_items, min_score=None):
     """
-    Answerer Agent: Synthesize grounded response using LLM.
+    Match RAG results with web results using fuzzy title matching.
+
+    One cdist score matrix, an optimal one-to-one assignment, and bulk
+    price-conflict checks over the matched pairs.
     """
-    rag = (state.get("evidence") or {}).get("rag", [])
-    web = (state.get("evidence") or {}).get("web", [])
-    plan = state.get("plan") or {}
-    transcript = state.get("transcript", "")
-    
-    # Check for empty evidence
-    if not rag and not web:
-        state.update(
-            answer="I couldn't find any products matching those criteria. Try broadening your search or adjusting filters.",
-            citations=[]
+    rag_items, web_items = list(rag_items or []), list(web_items or [])
+    min_score = RECONCILE_MIN_SCORE if min_score is None else min_score
+    out = [{"primary": r, "web_match": None, "score": 0, "conflict": None, "source_type": "rag"}
+           for r in rag_items]
+    matched_web = set()
+
+    if rag_items and web_items:
+        # Titles are normalized once (lower-case, punctuation stripped), not per pair
+        scores = process.cdist(
+            [utils.default_process(r.get("title") or "") for r in rag_items],
+            [utils.default_process(w.get("title") or "") for w in web_items],
+            scorer=fuzz.token_set_ratio, score_cutoff=min_score, dtype=np.uint8, workers=-1,
         )
-        state.setdefault("log", []).append({"node": "answerer", "status": "no_results"})
-        return state
-    
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        keep = scores[rows, cols] > min_score
+        rows, cols = rows[keep], cols[keep]
+
+        rag_prices, web_prices = _prices(rag_items)[rows], _prices(web_items)[cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            diff_pct = np.abs(rag_prices - web_prices) / rag_prices * 100
+        conflicts = (diff_pct > PRICE_CONFLICT_PCT) & (rag_prices > 0)
+
+        for r, w, score, conflict, pct in zip(rows, cols, scores[rows, cols], conflicts, diff_pct):
+            out[r].update(web_match=web_items[w], score=int(score),
+                          conflict=f"price_diff_{pct:.1f}%" if conflict else None)
+            matched_web.add(int(w))
+
+    # Unmatched web items as standalone entries
+    out.extend({"primary": w, "web_match": None, "score": 0, "conflict": None, "source_type": "web_only"}
+               for i, w in enumerate(web_items) if i not in matched_web)
+    return out
+
+
+NO_RESULTS = "I couldn't find any products matching those criteria. Try broadening your search or adjusting filters."
+
+
+def build_messages(rag, web, transcript):
+    """Answerer prompt for this evidence; returns (messages, reconcile_log)."""
+    # Cross-check catalog items against web listings (same product, price drift)
+    start = time.perf_counter()
+    reconciled = reconcile(rag, web) if rag and web else []
+    reconcile_ms = round((time.perf_counter() - start) * 1000, 2)
+    matches = [e for e in reconciled if e["web_match"]]
+
     # Load system prompt
     system_prompt = load_prompt("system_answerer.md")
     
@@ -84,11 +89,20 @@ def answer(state):
         for i, r in enumerate(rag[:5], 1):
             evidence_text += f"{i}. **{r.get('title', 'Unknown')}**\n"
             evidence_text += f"   - Doc ID: {r.get('doc_id') or r.get('sku')}\n"
+            if r.get("score") is not None:
+                evidence_text += f"   - Relevance: {r['score']:.2f}\n"
             evidence_text += f"   - Category: {r.get('category', 'N/A')}\n"
             evidence_text += f"   - Brand: {r.get('brand') or 'N/A'}\n"
             evidence_text += f"   - Price: ${r.get('price', 'N/A')}\n"
             evidence_text += f"   - Rating: {r.get('rating', 'N/A')}\n"
-            evidence_text += f"   - Ingredients: {r.get('ingredients', 'N/A')[:100]}\n\n"
+            evidence_text += f"   - Ingredients: {(r.get('ingredients') or 'N/A')[:100]}\n"
+            match = reconciled[i - 1] if reconciled else None
+            if match and match["web_match"]:
+                evidence_text += f"   - Also on web: {match['web_match'].get('url')}\n"
+                if match["conflict"]:
+                    evidence_text += (f"   - Price conflict: catalog ${r.get('price')} vs web "
+                                      f"{match['web_match'].get('price')} - mention the difference\n")
+            evidence_text += "\n"
     
     # Show web results separately
     if web:
@@ -96,12 +110,22 @@ def answer(state):
         for i, w in enumerate(web[:5], 1):
             evidence_text += f"{i}. **{w.get('title', 'Unknown')}**\n"
             evidence_text += f"   - URL: {w.get('url')}\n"
-            evidence_text += f"   - Snippet: {w.get('snippet', 'N/A')[:200]}\n"
+            evidence_text += f"   - Snippet: {(w.get('snippet') or 'N/A')[:200]}\n"
             evidence_text += f"   - Price: {w.get('price') or 'Not available'}\n\n"
     
     # Add decision guidance
-    evidence_text += "\n**IMPORTANT**: Check if the RAG results are RELEVANT to the user query. "
-    evidence_text += "If RAG results are off-topic (wrong product category), use ONLY the web results in your answer."
+    confidence = rag_confidence(rag)
+    if confidence is not None and confidence < relevance_threshold():
+        evidence_text += (f"\n**IMPORTANT**: The best catalog match has relevance {confidence:.2f}, below the "
+                          f"{relevance_threshold():.2f} threshold: treat the RAG results as off-topic and "
+                          + ("use ONLY the web results in your answer." if web else
+                             "say that no matching products were found."))
+    elif confidence is not None:
+        evidence_text += ("\n**IMPORTANT**: Prefer the most relevant RAG results; skip any that are clearly "
+                          "a different product category.")
+    else:
+        evidence_text += "\n**IMPORTANT**: Check if the RAG results are RELEVANT to the user query. "
+        evidence_text += "If RAG results are off-topic (wrong product category), use ONLY the web results in your answer."
     
     # Prepare messages
     context = f"""
@@ -116,71 +140,170 @@ Synthesize a concise voice response (≤15 seconds / ~50 words) with proper cita
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": context}
     ]
+    return messages, {
+        "matches": len(matches),
+        "price_conflicts": sum(1 for e in matches if e["conflict"]),
+        "duration_ms": reconcile_ms
+    }
+
+
+def build_citations(rag, web):
+    """Citations from all available sources (LLM will use what it needs)."""
+    citations = []
+    
+    # Add RAG citations
+    for r in rag[:5]:
+        citations.append({
+            "doc_id": r.get("doc_id") or r.get("sku"),
+            "source": "private",
+            "title": r.get("title", "")[:100]
+        })
+    
+    # Add web citations
+    for w in web[:5]:
+        citations.append({
+            "url": w.get("url"),
+            "source": "web",
+            "title": w.get("title", "")[:100]
+        })
+    return citations
+
+
+def fallback_answer(rag, web):
+    """Template-based answer when the LLM call fails; returns (text, citations)."""
+    lines = []
+    citations = []
+    
+    # Use web results if available, otherwise RAG
+    items_to_use = web[:3] if web else rag[:3]
+    
+    for i, item in enumerate(items_to_use, 1):
+        title = item.get('title', 'Product')[:60]
+        if 'url' in item:
+            # Web result
+            lines.append(f"{i}. {title} (see link)")
+            citations.append({"url": item.get("url"), "source": "web"})
+        else:
+            # RAG result
+            price = f"${item.get('price')}" if item.get('price') else "price N/A"
+            lines.append(f"{i}. {title} — {price}")
+            citations.append({
+                "doc_id": item.get("doc_id") or item.get("sku"),
+                "source": "private"
+            })
+    
+    return "Here are options that fit your request. " + " ".join(lines) + " See details on your screen.", citations
+
+
+def answer(state):
+    """
+    Answerer Agent: Synthesize grounded response using LLM.
+    """
+    rag = (state.get("evidence") or {}).get("rag", [])
+    web = (state.get("evidence") or {}).get("web", [])
+    transcript = state.get("transcript", "")
+    log = []
+    
+    # Check for empty evidence
+    if not rag and not web:
+        return {
+            "answer": NO_RESULTS,
+            "citations": [],
+            "log": [{"node": "answerer", "status": "no_results"}]
+        }
+    
+    messages, reconcile_log = build_messages(rag, web, transcript)
     
     # Call LLM
     try:
         llm = get_llm_client()
         response = llm.chat(messages, temperature=0.4, max_tokens=300)
-        
-        # Build citations from all available sources (LLM will use what it needs)
-        citations = []
-        
-        # Add RAG citations
-        for r in rag[:5]:
-            citations.append({
-                "doc_id": r.get("doc_id") or r.get("sku"),
-                "source": "private",
-                "title": r.get("title", "")[:100]
-            })
-        
-        # Add web citations
-        for w in web[:5]:
-            citations.append({
-                "url": w.get("url"),
-                "source": "web",
-                "title": w.get("title", "")[:100]
-            })
-        
+        citations = build_citations(rag, web)
         answer_text = response.strip()
         
     except Exception as e:
-        # Fallback to template-based answer
-        lines = []
-        citations = []
-        
-        # Use web results if available, otherwise RAG
-        items_to_use = web[:3] if web else rag[:3]
-        
-        for i, item in enumerate(items_to_use, 1):
-            title = item.get('title', 'Product')[:60]
-            if 'url' in item:
-                # Web result
-                lines.append(f"{i}. {title} (see link)")
-                citations.append({"url": item.get("url"), "source": "web"})
-            else:
-                # RAG result
-                price = f"${item.get('price')}" if item.get('price') else "price N/A"
-                lines.append(f"{i}. {title} — {price}")
-                citations.append({
-                    "doc_id": item.get("doc_id") or item.get("sku"),
-                    "source": "private"
-                })
-        
-        answer_text = "Here are options that fit your request. " + " ".join(lines) + " See details on your screen."
-        
-        state.setdefault("log", []).append({
+        answer_text, citations = fallback_answer(rag, web)
+        log.append({
             "node": "answerer",
             "warning": "llm_fallback",
             "error": str(e)
         })
     
     # Update state
-    state.update(answer=answer_text, citations=citations)
-    state.setdefault("log", []).append({
+    log.append({
+        "node": "answerer",
+        "rag_count": len(rag),
+        "web_count": len(web),
+        "citations_count": len(citations),
+        "reconcile": reconcile_log
+    })
+    
+    return {"answer": answer_text, "citations": citations, "log": log}
+
+
+def answer_stream(state):
+    """
+    Streaming Answerer: generate the answer token by token and run the
+    critic per sentence, handing approved sentences to the sentence sink
+    (graph/streaming.py) while the rest is still being generated.
+    Replaces the answerer + critic pair in build_graph(streaming=True).
+    """
+    evidence = state.get("evidence") or {}
+    rag, web = evidence.get("rag", []), evidence.get("web", [])
+    transcript = state.get("transcript", "")
+    critic = StreamingCritic(evidence, build_citations(rag, web), state.get("safety_flags"))
+    log = []
+    
+    def release(verdicts):
+        for v in verdicts:
+            emit(v)
+    
+    if critic.safety_flags:
+        # No generation needed: the critic would replace the answer anyway
+        critic.citations = []
+        release(critic.feed(critic.refusal()))
+        release(critic.finish())
+        return {"answer": critic.answer, "citations": [],
+                "log": [{"node": "answerer", "status": "safety_refusal"}, critic.log_entry()]}
+    
+    if not rag and not web:
+        release(critic.feed(NO_RESULTS))
+        release(critic.finish())
+        return {"answer": critic.answer, "citations": [],
+                "log": [{"node": "answerer", "status": "no_results"}, critic.log_entry()]}
+    
+    messages, reconcile_log = build_messages(rag, web, transcript)
+    first_token_ms = None
+    try:
+        llm = get_llm_client()
+        with span("llm.chat_stream", provider=llm.provider, model=getattr(llm, "model", "")) as s:
+            for delta in llm.chat_stream(messages, temperature=0.4, max_tokens=300):
+                check_cancelled()  # closing the stream stops generation upstream
+                if first_token_ms is None:
+                    first_token_ms = s.duration_ms
+                release(critic.feed(delta))
+    except Exception as e:
+        if not critic.sentences and not critic.buffer.strip():
+            text, citations = fallback_answer(rag, web)
+            critic.citations = citations
+            release(critic.feed(text))
+        log.append({
+            "node": "answerer",
+            "warning": "llm_fallback" if not critic.sentences else "stream_interrupted",
+            "error": str(e)
+        })
+    release(critic.finish())
+    
+    log.append({
         "node": "answerer",
+        "mode": "streaming",
         "rag_count": len(rag),
         "web_count": len(web),
-        "citations_count": len(citations)
+        "citations_count": len(critic.citations),
+        "first_token_ms": first_token_ms,
+        "sentences": len(critic.sentences),
+        "reconcile": reconcile_log
     })
+    log.append(critic.log_entry())
     
-    return state
+    return {"answer": critic.answer, "citations": critic.citations, "log": log}
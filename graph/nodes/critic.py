@@ -2,6 +2,14 @@ import re
 from datetime import datetime
 
 
+def safety_refusal(safety_flags):
+    """Answer for safety-flagged queries (critic, streaming critic and graph short-circuit)."""
+    return (
+        "I can help with product recommendations, but I cannot provide advice on "
+        f"{', '.join(safety_flags)}. Please consult manufacturer instructions or a qualified professional."
+    )
+
+
 def critique(state):
     """
     Critic Agent: Verify safety, grounding, citations, and answer quality.
@@ -19,25 +27,23 @@ def critique(state):
     
     status = "pass"
     issues = []
+    updates = {}
     
     # 1. Safety Check
     if safety_flags:
-        state["answer"] = (
-            "I can help with product recommendations, but I cannot provide advice on "
-            f"{', '.join(safety_flags)}. Please consult manufacturer instructions or a qualified professional."
-        )
+        updates["answer"] = safety_refusal(safety_flags)
         status = "fail"
         log_entry["checks"]["safety"] = "fail"
         log_entry["safety_flags"] = safety_flags
-        state.setdefault("log", []).append(log_entry)
-        return state
+        updates["log"] = [log_entry]
+        return updates
     else:
         log_entry["checks"]["safety"] = "pass"
     
     # 2. Empty Evidence Check
     if not any(evidence.values()):
         if "couldn't find" not in answer.lower() and "no products" not in answer.lower():
-            state["answer"] = "I couldn't find any products matching those criteria. Try broadening your search."
+            updates["answer"] = "I couldn't find any products matching those criteria. Try broadening your search."
             status = "fail"
             issues.append("empty_evidence_not_acknowledged")
         log_entry["checks"]["evidence"] = "warn" if not any(evidence.values()) else "pass"
@@ -58,7 +64,7 @@ def critique(state):
             if doc_id and not any(c.get("doc_id") == doc_id for c in citations):
                 citations.append({"doc_id": doc_id, "source": "private"})
         
-        state["citations"] = citations
+        updates["citations"] = citations
         log_entry["checks"]["citations"] = "fixed"
     elif has_private_citation:
         log_entry["checks"]["citations"] = "pass"
@@ -73,7 +79,7 @@ def critique(state):
             url = item.get("url")
             if url and not any(c.get("url") == url for c in citations):
                 citations.append({"url": url, "source": "web"})
-        state["citations"] = citations
+        updates["citations"] = citations
     
     # 4. Grounding Check - Look for specific claims
     # Check if answer mentions prices/ratings not in evidence
@@ -130,7 +136,7 @@ def critique(state):
                 domain = c["url"].split("/")[2] if "/" in c["url"] else c["url"]
                 cite_parts.append(domain)
         cite_text += ", ".join(cite_parts) + ")"
-        state["answer"] = answer + cite_text
+        updates["answer"] = answer + cite_text
         log_entry["checks"]["citation_format"] = "fixed"
     else:
         log_entry["checks"]["citation_format"] = "pass"
@@ -144,6 +150,142 @@ def critique(state):
     log_entry["status"] = status
     log_entry["issues"] = issues
     
-    state.setdefault("log", []).append(log_entry)
+    updates["log"] = [log_entry]
     
-    return state
+    return updates
+
+
+# --- Streaming critic --------------------------------------------------------
+# Same checks as critique(), applied per sentence while the answer streams so
+# approved sentences can go to TTS before generation ends.
+
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+')
+PRICE_RE = re.compile(r'\$\d[\d,]*(?:\.\d+)?')
+SOURCES_RE = re.compile(r'\s*\(Sources?:\s*([^)]*)\)', re.I)
+MAX_ANSWER_CHARS = 500  # same limit as the answer_too_long check
+
+
+def _cents(value):
+    try:
+        return round(float(str(value).replace("$", "").replace(",", "")) * 100)
+    except (TypeError, ValueError):
+        return None
+
+
+def _domain(url):
+    return url.split("/")[2] if url and "//" in url else url
+
+
+def speech_text(text):
+    """Sentence as it should be spoken: citation parentheticals removed."""
+    return SOURCES_RE.sub("", text).strip()
+
+
+class StreamingCritic:
+    """
+    Validate an answer sentence by sentence as it is generated.
+
+    Evidence prices and citation ids are computed once up front. feed()
+    returns a verdict for each sentence completed by the new text:
+    {"index", "text", "speech", "status", "issues"}, where status is
+    "pass", "repaired" (ungrounded prices or unknown sources removed) or
+    "held" (kept on screen but not spoken, e.g. past the length limit).
+    """
+
+    def __init__(self, evidence, citations=None, safety_flags=None, max_chars=MAX_ANSWER_CHARS):
+        self.evidence = evidence or {}
+        self.citations = list(citations or [])
+        self.safety_flags = list(safety_flags or [])
+        self.max_chars = max_chars
+        self.prices = {c for items in self.evidence.values() for item in items
+                       if (c := _cents(item.get("price"))) is not None}
+        self.doc_ids = {str(item.get("doc_id") or item.get("sku")) for item in self.evidence.get("rag", [])}
+        self.domains = {_domain(item.get("url")) for item in self.evidence.get("web", []) if item.get("url")}
+        self.buffer = ""
+        self.sentences = []
+        self.spoken_chars = 0
+
+    def refusal(self):
+        """Safety check: the whole answer is replaced before anything is generated."""
+        return safety_refusal(self.safety_flags)
+
+    def feed(self, delta):
+        self.buffer += delta
+        verdicts = []
+        while (m := SENTENCE_END.search(self.buffer)):
+            sentence, self.buffer = self.buffer[:m.end()].strip(), self.buffer[m.end():]
+            if sentence:
+                verdicts.append(self.check(sentence))
+        return verdicts
+
+    def finish(self):
+        """Flush the last sentence and run the whole-answer checks."""
+        sentence, self.buffer = self.buffer.strip(), ""
+        verdicts = [self.check(sentence)] if sentence else []
+        if not any(self.evidence.values()) and not self.sentences:
+            verdicts.append(self.check("I couldn't find any products matching those criteria. Try broadening your search."))
+        if self.citations and not any(s["cited"] for s in self.sentences):
+            # Display-only citation list, as critique() appends it
+            parts = [f"doc #{c['doc_id']}" if c.get("doc_id") else _domain(c.get("url", ""))
+                     for c in self.citations[:5]]
+            verdicts.append(self.check(f"(Sources: {', '.join(p for p in parts if p)})"))
+        return verdicts
+
+    def check(self, sentence):
+        issues = []
+        text = sentence
+
+        # Grounding: every price must appear in the evidence
+        for price in PRICE_RE.findall(text):
+            if _cents(price) not in self.prices:
+                issues.append(f"ungrounded_price: {price}")
+                text = text.replace(price, "the listed price", 1)
+
+        # Citations: keep only ids/domains that exist in the evidence
+        cited = False
+        m = SOURCES_RE.search(text)
+        if m:
+            parts = [p.strip() for p in m.group(1).split(",") if p.strip()]
+            known = [p for p in parts if re.sub(r"^doc\s*#\s*", "", p) in self.doc_ids or p in self.domains]
+            if len(known) < len(parts):
+                issues.append(f"unknown_sources: {[p for p in parts if p not in known]}")
+            cited = bool(known)
+            text = text[:m.start()] + (f" (Sources: {', '.join(known)})" if known else "") + text[m.end():]
+
+        speech = speech_text(text)
+        status = "repaired" if issues else "pass"
+        if speech and self.spoken_chars + len(speech) > self.max_chars:
+            status = "held"
+            issues.append("answer_too_long")
+        elif speech:
+            self.spoken_chars += len(speech) + 1
+
+        verdict = {"index": len(self.sentences), "text": text.strip(), "speech": speech if status != "held" else "",
+                   "status": status, "issues": issues, "cited": cited}
+        self.sentences.append(verdict)
+        return verdict
+
+    @property
+    def answer(self):
+        return " ".join(s["text"] for s in self.sentences if s["text"])
+
+    def log_entry(self):
+        """Critic log entry in the same shape as critique()'s."""
+        counts = {k: sum(1 for s in self.sentences if s["status"] == k) for k in ("pass", "repaired", "held")}
+        issues = [i for s in self.sentences for i in s["issues"]]
+        checks = {
+            "safety": "fail" if self.safety_flags else "pass",
+            "grounding": "fixed" if any(i.startswith("ungrounded_price") for i in issues) else "pass",
+            "citations": "fixed" if any(i.startswith("unknown_sources") for i in issues) else "pass",
+            "coherence": "warn" if counts["held"] or len(self.answer) < 20 else "pass",
+        }
+        status = "fail" if self.safety_flags else ("warn" if issues or checks["coherence"] == "warn" else "pass")
+        return {
+            "node": "critic",
+            "mode": "streaming",
+            "timestamp": datetime.now().isoformat(),
+            "checks": checks,
+            "sentences": counts,
+            "status": status,
+            "issues": issues,
+        }
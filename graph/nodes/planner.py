@@ -9,6 +9,7 @@ def plan(state):
     intent = state.get("intent") or {}
     constraints = intent.get("constraints") or {}
     transcript = state.get("transcript", "")
+    log = []
     
     # Load system prompt
     system_prompt = load_prompt("system_planner.md")
@@ -70,14 +71,13 @@ Design an execution plan as JSON.
             "comparison_strategy": "price_check" if intent.get("needs_live") else "none"
         }
         
-        state.setdefault("log", []).append({
+        log.append({
             "node": "planner",
             "warning": "llm_fallback",
             "error": str(e)
         })
     
     # Update state
-    state.update(plan=plan)
-    state.setdefault("log", []).append({"node": "planner", "plan": plan})
+    log.append({"node": "planner", "plan": plan})
     
-    return state
+    return {"plan": plan, "log": log}
@@ -0,0 +1,48 @@
+from datetime import datetime
+from graph.nodes.critic import StreamingCritic, safety_refusal
+from graph.nodes.retriever import discard_speculation
+from graph.streaming import emit
+
+OUT_OF_SCOPE = (
+    "I can only help with finding and comparing cleaning products. "
+    "Tell me what you need to clean, and any budget or brand, and I'll suggest some options."
+)
+
+# Nodes a short-circuited turn never runs (batch graph; the streaming graph has no critic)
+SKIPPED = ["planner", "rag_retriever", "web_retriever", "answerer", "critic"]
+
+
+def short_circuit_reason(state):
+    """"safety", "out_of_scope" or None when the turn needs the full pipeline."""
+    if state.get("safety_flags"):
+        return "safety"
+    if ((state.get("intent") or {}).get("task")) == "out_of_scope":
+        return "out_of_scope"
+    return None
+
+
+def respond(state):
+    """
+    Responder: templated answer for safety-flagged and out-of-scope turns,
+    routed here straight from the router. No LLM or tool calls; the
+    sentences still go through the streaming critic so voice clients hear them.
+    """
+    reason = short_circuit_reason(state)
+    text = safety_refusal(state["safety_flags"]) if reason == "safety" else OUT_OF_SCOPE
+    discard_speculation()  # nothing will consume the speculative rag.search
+
+    critic = StreamingCritic({}, [], state.get("safety_flags"))
+    for verdict in critic.feed(text) + critic.finish():
+        emit(verdict)
+    print(f"[graph] short-circuit ({reason}): skipped {', '.join(SKIPPED)}")
+
+    return {
+        "answer": critic.answer,
+        "citations": [],
+        "log": [{
+            "node": "responder",
+            "timestamp": datetime.now().isoformat(),
+            "reason": reason,
+            "skipped": SKIPPED,
+        }],
+    }
@@ -1,13 +1,82 @@
 import os
+import re
 import httpx
 import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from graph.tracing import span, current_span, find_span
+
+
+# Speculative retrieval: rag.search on the raw transcript runs while the
+# router and planner LLM calls are in flight.
+_spec_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-rag")
+_spec_lock = threading.Lock()
+_spec_stats = {"attempts": 0, "hits": 0, "saved_ms": 0}
+# In-flight speculations keyed by the span id of their graph.invoke root;
+# futures never go into GraphState.
+_speculations = {}
+
+
+def speculation_enabled() -> bool:
+    return os.getenv("SPECULATIVE_RETRIEVAL", "false").lower() in ("1", "true", "yes")
+
+
+def speculation_settings() -> dict:
+    """Speculation knobs, read per call like SPECULATIVE_RETRIEVAL."""
+    return {
+        "top_k": int(os.getenv("SPECULATIVE_TOP_K", "15")),
+        "min_similarity": float(os.getenv("SPECULATIVE_MIN_SIMILARITY", "60")),
+        "min_coverage": float(os.getenv("SPECULATIVE_MIN_COVERAGE", "75")),
+        "max_wait_ms": float(os.getenv("SPECULATIVE_MAX_WAIT_MS", "1000")),
+    }
+
+
+def _invocation_key():
+    root = find_span("graph.invoke")
+    return root.span_id if root else None
+
+
+def take_speculation(key=None):
+    """Remove and return the speculation for this graph invocation (or None)."""
+    key = key or _invocation_key()
+    with _spec_lock:
+        return _speculations.pop(key, None) if key else None
+
+
+def discard_speculation(key=None):
+    """Drop (and cancel, if not started) this invocation's speculation."""
+    speculation = take_speculation(key)
+    if speculation:
+        speculation["future"].cancel()
+
+
+def speculation_stats() -> dict:
+    """Cumulative speculative retrieval counters for this process."""
+    with _spec_lock:
+        stats = dict(_spec_stats)
+    stats["hit_rate"] = round(stats["hits"] / stats["attempts"], 3) if stats["attempts"] else 0.0
+    return stats
+
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Shared, pooled client for MCP tool calls (keeps connections warm)."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = httpx.Client(timeout=20, limits=httpx.Limits(max_connections=32, max_keepalive_connections=16))
+        return _http
 
 
 def call_tool(path, payload):
     """Call MCP tool endpoint with error handling."""
     try:
-        with httpx.Client(timeout=20) as c:
-            r = c.post(path, json=payload)
+        with span(f"tool.{path.rsplit('/', 1)[-1]}"):
+            r = get_http_client().post(path, json=payload)
             r.raise_for_status()
             return r.json().get("results", [])
     except httpx.HTTPError as e:
@@ -18,63 +87,384 @@ def call_tool(path, payload):
         return []
 
 
-def retrieve(state):
+def _timed_call(path, payload, origin_trace_id=None):
+    start = time.time()
+    with span("speculative.rag.search", origin_trace_id=origin_trace_id or ""):
+        results = call_tool(path, payload)
+    return results, start, time.time()
+
+
+# Words that carry no product meaning, and constraints the planner moves
+# into filters/live search, are ignored when comparing queries.
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "for", "of", "to", "in", "on", "with", "at", "by", "from",
+    "is", "are", "be", "it", "its", "this", "that", "these", "those", "some", "any", "my", "me",
+    "i", "i'm", "you", "your", "we", "our", "can", "could", "would", "should", "please", "do",
+    "does", "what", "what's", "which", "where", "how", "who", "show", "find", "get", "give",
+    "recommend", "suggest", "need", "want", "looking", "look", "search", "buy", "best", "good",
+    "great", "top", "cheap", "cheapest", "affordable", "price", "prices", "priced", "cost",
+    "available", "availability", "stock", "today", "now", "current", "currently", "latest",
+    "options", "option", "product", "products", "something", "one", "ones",
+}
+CONSTRAINT_PATTERNS = [
+    r"(under|below|less than|cheaper than|up to|at most|max(imum)?|within|around|about)\s*\$?\d+(\.\d+)?(\s*(dollars|bucks))?",
+    r"\$\d+(\.\d+)?",
+    r"\b(in stock|right now|current price|on sale)\b",
+]
+
+
+def _content_tokens(text):
+    """Lower-cased content words of a query, constraint phrases removed, crude plural folding."""
+    text = (text or "").lower()
+    for pattern in CONSTRAINT_PATTERNS:
+        text = re.sub(pattern, " ", text)
+    tokens = set()
+    for tok in re.findall(r"[a-z0-9']+", text):
+        tok = tok.strip("'")
+        if not tok or tok in STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.add(tok)
+    return tokens
+
+
+def query_similarity(transcript, query):
+    """
+    Containment (0-100): share of the planner query's content words that the
+    transcript already had. Words the planner adds lower it.
+    """
+    tq, tt = _content_tokens(query), _content_tokens(transcript)
+    if not tq or not tt:
+        return 0.0
+    return 100 * len(tq & tt) / len(tq)
+
+
+def query_coverage(transcript, query):
+    """Share (0-100) of the transcript's content words the planner query kept; drops lower it."""
+    tq, tt = _content_tokens(query), _content_tokens(transcript)
+    if not tq or not tt:
+        return 0.0
+    return 100 * len(tq & tt) / len(tt)
+
+
+def _match_filter(value, cond):
+    """Evaluate one Chroma metadata condition against a result value."""
+    if not isinstance(cond, dict):
+        return value == cond
+    for op, target in cond.items():
+        try:
+            if op == "$eq" and not value == target:
+                return False
+            if op == "$ne" and not value != target:
+                return False
+            if op == "$lt" and not (value is not None and float(value) < float(target)):
+                return False
+            if op == "$lte" and not (value is not None and float(value) <= float(target)):
+                return False
+            if op == "$gt" and not (value is not None and float(value) > float(target)):
+                return False
+            if op == "$gte" and not (value is not None and float(value) >= float(target)):
+                return False
+            if op == "$in" and value not in target:
+                return False
+            if op == "$nin" and value in target:
+                return False
+            if op not in ("$eq", "$ne", "$lt", "$lte", "$gt", "$gte", "$in", "$nin"):
+                raise ValueError(op)
+        except (TypeError, ValueError):
+            return None
+    return True
+
+
+def post_filter(results, filters):
     """
-    Retriever Agent: Execute tool calls based on plan.
+    Apply simple metadata filters to already-retrieved results.
+
+    Returns None when a filter can't be evaluated locally (unknown operator,
+    field missing from all results), so the caller falls back to a real query.
+    A field missing from only some results is empty there (the tool server
+    omits empty values).
     """
+    if not filters:
+        return list(results)
+    if len(filters) == 1 and "$and" in filters:
+        clauses = filters["$and"]
+    elif any(k.startswith("$") for k in filters):
+        return None
+    else:
+        clauses = [{k: v} for k, v in filters.items()]
+
+    known = set().union(*(item.keys() for item in results))
+    out = []
+    for item in results:
+        keep = True
+        for clause in clauses:
+            if len(clause) != 1:
+                return None
+            (key, cond), = clause.items()
+            if key.startswith("$") or key not in known:
+                return None
+            ok = _match_filter(item.get(key), cond)
+            if ok is None:
+                return None
+            if not ok:
+                keep = False
+                break
+        if keep:
+            out.append(item)
+    return out
+
+
+def speculate(state):
+    """
+    Speculator: launch rag.search on the raw transcript before routing.
+
+    The call runs on a background thread; the RAG retrieval later decides
+    whether the planner's query is close enough to reuse the results.
+    """
+    text = (state.get("transcript") or "").strip()
+    key = _invocation_key()
+    if not speculation_enabled() or not text or key is None:
+        return {"log": []}
+
+    base = os.getenv("MCP_BASE", "http://127.0.0.1:8000")
+    payload = {"query": text, "top_k": speculation_settings()["top_k"], "filters": {}}
+    # Own trace (fresh context): a discarded call may outlive the graph's root span
+    origin = current_span()
+    future = _spec_executor.submit(
+        contextvars.Context().run, _timed_call, f"{base}/rag.search", payload,
+        origin.trace_id if origin else None
+    )
+    with _spec_lock:
+        _speculations[key] = {"future": future, "payload": payload}
+    return {"log": [{"node": "speculator", "query": text, "top_k": payload["top_k"]}]}
+
+
+def use_speculation(speculation, payload):
+    """
+    Try to answer a rag.search payload from the speculative call.
+
+    Returns (results, log_entry); results is None when the speculation
+    had to be discarded.
+    """
+    settings = speculation_settings()
+    entry = {"speculative": "miss"}
+    future = speculation.get("future")
+    spec_payload = speculation.get("payload") or {}
+
+    similarity = query_similarity(spec_payload.get("query"), payload["query"])
+    coverage = query_coverage(spec_payload.get("query"), payload["query"])
+    entry["query_similarity"] = round(similarity, 1)
+    entry["query_coverage"] = round(coverage, 1)
+
+    results = None
+    if similarity < settings["min_similarity"] or coverage < settings["min_coverage"]:
+        entry["reason"] = "query_changed"
+    elif payload["top_k"] > spec_payload.get("top_k", 0):
+        entry["reason"] = "top_k_exceeded"
+    elif not future.running() and not future.done():
+        # Still queued behind other speculations: a direct query is faster.
+        entry["reason"] = "queued"
+    else:
+        wait_start = time.time()
+        try:
+            spec_results, started, finished = future.result(timeout=settings["max_wait_ms"] / 1000)
+        except FutureTimeout:
+            spec_results = None
+            entry["reason"] = "timeout"
+        if spec_results is None:
+            pass
+        elif not spec_results:
+            entry["reason"] = "empty"
+        elif (filtered := post_filter(spec_results, payload.get("filters"))) is None:
+            entry["reason"] = "filters_incompatible"
+        elif len(filtered) < payload["top_k"] and len(spec_results) >= spec_payload["top_k"]:
+            # Filtering left too few rows from a truncated list: a filtered
+            # query could have found more.
+            entry["reason"] = "filtered_too_few"
+        else:
+            results = filtered[:payload["top_k"]]
+            # Latency saved = what the query would have cost minus the time we
+            # still had to wait for the speculative call to finish.
+            entry["speculative"] = "hit"
+            entry["saved_ms"] = max(0, int(((finished - started) - (time.time() - wait_start)) * 1000))
+
+    if results is None:
+        future.cancel()
+
+    with _spec_lock:
+        _spec_stats["attempts"] += 1
+        if results is not None:
+            _spec_stats["hits"] += 1
+            _spec_stats["saved_ms"] += entry["saved_ms"]
+    entry["hit_rate"] = speculation_stats()["hit_rate"]
+    return results, entry
+
+
+RAG_REQUIRED_FIELDS = {"title", "price"}
+
+
+# Confidence-gated web search: web.search (slow, paid) runs next to
+# rag.search only when live data is needed, otherwise only as a fallback
+# when the catalog's best match is below the relevance threshold.
+def web_gating_enabled() -> bool:
+    return os.getenv("RAG_GATED_WEB", "true").lower() in ("1", "true", "yes")
+
+
+def relevance_threshold() -> float:
+    """Min cosine similarity of the best rag.search match to trust the catalog alone."""
+    return float(os.getenv("RAG_RELEVANCE_THRESHOLD", "0.35"))
+
+
+def rag_confidence(results):
+    """Best rag.search score, or None when the results carry no scores."""
+    scores = [r["score"] for r in results or [] if r.get("score") is not None]
+    return max(scores) if scores else None
+
+
+def web_mode(state):
+    """
+    How web.search runs for this plan: "parallel" (alongside rag.search),
+    "fallback" (after rag.search, if its confidence is low) or None.
+    """
+    sources = (state.get("plan") or {}).get("sources", ["rag.search"])
+    if not web_gating_enabled() or "rag.search" not in sources:
+        return "parallel" if "web.search" in sources else None
+    if (state.get("intent") or {}).get("needs_live"):
+        return "parallel"
+    return "fallback"
+
+
+def web_fallback_needed(state, rag_results):
+    """Low RAG confidence: no results, or the best score is under RAG_RELEVANCE_THRESHOLD."""
+    if not rag_results:
+        return True
+    confidence = rag_confidence(rag_results)
+    if confidence is None:
+        # Unscored results (older tool server): keep the planner's choice
+        return "web.search" in (state.get("plan") or {}).get("sources", ["rag.search"])
+    return confidence < relevance_threshold()
+
+
+def web_decision(state, rag_results):
+    """Log value for the web.search decision after rag.search: parallel, fallback or skipped."""
+    mode = web_mode(state)
+    if mode == "fallback":
+        return "fallback" if web_fallback_needed(state, rag_results) else "skipped"
+    return mode or "skipped"
+
+
+def search_rag(state):
+    """Run rag.search for the plan; returns (results, tool_call_log)."""
+    base = os.getenv("MCP_BASE", "http://127.0.0.1:8000")
+    plan = state.get("plan") or {}
+    speculation = take_speculation()
+    start = time.time()
+    # ENFORCE: never send category filters (they don't match hierarchical paths)
+    filters = dict(plan.get("filters") or {})
+    filters.pop("category", None)  # strip category if present
+    payload = {
+        "query": plan.get("query_text", state.get("transcript", "")),
+        "top_k": plan.get("top_k", 5),
+        "filters": filters
+    }
+    if plan.get("fields"):
+        # The answerer always needs title and price (doc_id and score are always returned)
+        payload["fields"] = sorted(set(plan["fields"]) | RAG_REQUIRED_FIELDS)
+
+    call_log = {"tool": "rag.search", "payload": payload}
+    results = None
+    if speculation:
+        results, spec_entry = use_speculation(speculation, payload)
+        call_log.update(spec_entry)
+    if results is None:
+        results = call_tool(f"{base}/rag.search", payload)
+
+    call_log.update(
+        results_count=len(results),
+        duration_ms=int((time.time() - start) * 1000)
+    )
+    return results, call_log
+
+
+def search_web(state):
+    """Run web.search for the plan; returns (results, tool_call_log)."""
     base = os.getenv("MCP_BASE", "http://127.0.0.1:8000")
     plan = state.get("plan") or {}
+    start = time.time()
+    payload = {
+        "query": plan.get("query_text", state.get("transcript", "")),
+        "top_k": min(plan.get("top_k", 5), 5)  # Limit web to 5 max
+    }
+
+    results = call_tool(f"{base}/web.search", payload)
+    return results, {
+        "tool": "web.search",
+        "payload": payload,
+        "results_count": len(results),
+        "duration_ms": int((time.time() - start) * 1000)
+    }
+
+
+def retrieve_rag(state):
+    """
+    RAG retrieval branch: runs in parallel with the other retrieval branches.
+    """
+    results, call_log = search_rag(state)
+    return {
+        "evidence": {"rag": results},
+        "log": [{
+            "node": "retriever",
+            "branch": "rag",
+            "tool_calls": [call_log],
+            "total_results": {"rag": len(results)},
+            "confidence": rag_confidence(results),
+            "web_search": web_decision(state, results),
+        }]
+    }
+
+
+def retrieve_web(state):
+    """
+    Web retrieval branch: runs in parallel with the other retrieval branches.
+    """
+    results, call_log = search_web(state)
+    return {
+        "evidence": {"web": results},
+        "log": [{
+            "node": "retriever",
+            "branch": "web",
+            "tool_calls": [call_log],
+            "total_results": {"web": len(results)}
+        }]
+    }
+
+
+def retrieve(state):
+    """
+    Retriever Agent: Execute tool calls based on plan (sequentially).
+    """
+    plan = state.get("plan") or {}
     sources = plan.get("sources", ["rag.search"])
     
     evidence = {}
     tool_calls = []
+    entry = {"node": "retriever"}
     
     # Call RAG tool
     if "rag.search" in sources:
-        start = time.time()
-        # ENFORCE: never send category filters (they don't match hierarchical paths)
-        filters = plan.get("filters", {})
-        filters.pop("category", None)  # strip category if present
-        payload = {
-            "query": plan.get("query_text", state.get("transcript", "")),
-            "top_k": plan.get("top_k", 5),
-            "filters": filters
-        }
-        
-        results = call_tool(f"{base}/rag.search", payload)
-        evidence["rag"] = results
-        
-        tool_calls.append({
-            "tool": "rag.search",
-            "payload": payload,
-            "results_count": len(results),
-            "duration_ms": int((time.time() - start) * 1000)
-        })
-    
-    # Call Web tool
-    if "web.search" in sources:
-        start = time.time()
-        payload = {
-            "query": plan.get("query_text", state.get("transcript", "")),
-            "top_k": min(plan.get("top_k", 5), 5)  # Limit web to 5 max
-        }
-        
-        results = call_tool(f"{base}/web.search", payload)
-        evidence["web"] = results
-        
-        tool_calls.append({
-            "tool": "web.search",
-            "payload": payload,
-            "results_count": len(results),
-            "duration_ms": int((time.time() - start) * 1000)
-        })
+        evidence["rag"], call_log = search_rag(state)
+        tool_calls.append(call_log)
+        entry["confidence"] = rag_confidence(evidence["rag"])
+    else:
+        discard_speculation()
     
-    # Update state
-    state.update(evidence=evidence)
-    state.setdefault("log", []).append({
-        "node": "retriever",
-        "tool_calls": tool_calls,
-        "total_results": {k: len(v) for k, v in evidence.items()}
-    })
+    # Call Web tool (live data, or a fallback for low RAG confidence)
+    entry["web_search"] = web_decision(state, evidence.get("rag"))
+    if entry["web_search"] != "skipped":
+        evidence["web"], call_log = search_web(state)
+        tool_calls.append(call_log)
     
-    return state
+    entry.update(tool_calls=tool_calls, total_results={k: len(v) for k, v in evidence.items()})
+    return {"evidence": evidence, "log": [entry]}
@@ -7,14 +7,14 @@ def route(state):
     Router Agent: Extract intent, constraints, and safety flags using LLM.
     """
     text = (state.get("transcript") or "").strip()
+    log = []
     
     if not text:
-        state.update(
-            intent={"task": "out_of_scope", "constraints": {}, "needs_live": False},
-            safety_flags=[]
-        )
-        state.setdefault("log", []).append({"node": "router", "error": "empty_transcript"})
-        return state
+        return {
+            "intent": {"task": "out_of_scope", "constraints": {}, "needs_live": False},
+            "safety_flags": [],
+            "log": [{"node": "router", "error": "empty_transcript"}]
+        }
     
     # Load system prompt
     system_prompt = load_prompt("system_router.md")
@@ -60,18 +60,17 @@ def route(state):
         SAFE_DENY = ["mixing chemicals", "medical claims", "mix bleach", "mix ammonia"]
         safety_flags = [f for f in SAFE_DENY if f in text.lower()]
         
-        state.setdefault("log", []).append({
+        log.append({
             "node": "router",
             "warning": "llm_fallback",
             "error": str(e)
         })
     
     # Update state
-    state.update(intent=intent, safety_flags=safety_flags)
-    state.setdefault("log", []).append({
+    log.append({
         "node": "router",
         "intent": intent,
         "safety_flags": safety_flags
     })
     
-    return state
+    return {"intent": intent, "safety_flags": safety_flags, "log": log}
@@ -1,13 +1,27 @@
-from typing import TypedDict, List, Dict, Any
+from typing import TypedDict, List, Dict, Any, Annotated
+
+
+def merge_evidence(left, right):
+    """Reducer: combine evidence written by parallel retrieval branches (one key per source)."""
+    merged = dict(left or {})
+    for source, items in (right or {}).items():
+        merged[source] = list(items or [])
+    return merged
+
+
+def append_log(left, right):
+    """Reducer: nodes return only their new log entries; keep them in completion order."""
+    return list(left or []) + list(right or [])
+
 
 class GraphState(TypedDict):
     audio_path: str | None
     transcript: str | None
     intent: Dict[str, Any] | None
     plan: Dict[str, Any] | None
-    evidence: Dict[str, List[Dict]] | None
+    evidence: Annotated[Dict[str, List[Dict]] | None, merge_evidence]
     answer: str | None
     citations: List[Dict] | None
     safety_flags: List[str] | None
     tts_path: str | None
-    log: List[Dict] | None
+    log: Annotated[List[Dict] | None, append_log]
@@ -0,0 +1,97 @@
+"""
+Streaming answers - approved sentences leave the graph while the answerer
+is still generating.
+
+The answerer (answer_stream) checks each sentence with the StreamingCritic
+and hands approved ones to the sentence sink of the current invocation.
+The sink lives in a context variable, which LangGraph copies into its
+worker threads the same way it carries the tracing spans.
+
+A turn can also be cancelled (barge-in): stream_turn() takes a
+threading.Event, and nodes, the token loop and emit() check it and raise
+TurnCancelled, so no further LLM, tool or TTS work starts for that turn.
+"""
+import os
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+_sink = contextvars.ContextVar("sentence_sink", default=None)
+_cancel = contextvars.ContextVar("turn_cancel", default=None)
+
+
+class TurnCancelled(BaseException):
+    """The turn was cancelled. A BaseException, like asyncio.CancelledError, so
+    the nodes' `except Exception` fallbacks don't turn it into an answer."""
+
+
+def check_cancelled():
+    event = _cancel.get()
+    if event is not None and event.is_set():
+        raise TurnCancelled()
+
+
+def cancellable(fn):
+    """Graph node wrapper: don't start the node once the turn is cancelled."""
+    def node(state):
+        check_cancelled()
+        return fn(state)
+    return node
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("STREAMING_ANSWER", "true").lower() in ("1", "true", "yes")
+
+
+def emit(verdict):
+    """Pass an approved sentence verdict to this invocation's sink, if any."""
+    check_cancelled()
+    sink = _sink.get()
+    if sink is not None and verdict.get("speech"):
+        sink(verdict)
+
+
+def stream_turn(graph, state, on_sentence, cancel=None):
+    """
+    Invoke a build_graph(streaming=True) graph, calling on_sentence(verdict)
+    per approved sentence. Setting `cancel` (threading.Event) stops the turn
+    at the next node, token or sentence with TurnCancelled.
+    """
+    token, cancel_token = _sink.set(on_sentence), _cancel.set(cancel)
+    try:
+        return graph.invoke(state)
+    finally:
+        _sink.reset(token)
+        _cancel.reset(cancel_token)
+
+
+class SentenceSpeaker:
+    """
+    Sentence sink that synthesizes speech in arrival order on a background
+    thread, so the first sentence is voiced while later ones are generated.
+
+    synthesize(text) must return audio bytes.
+    """
+
+    def __init__(self, synthesize):
+        self.synthesize = synthesize
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-stream")
+        self.futures = []
+        self.start = time.perf_counter()
+        self.first_audio_ms = None
+
+    def __call__(self, verdict):
+        self.futures.append(self.pool.submit(self._speak, verdict["speech"]))
+
+    def _speak(self, text):
+        audio = self.synthesize(text)
+        if self.first_audio_ms is None:
+            self.first_audio_ms = round((time.perf_counter() - self.start) * 1000, 1)
+        return audio
+
+    def chunks(self):
+        """Audio for each spoken sentence, in order (waits for pending synthesis)."""
+        try:
+            return [f.result() for f in self.futures]
+        finally:
+            self.pool.shutdown(wait=False)
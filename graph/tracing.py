@@ -0,0 +1,249 @@
+"""
+Tracing - timed spans for graph nodes, LLM calls, ASR and TTS.
+
+Spans nest through a context variable (LangGraph copies the context into
+its worker threads, so parallel branches keep their parent). When a root
+span ends, its whole tree is exported as OTLP/JSON. Every finished span is
+also recorded in the graph.metrics registry. Configure via:
+- TRACE_EXPORT: off|file|otlp (default: off)
+- TRACE_EXPORT_PATH: JSONL file for the file exporter (default: ./data/traces.jsonl)
+- OTEL_EXPORTER_OTLP_ENDPOINT: collector base URL for the otlp exporter
+- TRACE_WINDOW: recent durations kept per stage for percentiles (default: 1000)
+
+Aggregate an exported file with:
+    python -m graph.tracing ./data/traces.jsonl
+"""
+import os
+import sys
+import json
+import math
+import time
+import secrets
+import threading
+import contextvars
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+
+from graph import metrics
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "agentic-voice-assistant")
+TRACE_WINDOW = int(os.getenv("TRACE_WINDOW", "1000"))
+
+_current = contextvars.ContextVar("current_span", default=None)
+_lock = threading.Lock()
+_durations = defaultdict(lambda: deque(maxlen=TRACE_WINDOW))
+_export_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+
+
+class Span:
+    """One timed operation; children and the root's finished list are filled on end()."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent", "root", "attributes",
+                 "start_ns", "end_ns", "status", "finished")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "ok"
+        self.finished = []  # only used on the root span
+
+    @property
+    def duration_ms(self):
+        end = self.end_ns or time.time_ns()
+        return round((end - self.start_ns) / 1e6, 2)
+
+    def to_log(self):
+        """Compact form for GraphState["log"]."""
+        entry = {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent.span_id if self.parent else None,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+        }
+        children = [s for s in self.root.finished if s.parent is self]
+        if children:
+            entry["children"] = [{"name": c.name, "duration_ms": c.duration_ms} for c in children]
+        return entry
+
+    def to_otlp(self):
+        """OTLP/JSON span (https://opentelemetry.io/docs/specs/otlp/#json-protobuf-encoding)."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else "",
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2 if self.status == "error" else 1},
+        }
+
+
+def _otlp_value(v):
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def current_span():
+    return _current.get()
+
+
+def find_span(name):
+    """Nearest enclosing span called name (e.g. the graph.invoke root of a node)."""
+    s = _current.get()
+    while s is not None and s.name != name:
+        s = s.parent
+    return s
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time a block as a child of the current span (or as a new trace root)."""
+    s = Span(name, _current.get(), attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attributes["error"] = repr(e)[:200]
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+        _finish(s)
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def trace_node(name, fn):
+    """Wrap a graph node: time it and append its span to GraphState["log"]."""
+    @wraps(fn)
+    def node(state):
+        with span(f"node.{name}", node=name) as s:
+            update = fn(state)
+        update = dict(update or {})
+        update["log"] = list(update.get("log") or []) + [{"node": "trace", "stage": name, "span": s.to_log()}]
+        return update
+    return node
+
+
+def _finish(s):
+    metrics.observe_span(s.name, s.duration_ms, s.status == "error")
+    with _lock:
+        _durations[s.name].append(s.duration_ms)
+        if s.root is not s:
+            s.root.finished.append(s)
+    if s.root is s:
+        exporter = os.getenv("TRACE_EXPORT", "off").lower()
+        if exporter in ("file", "otlp"):
+            _export_pool.submit(_export, exporter, [s] + s.finished)
+
+
+def to_otlp_payload(spans):
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": "graph.tracing"},
+                "spans": [s.to_otlp() for s in spans],
+            }],
+        }]
+    }
+
+
+def _export(exporter, spans):
+    payload = to_otlp_payload(spans)
+    try:
+        if exporter == "file":
+            path = os.getenv("TRACE_EXPORT_PATH", "./data/traces.jsonl")
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a") as f:
+                f.write(json.dumps(payload) + "\n")
+        else:
+            import httpx
+            endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+            httpx.post(f"{endpoint}/v1/traces", json=payload, timeout=5).raise_for_status()
+    except Exception as e:
+        print(f"[tracing] Export failed ({exporter}): {e}")
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, max(0, math.ceil(q / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[idx]
+
+
+def summarize(durations_by_stage):
+    """{stage: [ms, ...]} -> {stage: {count, p50, p95, p99}}."""
+    out = {}
+    for stage, values in sorted(durations_by_stage.items()):
+        vals = sorted(values)
+        out[stage] = {
+            "count": len(vals),
+            "p50": _percentile(vals, 50),
+            "p95": _percentile(vals, 95),
+            "p99": _percentile(vals, 99),
+        }
+    return out
+
+
+def stage_percentiles():
+    """Per-stage p50/p95/p99 over the recent spans recorded in this process."""
+    with _lock:
+        snapshot = {k: list(v) for k, v in _durations.items()}
+    return summarize(snapshot)
+
+
+def reset_stats():
+    """Drop the recorded durations (e.g. after a benchmark warm-up)."""
+    with _lock:
+        _durations.clear()
+
+
+def load_exported(path):
+    """Read an exported JSONL file back into {stage: [ms, ...]}."""
+    durations = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for rs in json.loads(line).get("resourceSpans", []):
+                for ss in rs.get("scopeSpans", []):
+                    for sp in ss.get("spans", []):
+                        ms = (int(sp["endTimeUnixNano"]) - int(sp["startTimeUnixNano"])) / 1e6
+                        durations[sp["name"]].append(round(ms, 2))
+    return durations
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("TRACE_EXPORT_PATH", "./data/traces.jsonl")
+    stats = summarize(load_exported(path))
+    print(f"{'stage':<28}{'count':>8}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}")
+    for stage, s in stats.items():
+        print(f"{stage:<28}{s['count']:>8}{s['p50']:>10}{s['p95']:>10}{s['p99']:>10}")
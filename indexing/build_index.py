@@ -1,5 +1,8 @@
 import os
 import re
+from collections import defaultdict
+
+import numpy as np
 import pandas as pd
 import chromadb
 from chromadb.utils import embedding_functions
@@ -7,6 +10,11 @@ from chromadb.utils import embedding_functions
 # Load paths
 DATA_PRODUCTS = os.getenv("DATA_PRODUCTS", "./data/processed/products.csv")
 INDEX_PATH = os.getenv("INDEX_PATH", "./data/index")
+# "category": also build one collection per top-level category + a centroid routing collection
+INDEX_SHARDING = os.getenv("INDEX_SHARDING", "none")
+# Categories with fewer products share the "Other" shard
+SHARD_MIN_SIZE = int(os.getenv("INDEX_SHARD_MIN_SIZE", "500"))
+BATCH = 5000
 
 
 def normalize_price_per_oz(price, features):
@@ -94,6 +102,65 @@ def chunked(iterable, size):
         yield iterable[i : i + size]
 
 
+def top_category(path):
+    """Top level of a hierarchical category path ("Home & Kitchen | Kitchen & Dining | ...")."""
+    return str(path or "").split("|")[0].strip() or "Other"
+
+
+def shard_name(category, name="amazon2020"):
+    """Chroma collection name for a category shard (3-63 chars of [a-z0-9_-])."""
+    slug = re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-") or "other"
+    return f"{name}_{slug}"[:63].rstrip("-_")
+
+
+def group_shards(docs, min_size=SHARD_MIN_SIZE):
+    """Top-level category -> doc positions; categories under min_size are merged into "Other"."""
+    groups = defaultdict(list)
+    for i, (_, _, meta) in enumerate(docs):
+        groups[top_category(meta.get("category"))].append(i)
+    shards = defaultdict(list)
+    for category, positions in groups.items():
+        shards[category if len(positions) >= min_size else "Other"].extend(positions)
+    return dict(shards)
+
+
+def add_batched(col, docs, embeddings):
+    """Add (id, text, meta) docs with precomputed embeddings in Chroma-sized batches."""
+    for start in range(0, len(docs), BATCH):
+        ids, texts, metas = zip(*docs[start:start + BATCH])
+        col.add(ids=list(ids), documents=list(texts), metadatas=list(metas),
+                embeddings=embeddings[start:start + BATCH].tolist())
+
+
+def build_sharded_index(client, docs, embeddings, name="amazon2020", min_size=SHARD_MIN_SIZE):
+    """
+    One collection per top-level category plus "<name>_shards", holding the
+    normalized mean embedding of each shard. rag_search routes a query to
+    the shards whose centroids are closest (mcp_server/tools/shards.py).
+    Returns {collection name: product count}.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    for col in client.list_collections():
+        if col.name.startswith(f"{name}_"):
+            client.delete_collection(col.name)
+
+    counts, centroids = {}, []
+    for category, positions in sorted(group_shards(docs, min_size).items()):
+        collection = shard_name(category, name)
+        # embedding_function=None: vectors are always passed in (queries included)
+        shard = client.create_collection(collection, embedding_function=None)
+        add_batched(shard, [docs[i] for i in positions], embeddings[positions])
+        centroid = embeddings[positions].mean(axis=0)
+        centroids.append((collection, category, len(positions), centroid / max(np.linalg.norm(centroid), 1e-12)))
+        counts[collection] = len(positions)
+
+    routing = client.create_collection(f"{name}_shards", embedding_function=None)
+    routing.add(ids=[c[0] for c in centroids], documents=[c[1] for c in centroids],
+                metadatas=[{"category": c[1], "count": c[2]} for c in centroids],
+                embeddings=[c[3].tolist() for c in centroids])
+    return counts
+
+
 if __name__ == "__main__":
     # Load dataset
     df = pd.read_csv(DATA_PRODUCTS)
@@ -121,11 +188,16 @@ if __name__ == "__main__":
     if len(existing["ids"]) > 0:
         col.delete(ids=existing["ids"])
 
+    # Embed once; the shards reuse the same vectors
+    embeddings = np.asarray([v for chunk in chunked(list(texts), BATCH) for v in emb(list(chunk))], dtype=np.float32)
+
     # Add in batches to respect Chroma batch limits
-    BATCH = 5000
-    for chunk_ids, chunk_texts, chunk_metas in zip(
-        chunked(list(ids), BATCH), chunked(list(texts), BATCH), chunked(list(metas), BATCH)
-    ):
-        col.add(ids=list(chunk_ids), documents=list(chunk_texts), metadatas=list(chunk_metas))
+    add_batched(col, docs, embeddings)
+
+    print(f"Indexed {len(ids)} items into Chroma collection 'amazon2020'.")
 
-    print(f"Indexed {len(ids)} items into Chroma collection 'amazon2020'.")
\ No newline at end of file
+    if INDEX_SHARDING == "category":
+        counts = build_sharded_index(client, docs, embeddings, min_size=SHARD_MIN_SIZE)
+        for collection, count in counts.items():
+            print(f"  shard {collection}: {count} items")
+        print(f"Built {len(counts)} category shards + routing collection 'amazon2020_shards'.")
\ No newline at end of file
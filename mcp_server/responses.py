@@ -0,0 +1,47 @@
+"""
+Compact tool responses.
+
+- project(): keep only the requested fields (plus the ones a caller needs
+  to cite a result) and drop empty values such as the catalog's blank
+  brand / ingredients strings.
+- tool_response(): encode the body directly (bypassing FastAPI's generic
+  encoder) as msgpack when the client sends `Accept: application/msgpack`
+  and msgpack is installed, otherwise as JSON via orjson when installed.
+
+gzip is negotiated separately by GZipMiddleware in server.py.
+"""
+import json
+import time
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON only
+    msgpack = None
+
+EMPTY = (None, "", [], {})
+
+
+def project(results, fields=None, keep=()):
+    """Results with only `fields` (all if None) plus `keep`, empty values omitted."""
+    wanted = set(fields) | set(keep) if fields else None
+    return [{k: v for k, v in r.items() if (wanted is None or k in wanted) and v not in EMPTY} for r in results]
+
+
+def encode_json(body) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(body)
+    return json.dumps(body, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def tool_response(request, tool, results):
+    body = {"tool": tool, "timestamp": time.time(), "results": results}
+    if msgpack is not None and "application/msgpack" in request.headers.get("accept", ""):
+        return Response(msgpack.packb(body), media_type="application/msgpack")
+    return Response(encode_json(body), media_type="application/json")
@@ -0,0 +1,106 @@
+"""
+Pre-forked MCP server: load once, fork many.
+
+`uvicorn --workers N` imports the app and loads the embedding model and
+Chroma index separately in every worker, so memory grows linearly with N.
+This entry point instead loads the model and exports the collection to a
+memory-mapped flat index (mcp_server/tools/flat_index.py) in the parent,
+freezes the heap out of the garbage collector, binds the socket and then
+forks the workers. The model weights, metadata and embedding pages stay
+shared copy-on-write; workers that exit are re-forked from the warm parent.
+
+Usage:
+    python -m mcp_server.serve --workers 4 --port 8000
+"""
+import os
+import gc
+import sys
+import signal
+import socket
+import argparse
+
+import uvicorn
+
+from mcp_server.tools import rag_tool
+from mcp_server.tools.flat_index import load_or_export
+
+
+def preload(flat_dir, rebuild=False, threads=1):
+    """Load the model and flat index in this process, before forking."""
+    # Forked children inherit no thread pools; keep torch single-threaded per worker
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    import torch
+    torch.set_num_threads(threads)
+
+    index = load_or_export(rag_tool.get_collection(), flat_dir, rebuild=rebuild)
+    rag_tool.use_flat_index(index)  # drops the Chroma client, which must not cross fork()
+    rag_tool.warmup()
+    print(f"[serve] Preloaded {rag_tool.EMBED_MODEL} and {index.count} vectors ({index.space})")
+
+
+def bind(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def spawn(sock, log_level):
+    pid = os.fork()
+    if pid:
+        return pid
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    from mcp_server.server import app
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+    os._exit(0)
+
+
+def supervise(sock, workers, log_level):
+    children = {spawn(sock, log_level) for _ in range(workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"[serve] {workers} workers: {sorted(children)}")
+    while children:
+        pid, status = os.wait()
+        children.discard(pid)
+        if not stopping:
+            print(f"[serve] Worker {pid} exited (status {status}), restarting")
+            children.add(spawn(sock, log_level))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=int(os.getenv("MCP_PORT", "8000")))
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    ap.add_argument("--flat-dir", default=os.path.join(rag_tool.INDEX_PATH, "flat"))
+    ap.add_argument("--rebuild-flat", action="store_true", help="re-export even if the flat index looks current")
+    ap.add_argument("--log-level", default="warning")
+    args = ap.parse_args()
+
+    from mcp_server.server import app  # noqa: F401 - import before fork so workers share it
+    preload(args.flat_dir, args.rebuild_flat, args.threads)
+    gc.collect()
+    gc.freeze()  # keep the collector from touching (and un-sharing) the preloaded heap
+    sock = bind(args.host, args.port)
+    supervise(sock, args.workers, args.log_level)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,113 @@
-import os, time
-from fastapi import FastAPI
+import os, time, threading
+from contextlib import asynccontextmanager, contextmanager
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from mcp_server.tools import rag_tool
 from mcp_server.tools.rag_tool import rag_search
 from mcp_server.tools.web_tool import web_search
+from mcp_server.singleflight import SingleFlight, payload_key
+from mcp_server.responses import project, tool_response
+from graph.metrics import REGISTRY, Counter, Gauge, Histogram
 
 load_dotenv()
 
-app = FastAPI(title="Product MCP Server")
+# rag.search readiness: the embedding model and index load on a background
+# thread at startup, so the server accepts connections (and web.search) right away
+warmup_state = {"status": "pending", "error": None, "ms": None}
+
+
+def warmup():
+    start = time.perf_counter()
+    warmup_state["status"] = "loading"
+    try:
+        rag_tool.warmup()
+        warmup_state["status"] = "ready"
+    except Exception as e:
+        warmup_state.update(status="error", error=str(e))
+        print(f"[mcp_server] rag.search warmup failed: {e}")
+    warmup_state["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    print(f"[mcp_server] rag.search {warmup_state['status']} after {warmup_state['ms']} ms")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if os.getenv("MCP_WARMUP", "true").lower() in ("1", "true", "yes"):
+        threading.Thread(target=warmup, daemon=True, name="rag-warmup").start()
+    else:
+        warmup_state["status"] = "lazy"  # loads on the first rag.search
+    yield
+
+
+app = FastAPI(title="Product MCP Server", lifespan=lifespan)
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("MCP_GZIP_MIN_BYTES", "1024")))
+
+# Identical concurrent tool calls share one computation
+flights = {"rag.search": SingleFlight("rag.search"), "web.search": SingleFlight("web.search")}
+
+REQUESTS = Counter("mcp_requests_total", "Tool requests by outcome", ["tool", "status"])
+REQUEST_SECONDS = Histogram("mcp_request_duration_seconds", "Tool request handling time", ["tool"])
+INFLIGHT = Gauge("mcp_inflight_requests", "Tool requests being handled", ["tool"])
+
+
+@contextmanager
+def instrumented(tool):
+    inflight = INFLIGHT.labels(tool)
+    inflight.inc()
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        inflight.dec()
+        REQUEST_SECONDS.labels(tool).observe(time.perf_counter() - start)
+        REQUESTS.labels(tool, status).inc()
 
 class RagQuery(BaseModel):
     query: str
     top_k: int = 5
     filters: dict | None = None
+    fields: list[str] | None = None  # projection; doc_id and score are always returned
 
 class WebQuery(BaseModel):
     query: str
     top_k: int = 5
+    fields: list[str] | None = None  # projection; url is always returned
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 503 while rag.search is loading or after a failed warmup."""
+    code = 200 if warmup_state["status"] in ("ready", "lazy") else 503
+    return JSONResponse(warmup_state, status_code=code)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text format: request counts/latency, embed vs. index time, Brave latency, in-flight."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/stats")
+def stats():
+    """Per-tool single-flight counters (executed vs. coalesced requests)."""
+    return {name: flight.stats() for name, flight in flights.items()}
 
 @app.post("/rag.search")
-def rag_endpoint(q: RagQuery):
-    results = rag_search(q.query, q.top_k, q.filters)
-    return {"tool":"rag.search","timestamp":time.time(),"results":results}
+def rag_endpoint(q: RagQuery, request: Request):
+    with instrumented("rag.search"):
+        results = flights["rag.search"].do(payload_key(q.model_dump()),
+                                           lambda: project(rag_search(q.query, q.top_k, q.filters), q.fields, ["doc_id", "score"]))
+    return tool_response(request, "rag.search", results)
 
 @app.post("/web.search")
-def web_endpoint(q: WebQuery):
-    results = web_search(q.query, q.top_k)
-    return {"tool":"web.search","timestamp":time.time(),"results":results}
+def web_endpoint(q: WebQuery, request: Request):
+    with instrumented("web.search"):
+        results = flights["web.search"].do(payload_key(q.model_dump()),
+                                           lambda: project(web_search(q.query, q.top_k), q.fields, ["url"]))
+    return tool_response(request, "web.search", results)
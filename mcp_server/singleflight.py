@@ -0,0 +1,70 @@
+"""
+Single-flight request coalescing for the tool endpoints.
+
+Identical payloads that arrive while the same computation is already
+running wait for it and share its result (or its exception) instead of
+computing again; for web.search that also saves Brave quota. Only in-flight
+calls are shared; nothing is cached once the leader finishes.
+
+Set MCP_SINGLEFLIGHT=false to disable.
+"""
+import os
+import json
+import threading
+from concurrent.futures import Future
+
+from graph.metrics import Counter
+
+COALESCED = Counter("mcp_singleflight_coalesced_total", "Requests served by another in-flight call", ["tool"])
+
+
+def singleflight_enabled() -> bool:
+    return os.getenv("MCP_SINGLEFLIGHT", "true").lower() in ("1", "true", "yes")
+
+
+def payload_key(payload: dict) -> str:
+    """Normalized payload key: query lowercased with whitespace collapsed, keys sorted."""
+    payload = dict(payload)
+    if isinstance(payload.get("query"), str):
+        payload["query"] = " ".join(payload["query"].lower().split())
+    return json.dumps(payload, sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """Runs fn once per key at a time; concurrent callers with the same key share the outcome."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        if not singleflight_enabled():
+            return fn()
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+                COALESCED.labels(self.name).inc()
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stats(self):
+        with self._lock:
+            return {"executed": self.executed, "coalesced": self.coalesced, "inflight": len(self._inflight)}
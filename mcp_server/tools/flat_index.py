@@ -0,0 +1,139 @@
+"""
+Read-only flat copy of the catalog collection for pre-forked serving.
+
+The embeddings are exported once from Chroma to an .npy file and opened
+with mmap_mode="r", so every worker forked from the loading process reads
+the same page-cache pages instead of holding its own HNSW index. Queries
+are an exact scan (one matrix-vector product), with Chroma-style `where`
+filters evaluated as NumPy masks over metadata columns.
+
+Files under the export directory:
+- embeddings.npy   float32 (N, dim)
+- records.json     ids, documents, metadatas
+- meta.json        count, distance space and the collection metadata it was exported from
+"""
+import os
+import json
+import operator
+
+import numpy as np
+
+COMPARE = {"$eq": operator.eq, "$ne": operator.ne, "$lt": operator.lt,
+           "$lte": operator.le, "$gt": operator.gt, "$gte": operator.ge}
+
+
+def export_collection(col, path, batch=5000):
+    """Write a collection's embeddings, documents and metadata to path."""
+    os.makedirs(path, exist_ok=True)
+    n = col.count()
+    ids, documents, metadatas, emb = [], [], [], None
+    for offset in range(0, n, batch):
+        chunk = col.get(include=["embeddings", "documents", "metadatas"], limit=batch, offset=offset)
+        vectors = np.asarray(chunk["embeddings"], dtype=np.float32)
+        if emb is None:
+            emb = np.lib.format.open_memmap(os.path.join(path, "embeddings.npy"), mode="w+",
+                                            dtype=np.float32, shape=(n, vectors.shape[1]))
+        emb[offset:offset + len(vectors)] = vectors
+        ids += chunk["ids"]
+        documents += chunk["documents"]
+        metadatas += chunk["metadatas"]
+    if emb is not None:
+        emb.flush()
+    with open(os.path.join(path, "records.json"), "w") as f:
+        json.dump({"ids": ids, "documents": documents, "metadatas": metadatas}, f)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"count": n, "space": (col.metadata or {}).get("hnsw:space", "l2"),
+                   "collection_metadata": col.metadata}, f)
+    print(f"[flat_index] Exported {n} vectors to {path}")
+
+
+def load_or_export(col, path, rebuild=False):
+    """FlatIndex for col at path, exporting first if missing or stale."""
+    meta_file = os.path.join(path, "meta.json")
+    fresh = False
+    if os.path.exists(meta_file) and not rebuild:
+        with open(meta_file) as f:
+            meta = json.load(f)
+        fresh = meta["count"] == col.count() and meta["collection_metadata"] == col.metadata
+    if not fresh:
+        export_collection(col, path)
+    return FlatIndex(path)
+
+
+class FlatIndex:
+    """Exact nearest-neighbour search over memory-mapped embeddings."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.space = json.load(f)["space"]
+        with open(os.path.join(path, "records.json")) as f:
+            records = json.load(f)
+        self.ids, self.documents = records["ids"], records["documents"]
+        self.metadatas = records["metadatas"]
+        self.count = len(self.ids)
+        if self.count:
+            self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        else:
+            self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        # Row norms are small and computed once, before workers fork
+        self.sq_norms = np.einsum("ij,ij->i", self.embeddings, self.embeddings)
+        self.columns = {}
+        for key in {k for m in self.metadatas for k in (m or {})}:
+            values = [(m or {}).get(key) for m in self.metadatas]
+            if all(v is None or isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                self.columns[key] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                self.columns[key] = np.array(values, dtype=object)
+
+    def distances(self, embedding):
+        """Distances in the collection's space (Chroma's l2 is squared)."""
+        q = np.asarray(embedding, dtype=np.float32)
+        dots = self.embeddings @ q
+        if self.space == "cosine":
+            return 1 - dots / np.maximum(np.sqrt(self.sq_norms) * np.linalg.norm(q), 1e-12)
+        if self.space == "ip":
+            return 1 - dots
+        return self.sq_norms - 2 * dots + q @ q
+
+    def mask(self, where):
+        """Boolean row mask for a Chroma `where` clause."""
+        if "$and" in where:
+            return np.logical_and.reduce([self.mask(w) for w in where["$and"]])
+        if "$or" in where:
+            return np.logical_or.reduce([self.mask(w) for w in where["$or"]])
+        (key, cond), = where.items()
+        if not isinstance(cond, dict):
+            cond = {"$eq": cond}
+        column = self.columns.get(key)
+        if column is None:  # no row has the key
+            return np.zeros(self.count, dtype=bool)
+        out = np.ones(self.count, dtype=bool)
+        for op, value in cond.items():
+            if op in ("$in", "$nin"):
+                hit = np.isin(column, value)
+                out &= hit if op == "$in" else ~hit
+            elif op in COMPARE:
+                if column.dtype == object and op not in ("$eq", "$ne"):
+                    raise ValueError(f"{op} on non-numeric metadata field '{key}'")
+                out &= np.asarray(COMPARE[op](column, value), dtype=bool)
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return out
+
+    def query(self, embedding, n_results=5, where=None):
+        """Top n_results in Chroma's query() result shape (one query)."""
+        if not self.count:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+        dist = self.distances(embedding)
+        if where:
+            dist = np.where(self.mask(where), dist, np.inf)
+        k = min(n_results, self.count)
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top], kind="stable")]
+        top = top[np.isfinite(dist[top])]
+        return {
+            "ids": [[self.ids[i] for i in top]],
+            "documents": [[self.documents[i] for i in top]],
+            "metadatas": [[self.metadatas[i] for i in top]],
+            "distances": [dist[top].tolist()],
+        }
@@ -1,14 +1,84 @@
 import os
-import chromadb
-from chromadb.utils import embedding_functions
+import time
+import threading
+
+from graph.metrics import Histogram
+
+EMBED_SECONDS = Histogram("mcp_rag_embed_seconds", "rag.search query embedding time")
+INDEX_SECONDS = Histogram("mcp_rag_index_query_seconds", "rag.search index query time", ["backend"])
 
 INDEX_PATH = os.getenv("INDEX_PATH", "./data/index")
 EMBED_MODEL = os.getenv("EMBED_MODEL", "all-MiniLM-L6-v2")
+# "auto": query the category shards when the index has them (INDEX_SHARDING=category); "off": one collection
+RAG_SHARDS = os.getenv("RAG_SHARDS", "auto")
+
+# Created on first use so importing the server (and web-only use) doesn't
+# pay for chromadb, the embedding model and the index
+_emb_fn = None
+_client = None
+_col = None
+_sharded = None
+_flat = None
+_lock = threading.RLock()
+
+
+def get_embedding_function():
+    """Get or create the query embedding function (thread-safe, loads the model once)."""
+    global _emb_fn
+    if _emb_fn is None:
+        with _lock:
+            if _emb_fn is None:
+                from chromadb.utils import embedding_functions
+
+                # Use the same embedding function that built the collection to avoid Chroma errors
+                _emb_fn = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBED_MODEL)
+    return _emb_fn
+
+
+def get_client():
+    """Get or create the Chroma client for INDEX_PATH (thread-safe)."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import chromadb
+
+                _client = chromadb.PersistentClient(path=INDEX_PATH)
+    return _client
+
+
+def get_collection():
+    """Get or create the catalog collection (thread-safe)."""
+    global _col
+    if _col is None:
+        with _lock:
+            if _col is None:
+                _col = get_client().get_or_create_collection("amazon2020", embedding_function=get_embedding_function())
+    return _col
 
-# Use the same embedding function that built the collection to avoid Chroma errors
-emb_fn = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=EMBED_MODEL)
-client = chromadb.PersistentClient(path=INDEX_PATH)
-col = client.get_or_create_collection("amazon2020", embedding_function=emb_fn)
+
+def get_sharded_index():
+    """The category-sharded index, or None (not built, or RAG_SHARDS=off)."""
+    global _sharded
+    if _sharded is None:
+        with _lock:
+            if _sharded is None:
+                from mcp_server.tools.shards import ShardedIndex, has_shards
+
+                client = get_client()
+                _sharded = ShardedIndex(client) if RAG_SHARDS != "off" and has_shards(client) else False
+    return _sharded or None
+
+
+def use_flat_index(index):
+    """Serve queries from a memory-mapped FlatIndex instead of Chroma (see mcp_server.serve)."""
+    global _flat, _col, _sharded, _client
+    _flat, _col, _sharded, _client = index, None, None, None
+
+
+def warmup():
+    """Load the model and index and run one query, so the first request doesn't pay for it."""
+    rag_search("warmup", top_k=1)
 
 
 def normalize_filters(filters: dict | None) -> dict:
@@ -31,18 +101,52 @@ def normalize_filters(filters: dict | None) -> dict:
 
 def rag_search(query, top_k=5, filters=None):
     where = normalize_filters(filters)
-    # Only pass where filter if it's not empty
-    if where:
-        res = col.query(query_texts=[query], n_results=top_k, where=where)
+    emb_fn = get_embedding_function()
+    sharded = get_sharded_index() if _flat is None else None
+    col = get_collection() if _flat is None and sharded is None else None
+    start = time.perf_counter()
+    embedding = emb_fn([query])
+    EMBED_SECONDS.observe(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    if _flat is not None:
+        res, backend, space = _flat.query(embedding[0], top_k, where), "flat", _flat.space
+    elif sharded is not None:
+        res, backend, space = sharded.query(embedding[0], top_k, where), "sharded", sharded.space
     else:
-        res = col.query(query_texts=[query], n_results=top_k)
+        # Only pass where filter if it's not empty
+        if where:
+            res = col.query(query_embeddings=embedding, n_results=top_k, where=where)
+        else:
+            res = col.query(query_embeddings=embedding, n_results=top_k)
+        backend, space = "chroma", (col.metadata or {}).get("hnsw:space", "l2")
+    INDEX_SECONDS.labels(backend).observe(time.perf_counter() - start)
+    return format_results(res, space)
+
+
+def similarity(distance, space="l2"):
+    """
+    Cosine similarity from a Chroma distance (the embeddings are normalized,
+    so Chroma's squared l2 is 2 - 2 * cos). 1 = same direction, ~0 = unrelated.
+    """
+    if distance is None:
+        return None
+    if space == "l2":
+        return 1 - distance / 2
+    return 1 - distance  # cosine / ip
+
+
+def format_results(res, space="l2"):
     out = []
     if not res["ids"] or not res["ids"][0]:
         return out
+    distances = (res.get("distances") or [[]])[0] or [None] * len(res["ids"][0])
     for i in range(len(res["ids"][0])):
         meta = res["metadatas"][0][i] or {}
+        score = similarity(distances[i], space)
         out.append({
             "doc_id": res["ids"][0][i],
+            "score": None if score is None else round(score, 4),
             "sku": meta.get("sku"),
             "title": res["documents"][0][i][:220],
             "price": meta.get("price"),
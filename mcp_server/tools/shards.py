@@ -0,0 +1,70 @@
+"""
+Category-sharded catalog: one Chroma collection per top-level category
+(built by indexing/build_index.py with INDEX_SHARDING=category).
+
+A query is routed with the "<name>_shards" collection - one normalized
+mean embedding per shard, loaded once into a small matrix - to the
+RAG_SHARD_PROBE shards with the closest centroids. Those shards are
+queried in parallel (scatter) and their hits merged by distance into one
+top-k (gather), in Chroma's query() result shape like FlatIndex.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SHARD_PROBE = int(os.getenv("RAG_SHARD_PROBE", "2"))
+
+_scatter = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-shard")
+
+
+def has_shards(client, name="amazon2020"):
+    return any(col.name == f"{name}_shards" for col in client.list_collections())
+
+
+class ShardedIndex:
+    """Centroid router + scatter-gather over the category shard collections."""
+
+    def __init__(self, client, name="amazon2020", probe=SHARD_PROBE):
+        routing = client.get_collection(f"{name}_shards", embedding_function=None)
+        got = routing.get(include=["embeddings", "metadatas"])
+        self.names = got["ids"]
+        self.categories = [m["category"] for m in got["metadatas"]]
+        centroids = np.asarray(got["embeddings"], dtype=np.float32)
+        self.centroids = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        self.collections = {n: client.get_collection(n, embedding_function=None) for n in self.names}
+        first = next(iter(self.collections.values()), None)
+        self.space = ((first.metadata if first else None) or {}).get("hnsw:space", "l2")
+        self.probe = probe
+        self.count = sum(m["count"] for m in got["metadatas"])
+
+    def route(self, embedding, probe=None):
+        """Names of the `probe` shards whose centroids are most similar to the query."""
+        q = np.asarray(embedding, dtype=np.float32)
+        sims = self.centroids @ (q / max(np.linalg.norm(q), 1e-12))
+        return [self.names[i] for i in np.argsort(-sims)[:probe or self.probe]]
+
+    def query(self, embedding, n_results=5, where=None, probe=None):
+        """Top n_results over the routed shards (one query)."""
+        vector = [float(x) for x in embedding]
+
+        def one(name):
+            col = self.collections[name]
+            k = min(n_results, col.count())
+            if not k:
+                return None
+            if where:
+                return col.query(query_embeddings=[vector], n_results=k, where=where)
+            return col.query(query_embeddings=[vector], n_results=k)
+
+        hits = []
+        for res in _scatter.map(one, self.route(embedding, probe)):
+            if res and res["ids"] and res["ids"][0]:
+                hits += zip(res["distances"][0], res["ids"][0], res["documents"][0], res["metadatas"][0])
+        hits = sorted(hits, key=lambda h: h[0])[:n_results]
+        return {
+            "ids": [[h[1] for h in hits]],
+            "documents": [[h[2] for h in hits]],
+            "metadatas": [[h[3] for h in hits]],
+            "distances": [[h[0] for h in hits]],
+        }
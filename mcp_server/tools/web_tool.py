@@ -1,6 +1,10 @@
-import os, httpx
+import os, time, httpx
+from graph.metrics import Counter, Histogram
 
-BRAVE_URL = "https://api.search.brave.com/res/v1/web/search"
+BRAVE_SECONDS = Histogram("mcp_brave_request_duration_seconds", "Brave Search upstream latency", ["status"])
+UPSTREAM_ERRORS = Counter("mcp_upstream_errors_total", "Failed upstream search calls", ["upstream"])
+
+BRAVE_URL = os.getenv("BRAVE_URL", "https://api.search.brave.com/res/v1/web/search")
 
 def web_search(query: str, top_k: int = 5):
     api_key = os.getenv("SEARCH_API_KEY")
@@ -27,12 +31,16 @@ def brave_search(query, top_k, api_key):
         "count": top_k
     }
 
+    start = time.perf_counter()
     try:
         with httpx.Client(timeout=20) as client:
             resp = client.get(BRAVE_URL, headers=headers, params=params)
             resp.raise_for_status()
             data = resp.json()
+        BRAVE_SECONDS.labels("ok").observe(time.perf_counter() - start)
     except Exception as e:
+        BRAVE_SECONDS.labels("error").observe(time.perf_counter() - start)
+        UPSTREAM_ERRORS.labels("brave").inc()
         print(f"[web.search] Brave error: {e}")
         print(f"[web.search] Query: '{query}', API Key set: {bool(api_key)}")
         return []
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+# Load environment variables from .env into the shell
+export $(grep -v '^#' .env | xargs)
+
+# Start the headless /assist API on port 8100 (one process; scale with more instances)
+uvicorn app.api:app --port 8100
@@ -0,0 +1,77 @@
+"""
+ASR backends behind one interface, selected with ASR_BACKEND.
+
+Every backend takes float32 mono audio at 16 kHz and returns the text, so
+VAD and decoding stay in asr_whisper.transcribe(). Configure via:
+- ASR_BACKEND: whisper | faster-whisper (default: whisper)
+- ASR_COMPUTE_TYPE: CTranslate2 compute type for faster-whisper (default: int8)
+- ASR_BEAM_SIZE: beam size; 1 = greedy, like openai-whisper's default (default: 1)
+- ASR_CPU_THREADS: CTranslate2 intra-op threads, 0 = library default (default: 0)
+
+faster-whisper runs Whisper on CTranslate2 with int8 weights, which is
+several times faster than fp32 PyTorch on CPU-only hosts. It is optional:
+pip install faster-whisper
+"""
+import os
+import threading
+
+SAMPLE_RATE = 16000
+
+
+class WhisperBackend:
+    """openai-whisper (fp32 PyTorch)."""
+
+    name = "whisper"
+
+    def __init__(self, model_name="small"):
+        import whisper
+        self.model_name = model_name
+        self.model = whisper.load_model(model_name)
+
+    def load_audio(self, path):
+        import whisper
+        return whisper.load_audio(path)  # ffmpeg subprocess
+
+    def transcribe(self, audio):
+        beam = int(os.getenv("ASR_BEAM_SIZE", "1"))
+        kwargs = {"beam_size": beam} if beam > 1 else {}
+        return self.model.transcribe(audio, **kwargs)["text"].strip()
+
+
+class FasterWhisperBackend:
+    """faster-whisper (CTranslate2, int8 by default)."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name="small"):
+        from faster_whisper import WhisperModel
+        self.model_name = model_name
+        self.compute_type = os.getenv("ASR_COMPUTE_TYPE", "int8")
+        self.model = WhisperModel(model_name, device="cpu", compute_type=self.compute_type,
+                                  cpu_threads=int(os.getenv("ASR_CPU_THREADS", "0")))
+
+    def load_audio(self, path):
+        from faster_whisper import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)  # PyAV, in-process
+
+    def transcribe(self, audio):
+        segments, _ = self.model.transcribe(audio, beam_size=int(os.getenv("ASR_BEAM_SIZE", "1")),
+                                            vad_filter=False)  # tts_asr.vad already trimmed
+        return " ".join(s.text.strip() for s in segments).strip()
+
+
+BACKENDS = {b.name: b for b in (WhisperBackend, FasterWhisperBackend)}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None, model_name="small"):
+    """Load an ASR backend once per process (loading takes seconds)."""
+    name = name or os.getenv("ASR_BACKEND", "whisper")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR_BACKEND '{name}' (choose from {', '.join(BACKENDS)})")
+    with _backends_lock:
+        if (name, model_name) not in _backends:
+            _backends[(name, model_name)] = BACKENDS[name](model_name)
+        return _backends[(name, model_name)]
@@ -1,7 +1,29 @@
-import whisper
+from graph.tracing import traced, current_span
+from tts_asr.asr_backends import SAMPLE_RATE, get_backend
+from tts_asr.audio_io import to_asr_audio
+from tts_asr.vad import vad_enabled, trim_silence
 
-def transcribe(audio_path, model_name="small"):
-    # Requires ffmpeg installed on system
-    model = whisper.load_model(model_name)
-    res = model.transcribe(audio_path)
-    return res["text"]
+
+def get_model(model_name="small"):
+    """Load the configured ASR backend (ASR_BACKEND) once per process."""
+    return get_backend(model_name=model_name)
+
+
+@traced("asr.transcribe")
+def transcribe(audio, model_name="small", sample_rate=None):
+    """
+    Transcribe WAV bytes, raw PCM16 bytes (pass sample_rate), a NumPy array
+    or a file path. WAV and arrays are decoded in-process; other formats
+    fall back to ffmpeg.
+    """
+    backend = get_model(model_name)
+    current_span().attributes["backend"] = backend.name
+    decoded = to_asr_audio(audio, sample_rate, SAMPLE_RATE)
+    audio = decoded if decoded is not None else backend.load_audio(audio)
+    if vad_enabled():
+        # Only speech reaches the model; silence costs decode time for nothing
+        audio, info = trim_silence(audio, SAMPLE_RATE)
+        current_span().attributes.update(info)
+        if not len(audio):
+            return ""
+    return backend.transcribe(audio)
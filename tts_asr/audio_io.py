@@ -0,0 +1,108 @@
+"""
+In-memory audio decoding for ASR: WAV / raw PCM bytes or arrays to float32
+mono at 16 kHz, without temp files or an ffmpeg subprocess. Also encodes
+TTS replies to compressed formats (ffmpeg over pipes, no files).
+
+- WAV (RIFF) bytes: parsed with the stdlib `wave` module (8/16/24/32-bit PCM)
+- raw PCM bytes: 16-bit little-endian mono at the given sample rate
+- NumPy arrays: int16 or float, at the given sample rate (default 16 kHz)
+- anything else (webm, mp3, ...): piped through ffmpeg stdin as a fallback
+
+Resampling is polyphase (scipy.signal.resample_poly), vectorized and with
+an anti-aliasing filter, e.g. 48 kHz browser recordings down to 16 kHz.
+"""
+import io
+import os
+import wave
+import subprocess
+from math import gcd
+
+import numpy as np
+from scipy.signal import resample_poly
+
+SAMPLE_RATE = 16000
+
+
+def decode_wav(data: bytes):
+    """(float32 mono in [-1, 1], sample_rate) from WAV bytes."""
+    with wave.open(io.BytesIO(data)) as w:
+        sr, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        frames = w.readframes(w.getnframes())
+    if width == 1:  # unsigned 8-bit
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:  # 24-bit: widen to int32 via the top three bytes
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(raw), 4), dtype=np.uint8)
+        padded[:, 1:] = raw
+        audio = padded.view("<i4").ravel().astype(np.float32) / 2**31
+    else:
+        dtype = {2: "<i2", 4: "<i4"}[width]
+        audio = np.frombuffer(frames, dtype=dtype).astype(np.float32) / (2 ** (8 * width - 1))
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return audio, sr
+
+
+def resample(audio, sr, target=SAMPLE_RATE):
+    if sr == target:
+        return audio.astype(np.float32, copy=False)
+    g = gcd(int(sr), target)
+    return resample_poly(audio, target // g, int(sr) // g).astype(np.float32)
+
+
+def ffmpeg_decode(data: bytes, target=SAMPLE_RATE):
+    """Fallback for compressed formats: ffmpeg reads stdin, writes s16le PCM to stdout."""
+    out = subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1",
+         "-ar", str(target), "pipe:1"],
+        input=data, capture_output=True, check=True,
+    ).stdout
+    return np.frombuffer(out, dtype="<i2").astype(np.float32) / 32768
+
+
+# TTS output formats: (ffmpeg codec + container args, file suffix, MIME type)
+ENCODINGS = {
+    "wav": (None, ".wav", "audio/wav"),
+    "mp3": (["-c:a", "libmp3lame", "-f", "mp3"], ".mp3", "audio/mpeg"),
+    "opus": (["-c:a", "libopus", "-application", "voip", "-f", "ogg"], ".ogg", "audio/ogg"),
+}
+
+
+def ffmpeg_encode(wav: bytes, fmt, bitrate="48k"):
+    """WAV bytes to mp3/opus bytes; ffmpeg reads stdin and writes stdout."""
+    args = ENCODINGS[fmt][0]
+    return subprocess.run(
+        ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-ac", "1", "-b:a", bitrate, *args, "pipe:1"],
+        input=wav, capture_output=True, check=True,
+    ).stdout
+
+
+def to_asr_audio(source, sample_rate=None, target=SAMPLE_RATE):
+    """
+    float32 mono at `target` Hz from bytes (WAV, or raw PCM16 when
+    sample_rate is given), a NumPy array, or a WAV file path.
+
+    Returns None for paths in other formats, so the caller can use the ASR
+    backend's own loader.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        if not str(source).lower().endswith(".wav"):
+            return None
+        with open(source, "rb") as f:
+            source = f.read()
+    if isinstance(source, np.ndarray):
+        audio = source.astype(np.float32) / 32768 if source.dtype == np.int16 else source.astype(np.float32)
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        return resample(audio, sample_rate or target, target)
+    data = bytes(source)
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            audio, sr = decode_wav(data)
+            return resample(audio, sr, target)
+        except wave.Error:  # e.g. IEEE-float WAV, which `wave` can't read
+            return ffmpeg_decode(data, target)
+    if sample_rate:
+        pcm = np.frombuffer(data[:len(data) // 2 * 2], dtype="<i2").astype(np.float32) / 32768
+        return resample(pcm, sample_rate, target)
+    return ffmpeg_decode(data, target)
@@ -0,0 +1,180 @@
+"""
+Batch transcription for offline audio corpora (evaluation sets etc.).
+
+Inputs are a directory (searched recursively for audio files) or a JSONL
+manifest of {"audio": path, "text": reference?} lines, the format
+benchmarks/bench_asr.py reads. Files are spread over a process pool; each
+worker loads the ASR backend (tts_asr/asr_backends.py) once in its
+initializer and runs the same decode + VAD + ASR path as
+asr_whisper.transcribe().
+
+- Longest files go first, so the pool isn't left waiting on one long
+  recording at the end of the run.
+- Every result is appended to the output JSONL as it arrives; rerunning
+  the same command skips files already transcribed (failed files are
+  retried).
+- Throughput is reported as audio-hours per wall-hour.
+
+Usage:
+    python -m tts_asr.batch_transcribe recordings/ --out data/transcripts.jsonl --workers 4
+    python -m tts_asr.batch_transcribe data/asr_samples/manifest.jsonl --backend faster-whisper --model small
+"""
+import os
+import json
+import time
+import wave
+import argparse
+import multiprocessing as mp
+
+from tts_asr.asr_backends import BACKENDS
+
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm")
+# Rough bytes per second for compressed files, used only to order the queue
+COMPRESSED_BYTES_PER_S = 16000
+
+
+def list_inputs(source):
+    """[{"audio": abs path, "text"?: reference}] from a directory or a JSONL manifest."""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths += [os.path.join(root, f) for f in files if f.lower().endswith(AUDIO_EXTS)]
+        return [{"audio": os.path.abspath(p)} for p in sorted(paths)]
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source) as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    for item in items:
+        item["audio"] = os.path.abspath(os.path.join(base, item["audio"]))
+    return items
+
+
+def duration_s(path):
+    """Exact for WAV (header only), estimated from file size otherwise."""
+    try:
+        with wave.open(path) as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return os.path.getsize(path) / COMPRESSED_BYTES_PER_S
+
+
+def load_done(out_path):
+    """Audio paths that already have a transcript in the checkpoint file."""
+    done = set()
+    if os.path.exists(out_path):
+        with open(out_path) as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:  # line cut off by an interrupted run
+                    continue
+                if "text" in rec:
+                    done.add(rec["audio"])
+    return done
+
+
+def _end_partial_line(out_path):
+    """After a crash mid-write, start appending on a fresh line."""
+    if os.path.exists(out_path) and os.path.getsize(out_path):
+        with open(out_path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+
+_model_name = None
+_init_error = None
+
+
+def _init_worker(backend, model_name, threads):
+    """Runs once per worker process: pin threads and load the model."""
+    global _model_name, _init_error
+    os.environ["ASR_BACKEND"] = backend
+    os.environ["ASR_CPU_THREADS"] = str(threads)  # faster-whisper
+    try:
+        import torch
+        torch.set_num_threads(threads)  # openai-whisper; one pool of threads per worker
+    except ImportError:
+        pass
+    _model_name = model_name
+    try:
+        from tts_asr.asr_whisper import get_model
+        get_model(model_name)
+    except Exception as e:
+        # Raising here would make the pool respawn the worker forever
+        _init_error = f"{type(e).__name__}: {e}"
+
+
+def _transcribe_one(item):
+    from tts_asr.asr_whisper import transcribe
+    rec = {"audio": item["audio"], "duration_s": round(item["duration_s"], 2)}
+    if _init_error:
+        return dict(rec, error=_init_error, fatal=True)
+    if "text" in item:
+        rec["reference"] = item["text"]
+    start = time.perf_counter()
+    try:
+        rec["text"] = transcribe(item["audio"], _model_name)
+    except Exception as e:
+        rec["error"] = f"{type(e).__name__}: {e}"
+    rec["asr_s"] = round(time.perf_counter() - start, 3)
+    rec["worker"] = os.getpid()
+    return rec
+
+
+def run(source, out_path, backend, model_name, workers, threads=1, log_every=50):
+    items = list_inputs(source)
+    done = load_done(out_path)
+    todo = [dict(item, duration_s=duration_s(item["audio"])) for item in items if item["audio"] not in done]
+    todo.sort(key=lambda item: item["duration_s"], reverse=True)
+    print(f"[batch_asr] {len(items)} files, {len(done)} already done, {len(todo)} to transcribe "
+          f"({sum(i['duration_s'] for i in todo) / 3600:.2f} h of audio) with {workers} x {backend}/{model_name}")
+    if not todo:
+        return {"files": 0, "errors": 0, "audio_h": 0.0, "wall_h": 0.0, "audio_h_per_wall_h": 0.0}
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    _end_partial_line(out_path)
+    audio_s = errors = 0
+    # spawn: workers start clean (no inherited torch thread pools), same on every OS
+    ctx = mp.get_context("spawn")
+    start = time.perf_counter()  # wall time includes worker start-up and model loading
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(backend, model_name, threads)) as pool, \
+            open(out_path, "a") as out:
+        for n, rec in enumerate(pool.imap_unordered(_transcribe_one, todo), 1):
+            if rec.get("fatal"):
+                raise RuntimeError(f"ASR backend failed to load: {rec['error']}")
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+            audio_s += rec["duration_s"]
+            if "error" in rec:
+                errors += 1
+                print(f"[batch_asr] {rec['audio']}: {rec['error']}")
+            if n % log_every == 0 or n == len(todo):
+                wall_s = time.perf_counter() - start
+                print(f"[batch_asr] {n}/{len(todo)} files, {audio_s / 3600:.2f} h audio in {wall_s:.0f}s "
+                      f"({audio_s / max(wall_s, 1e-9):.1f} audio-h/wall-h)")
+    wall_s = time.perf_counter() - start
+    return {
+        "files": len(todo),
+        "errors": errors,
+        "audio_h": round(audio_s / 3600, 3),
+        "wall_h": round(wall_s / 3600, 4),
+        "audio_h_per_wall_h": round(audio_s / max(wall_s, 1e-9), 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("source", help="directory of audio files or JSONL manifest")
+    ap.add_argument("--out", default="./data/transcripts.jsonl", help="results / checkpoint JSONL")
+    ap.add_argument("--backend", default=os.getenv("ASR_BACKEND", "whisper"), choices=list(BACKENDS))
+    ap.add_argument("--model", default=os.getenv("ASR_MODEL", "small"))
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--threads", type=int, default=1, help="CPU threads per worker")
+    args = ap.parse_args()
+
+    summary = run(args.source, args.out, args.backend, args.model, args.workers, args.threads)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,86 @@
-import os, httpx
-
-def synthesize(text, out_path="out.wav"):
-    prov = os.getenv("TTS_PROVIDER","openai")
-    if prov != "openai":
-        raise NotImplementedError("Only OpenAI TTS wired in demo")
-    key = os.getenv("OPENAI_API_KEY")
-    voice = os.getenv("TTS_VOICE","alloy")
-    with httpx.Client(timeout=60) as c:
-        r = c.post(
-          "https://api.openai.com/v1/audio/speech",
-          headers={"Authorization": f"Bearer {key}"},
-          json={"model":"gpt-4o-mini-tts","voice":voice,"input":text}
-        )
-        r.raise_for_status()
-        with open(out_path,"wb") as f: f.write(r.content)
-    return out_path
+"""
+Text-to-speech for replies, returned in memory (no shared output file).
+
+Configure via:
+- TTS_FORMAT: wav | mp3 | opus (default: mp3). mp3 and Ogg/Opus are a
+  fraction of the WAV size; opus is the smallest, mp3 plays everywhere.
+- TTS_BITRATE: bitrate when encoding locally with ffmpeg (default: 48k).
+  OpenAI encodes mp3/opus itself at its own bitrate.
+
+Local providers produce WAV, which is encoded with ffmpeg over pipes; when
+ffmpeg is missing, replies fall back to WAV (see output_format()).
+"""
+import io
+import os
+import wave
+import shutil
+
+from graph.tracing import traced, current_span
+from tts_asr.audio_io import ENCODINGS, ffmpeg_encode
+from tts_asr.tts_providers import get_http_client, get_provider  # noqa: F401 (get_http_client re-exported)
+
+_warned_no_ffmpeg = False
+
+
+def output_format(fmt=None):
+    """The format synthesize() will return: TTS_FORMAT, or wav if it can't be produced here."""
+    global _warned_no_ffmpeg
+    fmt = (fmt or os.getenv("TTS_FORMAT", "mp3")).lower()
+    if fmt not in ENCODINGS:
+        raise ValueError(f"Unknown TTS_FORMAT '{fmt}' (choose from {', '.join(ENCODINGS)})")
+    try:
+        native = get_provider().formats
+    except Exception:
+        native = ()  # synthesize() reports the provider error where TTS failures are handled
+    if fmt not in native and not shutil.which("ffmpeg"):
+        if not _warned_no_ffmpeg:
+            print(f"[tts] ffmpeg not found; sending WAV instead of {fmt}")
+            _warned_no_ffmpeg = True
+        return "wav"
+    return fmt
+
+
+def mime_type(fmt):
+    return ENCODINGS[fmt][2]
+
+
+def file_suffix(fmt):
+    return ENCODINGS[fmt][1]
+
+
+@traced("tts.synthesize")
+def synthesize(text, fmt=None):
+    """Speak `text` with the configured TTS_PROVIDER; returns audio bytes in output_format(fmt)."""
+    provider = get_provider()
+    fmt = output_format(fmt)
+    current_span().attributes.update({"provider": provider.name, "format": fmt})
+    if fmt in provider.formats:
+        audio = provider.synthesize(text, fmt)
+    else:
+        audio = ffmpeg_encode(provider.synthesize(text), fmt, os.getenv("TTS_BITRATE", "48k"))
+    current_span().attributes["bytes"] = len(audio)
+    return audio
+
+
+def synthesize_stream(text, fmt=None):
+    """Audio chunks as soon as the provider has them; one chunk if it can't stream."""
+    provider = get_provider()
+    fmt = output_format(fmt)
+    if hasattr(provider, "stream") and fmt in provider.formats and fmt != "wav":
+        yield from provider.stream(text, fmt)
+    else:
+        yield synthesize(text, fmt)
+
+
+def join_audio(chunks, fmt):
+    """One playable file from per-sentence replies (mp3 frames and Ogg streams concatenate)."""
+    if fmt != "wav" or len(chunks) < 2:
+        return b"".join(chunks)
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        for i, chunk in enumerate(chunks):
+            with wave.open(io.BytesIO(chunk)) as r:
+                if i == 0:
+                    w.setparams(r.getparams())
+                w.writeframes(r.readframes(r.getnframes()))
+    return out.getvalue()
@@ -0,0 +1,142 @@
+"""
+TTS providers behind one interface, selected with TTS_PROVIDER.
+
+Every provider's synthesize(text) returns a complete WAV file as bytes
+(16-bit PCM, mono) with correct header sizes, so callers can play, store or
+decode the result without caring where it came from. Providers that can
+produce compressed audio themselves list it in `formats` and take it as
+synthesize(text, fmt); tts_client encodes for the others. Configure via:
+- TTS_PROVIDER: openai | piper | espeak (default: openai)
+- TTS_VOICE: OpenAI voice (default: alloy)
+- TTS_PIPER_VOICE: Piper .onnx voice file, its .onnx.json next to it
+  (default: ./models/piper/en_US-lessac-medium.onnx)
+- TTS_ESPEAK_VOICE: espeak-ng voice (default: en-us)
+
+piper and espeak run locally on the CPU with no network round trip:
+- piper: neural VITS voices on onnxruntime, near real-time quality
+  (pip install piper-tts; voices from https://huggingface.co/rhasspy/piper-voices)
+- espeak: formant synthesis, robotic but tiny and instant; handy for
+  offline development and tests (apt install espeak-ng)
+"""
+import io
+import os
+import wave
+import threading
+import subprocess
+
+import httpx
+
+_http = None
+_http_lock = threading.Lock()
+
+
+def get_http_client():
+    """Shared client so each sentence/reply reuses the TLS connection to the TTS API."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            _http = httpx.Client(timeout=60)
+        return _http
+
+
+def fix_wav_sizes(data: bytes) -> bytes:
+    """Streamed WAVs (OpenAI, espeak --stdout) carry placeholder sizes; set the real ones."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("TTS provider did not return WAV audio")
+    data = bytearray(data)
+    data[4:8] = (len(data) - 8).to_bytes(4, "little")
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk, size = bytes(data[pos:pos + 4]), int.from_bytes(data[pos + 4:pos + 8], "little")
+        if chunk == b"data":
+            data[pos + 4:pos + 8] = (len(data) - pos - 8).to_bytes(4, "little")
+            break
+        pos += 8 + size + (size & 1)
+    return bytes(data)
+
+
+def wav_duration_s(data: bytes) -> float:
+    with wave.open(io.BytesIO(data)) as w:
+        return w.getnframes() / w.getframerate()
+
+
+class OpenAITTS:
+    """OpenAI /v1/audio/speech (network)."""
+
+    name = "openai"
+    formats = ("wav", "mp3", "opus")  # opus comes in an Ogg container
+
+    def __init__(self):
+        self.voice = os.getenv("TTS_VOICE", "alloy")
+
+    def _request(self, text, fmt):
+        return {
+            "url": "https://api.openai.com/v1/audio/speech",
+            "headers": {"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}"},
+            "json": {"model": "gpt-4o-mini-tts", "voice": self.voice, "input": text, "response_format": fmt},
+        }
+
+    def synthesize(self, text, fmt="wav"):
+        r = get_http_client().post(**self._request(text, fmt))
+        r.raise_for_status()
+        return fix_wav_sizes(r.content) if fmt == "wav" else r.content
+
+    def stream(self, text, fmt="mp3"):
+        """Audio chunks as the API sends them (playable before the reply is fully spoken)."""
+        with get_http_client().stream("POST", **self._request(text, fmt)) as r:
+            r.raise_for_status()
+            yield from r.iter_bytes()
+
+
+class PiperTTS:
+    """Piper neural TTS (onnxruntime, CPU)."""
+
+    name = "piper"
+    formats = ("wav",)
+
+    def __init__(self):
+        from piper.voice import PiperVoice
+        self.model_path = os.getenv("TTS_PIPER_VOICE", "./models/piper/en_US-lessac-medium.onnx")
+        self.voice = PiperVoice.load(self.model_path)
+
+    def synthesize(self, text, fmt="wav"):
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            if hasattr(self.voice, "synthesize_wav"):  # piper-tts >= 1.3
+                self.voice.synthesize_wav(text, w)
+            else:
+                self.voice.synthesize(text, w)
+        return buf.getvalue()
+
+
+class EspeakTTS:
+    """espeak-ng formant synthesis (subprocess, CPU)."""
+
+    name = "espeak"
+    formats = ("wav",)
+
+    def __init__(self):
+        self.voice = os.getenv("TTS_ESPEAK_VOICE", "en-us")
+        subprocess.run(["espeak-ng", "--version"], capture_output=True, check=True)  # fail at load, not per reply
+
+    def synthesize(self, text, fmt="wav"):
+        out = subprocess.run(["espeak-ng", "--stdout", "-v", self.voice, "--stdin"],
+                             input=text.encode(), capture_output=True, check=True).stdout
+        return fix_wav_sizes(out)
+
+
+PROVIDERS = {p.name: p for p in (OpenAITTS, PiperTTS, EspeakTTS)}
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name=None):
+    """Load a TTS provider once per process (local voices take a while to load)."""
+    name = name or os.getenv("TTS_PROVIDER", "openai")
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown TTS_PROVIDER '{name}' (choose from {', '.join(PROVIDERS)})")
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = PROVIDERS[name]()
+        return _providers[name]
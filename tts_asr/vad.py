@@ -0,0 +1,114 @@
+"""
+Energy-based voice activity detection for ASR preprocessing.
+
+Whisper's CPU time grows with the audio it is given, so leading/trailing
+silence and long pauses are cut before transcription: frames whose RMS
+level is more than VAD_MARGIN_DB above the recording's noise floor count
+as speech, pauses longer than VAD_SPLIT_MS split segments, and the padded
+speech segments are joined with a short gap for the ASR model. Works on
+in-memory float32 mono audio (e.g. whisper.load_audio output). Configure via:
+- ASR_VAD: enable VAD before ASR (default: true)
+- VAD_MARGIN_DB: speech threshold above the noise floor (default: 10)
+- VAD_SPLIT_MS: pause length that splits segments (default: 600)
+- VAD_PAD_MS: audio kept around each segment (default: 200)
+- VAD_MIN_SPEECH_MS: shorter segments are dropped as clicks/noise (default: 200)
+"""
+import os
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+MIN_DB = -60.0  # never treat anything quieter than this as speech
+
+
+def vad_enabled() -> bool:
+    return os.getenv("ASR_VAD", "true").lower() in ("1", "true", "yes")
+
+
+def vad_settings() -> dict:
+    return {
+        "margin_db": float(os.getenv("VAD_MARGIN_DB", "10")),
+        "split_ms": float(os.getenv("VAD_SPLIT_MS", "600")),
+        "pad_ms": float(os.getenv("VAD_PAD_MS", "200")),
+        "min_speech_ms": float(os.getenv("VAD_MIN_SPEECH_MS", "200")),
+    }
+
+
+def as_float32(audio):
+    """Mono float32 in [-1, 1] from int16 / float arrays."""
+    audio = np.asarray(audio)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32, copy=False)
+
+
+def frame_levels_db(audio, sr=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """RMS level (dBFS) of consecutive non-overlapping frames."""
+    n = int(sr * frame_ms / 1000)
+    frames = len(audio) // n
+    if frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    power = np.mean(np.square(audio[:frames * n].reshape(frames, n), dtype=np.float64), axis=1)
+    return 10 * np.log10(power + 1e-12)
+
+
+def speech_segments(audio, sr=SAMPLE_RATE, **overrides):
+    """[(start_sample, end_sample), ...] of padded speech segments."""
+    cfg = {**vad_settings(), **overrides}
+    audio = as_float32(audio)
+    levels = frame_levels_db(audio, sr)
+    if not len(levels):
+        return []
+    threshold = max(np.percentile(levels, 10) + cfg["margin_db"], MIN_DB)
+    voiced = levels > threshold
+    if not voiced.any():
+        return []
+
+    # Runs of voiced frames; gaps shorter than split_ms are bridged
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    runs = list(zip(edges[::2], edges[1::2]))
+    max_gap = cfg["split_ms"] / FRAME_MS
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < max_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    frame = int(sr * FRAME_MS / 1000)
+    pad = int(sr * cfg["pad_ms"] / 1000)
+    min_frames = cfg["min_speech_ms"] / FRAME_MS
+    out = []
+    for start, end in merged:
+        if end - start < min_frames:
+            continue
+        s, e = max(0, start * frame - pad), min(len(audio), end * frame + pad)
+        if out and s <= out[-1][1]:  # padding made them touch
+            out[-1] = (out[-1][0], e)
+        else:
+            out.append((s, e))
+    return out
+
+
+def trim_silence(audio, sr=SAMPLE_RATE, gap_ms=300, **overrides):
+    """
+    Speech-only audio for ASR: segments joined by gap_ms of silence.
+
+    Returns (audio, info) with info = {"input_s", "speech_s", "segments"};
+    audio is empty when no speech was found.
+    """
+    audio = as_float32(audio)
+    segments = speech_segments(audio, sr, **overrides)
+    gap = np.zeros(int(sr * gap_ms / 1000), dtype=np.float32)
+    parts = []
+    for i, (s, e) in enumerate(segments):
+        if i:
+            parts.append(gap)
+        parts.append(audio[s:e])
+    speech = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    info = {"input_s": round(len(audio) / sr, 2), "speech_s": round(len(speech) / sr, 2),
+            "segments": len(segments)}
+    return speech, info